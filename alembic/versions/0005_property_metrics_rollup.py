@@ -0,0 +1,55 @@
+"""Add property_metrics rollup table
+
+Revision ID: 0005_property_metrics_rollup
+Revises: 0004_add_personal_fields
+Create Date: 2026-10-16 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_property_metrics_rollup"
+down_revision = "0004_add_personal_fields"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "property_metrics",
+        sa.Column(
+            "property_id",
+            sa.Integer,
+            sa.ForeignKey("properties.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("units_total", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("units_occupied", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("pending_kyc", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("monthly_revenue", sa.Numeric(14, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+
+    # Backfill; afterwards the application keeps rows current on every flush.
+    op.execute(
+        """
+        INSERT INTO property_metrics (property_id, units_total, units_occupied, pending_kyc, monthly_revenue)
+        SELECT
+            p.id,
+            COUNT(DISTINCT u.id),
+            COUNT(DISTINCT CASE WHEN l.status = 'active' THEN u.id END),
+            COUNT(DISTINCT CASE WHEN t.kyc_status IN ('pending', 'submitted', 'conditional') THEN t.id END),
+            COALESCE(SUM(CASE WHEN l.status = 'active' THEN l.rent_amount ELSE 0 END), 0)
+        FROM properties p
+        LEFT JOIN units u ON u.property_id = p.id
+        LEFT JOIN leases l ON l.unit_id = u.id
+        LEFT JOIN tenants t ON t.id = l.tenant_id
+        GROUP BY p.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("property_metrics")
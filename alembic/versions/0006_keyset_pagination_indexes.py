@@ -0,0 +1,28 @@
+"""Add (created_at, id) indexes for keyset pagination
+
+Revision ID: 0006_keyset_pagination_indexes
+Revises: 0005_property_metrics_rollup
+Create Date: 2026-10-16 10:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_keyset_pagination_indexes"
+down_revision = "0005_property_metrics_rollup"
+branch_labels = None
+depends_on = None
+
+
+TABLES = ("properties", "tenants", "leases")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_index(f"ix_{table}_created_at_id", table, ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_index(f"ix_{table}_created_at_id", table_name=table)
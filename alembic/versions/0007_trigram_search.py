@@ -0,0 +1,85 @@
+"""Add pg_trgm search indexes and normalised tenant phone column
+
+Revision ID: 0007_trigram_search
+Revises: 0006_keyset_pagination_indexes
+Create Date: 2026-10-16 11:00:00.000000
+"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_trigram_search"
+down_revision = "0006_keyset_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+DEFAULT_COUNTRY_CODE = "254"
+
+TRIGRAM_INDEXES = {
+    "ix_properties_name_trgm": ("properties", "lower(coalesce(name, ''))"),
+    "ix_properties_code_trgm": ("properties", "lower(coalesce(code, ''))"),
+    "ix_tenants_full_name_trgm": ("tenants", "lower(coalesce(full_name, ''))"),
+    "ix_tenants_email_trgm": ("tenants", "lower(coalesce(email, ''))"),
+    "ix_tenants_phone_e164_trgm": ("tenants", "phone_e164"),
+}
+
+
+def _normalize_phone(raw):
+    # Frozen copy of app.services.search.normalize_phone at the time of this migration.
+    if not raw:
+        return None
+    value = raw.strip()
+    digits = re.sub(r"\D", "", value)
+    if not digits:
+        return None
+    if value.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith(DEFAULT_COUNTRY_CODE) and len(digits) > len(DEFAULT_COUNTRY_CODE) + 6:
+        pass
+    elif digits.startswith("0"):
+        digits = DEFAULT_COUNTRY_CODE + digits[1:]
+    else:
+        digits = DEFAULT_COUNTRY_CODE + digits
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    op.add_column("tenants", sa.Column("phone_e164", sa.String(length=20), nullable=True))
+    op.create_index("ix_tenants_phone_e164", "tenants", ["phone_e164"], unique=False)
+
+    tenants = sa.table("tenants", sa.column("id", sa.Integer), sa.column("phone", sa.String), sa.column("phone_e164", sa.String))
+    rows = bind.execute(sa.select(tenants.c.id, tenants.c.phone).where(tenants.c.phone.is_not(None))).all()
+    updates = [{"tid": tid, "e164": _normalize_phone(phone)} for tid, phone in rows]
+    updates = [row for row in updates if row["e164"]]
+    if updates:
+        bind.execute(
+            tenants.update().where(tenants.c.id == sa.bindparam("tid")).values(phone_e164=sa.bindparam("e164")),
+            updates,
+        )
+
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, (table, expression) in TRIGRAM_INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({expression} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for name in TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.drop_index("ix_tenants_phone_e164", table_name="tenants")
+    op.drop_column("tenants", "phone_e164")
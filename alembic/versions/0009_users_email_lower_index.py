@@ -0,0 +1,44 @@
+"""Normalise user emails and add a unique lower(email) index
+
+Revision ID: 0009_users_email_lower_index
+Revises: 0008_refresh_tokens
+Create Date: 2026-10-16 13:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_users_email_lower_index"
+down_revision = "0008_refresh_tokens"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    users = sa.table("users", sa.column("id", sa.Integer), sa.column("email", sa.String))
+    normalized = sa.func.lower(sa.func.trim(users.c.email))
+
+    duplicates = bind.execute(
+        sa.select(normalized).group_by(normalized).having(sa.func.count() > 1).limit(10)
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add ix_users_email_lower: emails differing only by case or whitespace exist "
+            f"(e.g. {', '.join(duplicates)}). Merge or rename those accounts first."
+        )
+
+    bind.execute(users.update().where(users.c.email != normalized).values(email=normalized))
+
+    if bind.dialect.name == "postgresql":
+        # CONCURRENTLY keeps logins working while the index builds on a large users table.
+        with op.get_context().autocommit_block():
+            op.execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_lower ON users (lower(email))")
+    else:
+        op.create_index("ix_users_email_lower", "users", [sa.text("lower(email)")], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_lower", table_name="users")
@@ -0,0 +1,50 @@
+"""Add email_outbox table
+
+Revision ID: 0010_email_outbox
+Revises: 0009_users_email_lower_index
+Create Date: 2026-10-16 14:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0010_email_outbox"
+down_revision = "0009_users_email_lower_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("recipient", sa.String, nullable=False),
+        sa.Column("subject", sa.String, nullable=False),
+        sa.Column("html_body", sa.Text, nullable=False),
+        sa.Column("text_body", sa.Text, nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("pending", "sent", "failed", name="email_outbox_status"),
+            nullable=False,
+            server_default="pending",
+        ),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("last_error", sa.Text, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_email_outbox_status_next_attempt",
+        "email_outbox",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_email_outbox_status_next_attempt", table_name="email_outbox")
+    op.drop_table("email_outbox")
+    sa.Enum(name="email_outbox_status").drop(op.get_bind(), checkfirst=True)
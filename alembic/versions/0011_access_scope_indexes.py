@@ -0,0 +1,34 @@
+"""Index the columns behind per-user property access scopes
+
+Revision ID: 0011_access_scope_indexes
+Revises: 0010_email_outbox
+Create Date: 2026-10-16 15:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0011_access_scope_indexes"
+down_revision = "0010_email_outbox"
+branch_labels = None
+depends_on = None
+
+
+# units.property_id and leases.unit_id already lead composite indexes from 0002.
+INDEXES = (
+    ("ix_properties_owner_id", "properties", "owner_id"),
+    ("ix_properties_manager_id", "properties", "manager_id"),
+    ("ix_property_managers_user_id", "property_managers", "user_id"),
+    ("ix_maintenance_requests_property_id", "maintenance_requests", "property_id"),
+)
+
+
+def upgrade() -> None:
+    for name, table, column in INDEXES:
+        op.create_index(name, table, [column], unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,55 @@
+"""Add daily_portfolio_metrics snapshot table
+
+Revision ID: 0012_daily_portfolio_metrics
+Revises: 0011_access_scope_indexes
+Create Date: 2026-10-16 16:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_daily_portfolio_metrics"
+down_revision = "0011_access_scope_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_portfolio_metrics",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("snapshot_date", sa.Date, nullable=False),
+        sa.Column(
+            "property_id",
+            sa.Integer,
+            sa.ForeignKey("properties.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("owner_id", sa.Integer, sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("tenants", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("active_leases", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("monthly_revenue", sa.Numeric(14, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("pending_kyc", sa.Integer, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+        sa.UniqueConstraint("snapshot_date", "property_id", name="uq_daily_portfolio_metrics_date_property"),
+    )
+    op.create_index(
+        "ix_daily_portfolio_metrics_property_id",
+        "daily_portfolio_metrics",
+        ["property_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_daily_portfolio_metrics_owner_date",
+        "daily_portfolio_metrics",
+        ["owner_id", "snapshot_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_daily_portfolio_metrics_owner_date", table_name="daily_portfolio_metrics")
+    op.drop_index("ix_daily_portfolio_metrics_property_id", table_name="daily_portfolio_metrics")
+    op.drop_table("daily_portfolio_metrics")
@@ -0,0 +1,41 @@
+"""Partial index on open invoices' due_date for the overdue sweeper
+
+Revision ID: 0013_rent_invoices_open_due_index
+Revises: 0012_daily_portfolio_metrics
+Create Date: 2026-10-16 17:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0013_rent_invoices_open_due_index"
+down_revision = "0012_daily_portfolio_metrics"
+branch_labels = None
+depends_on = None
+
+
+OPEN_PREDICATE = "status IN ('pending', 'partial')"
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # CONCURRENTLY keeps billing and payments writing while the index builds.
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_rent_invoices_open_due_date "
+                f"ON rent_invoices (due_date) WHERE {OPEN_PREDICATE}"
+            )
+    else:
+        op.create_index(
+            "ix_rent_invoices_open_due_date",
+            "rent_invoices",
+            ["due_date"],
+            unique=False,
+            sqlite_where=sa.text(OPEN_PREDICATE),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rent_invoices_open_due_date", table_name="rent_invoices")
@@ -0,0 +1,27 @@
+"""Add payments.idempotency_key with a unique index
+
+Revision ID: 0014_payment_idempotency_key
+Revises: 0013_rent_invoices_open_due_index
+Create Date: 2026-10-16 18:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0014_payment_idempotency_key"
+down_revision = "0013_rent_invoices_open_due_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing payments keep a NULL key: historical references may repeat and are not retroactively deduplicated.
+    op.add_column("payments", sa.Column("idempotency_key", sa.String(255), nullable=True))
+    op.create_index("ix_payments_idempotency_key", "payments", ["idempotency_key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payments_idempotency_key", table_name="payments")
+    op.drop_column("payments", "idempotency_key")
@@ -0,0 +1,54 @@
+"""Add payment_reconciliation_queue for unmatched statement lines
+
+Revision ID: 0015_payment_reconciliation_queue
+Revises: 0014_payment_idempotency_key
+Create Date: 2026-10-16 19:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0015_payment_reconciliation_queue"
+down_revision = "0014_payment_idempotency_key"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payment_reconciliation_queue",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("source", sa.String(80), nullable=False),
+        sa.Column("line_no", sa.Integer, nullable=False),
+        sa.Column("reference", sa.String(120), nullable=True),
+        sa.Column("phone", sa.String(50), nullable=True),
+        sa.Column("account", sa.String(120), nullable=True),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=True),
+        sa.Column("paid_on", sa.Date, nullable=True),
+        sa.Column("reason", sa.String(32), nullable=False),
+        sa.Column("raw", sa.Text, nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("open", "resolved", "ignored", name="payment_reconciliation_status_enum"),
+            nullable=False,
+            server_default="open",
+        ),
+        sa.Column("payment_id", sa.Integer, sa.ForeignKey("payments.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+        sa.Column("resolved_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("source", "line_no", name="uq_payment_reconciliation_source_line"),
+    )
+    op.create_index(
+        "ix_payment_reconciliation_status_created",
+        "payment_reconciliation_queue",
+        ["status", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payment_reconciliation_status_created", table_name="payment_reconciliation_queue")
+    op.drop_table("payment_reconciliation_queue")
+    sa.Enum(name="payment_reconciliation_status_enum").drop(op.get_bind(), checkfirst=True)
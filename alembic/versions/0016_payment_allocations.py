@@ -0,0 +1,68 @@
+"""Add payment_allocations and lump-sum payments
+
+Revision ID: 0016_payment_allocations
+Revises: 0015_payment_reconciliation_queue
+Create Date: 2026-10-16 20:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0016_payment_allocations"
+down_revision = "0015_payment_reconciliation_queue"
+branch_labels = None
+depends_on = None
+
+OPEN_CREDIT_PREDICATE = "unallocated > 0"
+
+
+def upgrade() -> None:
+    op.alter_column("payments", "invoice_id", existing_type=sa.Integer, nullable=True)
+    op.add_column(
+        "payments",
+        sa.Column("lease_id", sa.Integer, sa.ForeignKey("leases.id", ondelete="CASCADE"), nullable=True),
+    )
+    op.add_column(
+        "payments",
+        sa.Column("tenant_id", sa.Integer, sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=True),
+    )
+    op.add_column("payments", sa.Column("unallocated", sa.Numeric(12, 2), nullable=True))
+    op.create_index(
+        "ix_payments_open_credit",
+        "payments",
+        ["lease_id", "tenant_id"],
+        unique=False,
+        postgresql_where=sa.text(OPEN_CREDIT_PREDICATE),
+        sqlite_where=sa.text(OPEN_CREDIT_PREDICATE),
+    )
+    op.create_index("ix_leases_tenant_id", "leases", ["tenant_id"], unique=False)
+
+    op.create_table(
+        "payment_allocations",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("payment_id", sa.Integer, sa.ForeignKey("payments.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("invoice_id", sa.Integer, sa.ForeignKey("rent_invoices.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+    op.create_index("ix_payment_allocations_id", "payment_allocations", ["id"], unique=False)
+    op.create_index("ix_payment_allocations_payment_id", "payment_allocations", ["payment_id"], unique=False)
+    op.create_index("ix_payment_allocations_invoice_id", "payment_allocations", ["invoice_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payment_allocations_invoice_id", table_name="payment_allocations")
+    op.drop_index("ix_payment_allocations_payment_id", table_name="payment_allocations")
+    op.drop_index("ix_payment_allocations_id", table_name="payment_allocations")
+    op.drop_table("payment_allocations")
+
+    op.drop_index("ix_leases_tenant_id", table_name="leases")
+    op.drop_index("ix_payments_open_credit", table_name="payments")
+    op.drop_column("payments", "unallocated")
+    op.drop_column("payments", "tenant_id")
+    op.drop_column("payments", "lease_id")
+    # Lump-sum payments have no single invoice; they must be removed before invoice_id can be required again.
+    op.execute("DELETE FROM payments WHERE invoice_id IS NULL")
+    op.alter_column("payments", "invoice_id", existing_type=sa.Integer, nullable=False)
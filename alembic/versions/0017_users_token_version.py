@@ -0,0 +1,26 @@
+"""Add users.token_version for revoking claims-bearing access tokens
+
+Revision ID: 0017_users_token_version
+Revises: 0016_payment_allocations
+Create Date: 2026-10-16 21:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0017_users_token_version"
+down_revision = "0016_payment_allocations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Starts at 1 so claims tokens issued before the column existed (ver=0, held in memory) stop validating.
+    op.add_column("users", sa.Column("token_version", sa.Integer, nullable=False, server_default=sa.text("1")))
+    op.alter_column("users", "token_version", server_default=sa.text("0"))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
@@ -0,0 +1,29 @@
+"""Add tenants.created_by_id so lease-less tenants stay visible to their creator
+
+Revision ID: 0018_tenants_created_by
+Revises: 0017_users_token_version
+Create Date: 2026-10-16 22:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0018_tenants_created_by"
+down_revision = "0017_users_token_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tenants",
+        sa.Column("created_by_id", sa.Integer, sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+    )
+    op.create_index("ix_tenants_created_by_id", "tenants", ["created_by_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tenants_created_by_id", table_name="tenants")
+    op.drop_column("tenants", "created_by_id")
@@ -0,0 +1,185 @@
+"""Operational commands. Run with ``python -m app.cli <command>``."""
+
+import argparse
+import logging
+import os
+import sys
+from datetime import date
+
+from .core.database import db_session
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_property_metrics(args: argparse.Namespace) -> int:
+    from .services.property_metrics import rebuild_property_metrics as rebuild
+
+    with db_session() as db:
+        written = rebuild(db, chunk_size=args.chunk_size)
+    print(f"Rebuilt property metrics for {written} properties")
+    return 0
+
+
+def prune_refresh_tokens(args: argparse.Namespace) -> int:
+    from .services.refresh_tokens import prune_refresh_tokens as prune
+
+    with db_session() as db:
+        deleted = prune(db, older_than_days=args.older_than_days)
+    print(f"Deleted {deleted} expired refresh tokens")
+    return 0
+
+
+def snapshot_portfolio_metrics(args: argparse.Namespace) -> int:
+    from .services.portfolio_metrics import record_portfolio_metrics
+
+    with db_session() as db:
+        written = record_portfolio_metrics(db, args.date or date.today())
+    print(f"Recorded {written} portfolio metric rows")
+    return 0
+
+
+def backfill_portfolio_metrics(args: argparse.Namespace) -> int:
+    from .services.portfolio_metrics import record_portfolio_metrics
+
+    with db_session() as db:
+        written = record_portfolio_metrics(db, args.start, args.end or date.today(), batch_size=args.batch_size)
+    print(f"Backfilled {written} portfolio metric rows")
+    return 0
+
+
+def run_billing(args: argparse.Namespace) -> int:
+    from .services.billing import run_billing as run
+
+    with db_session() as db:
+        result = run(db, args.period, batch_size=args.batch_size)
+    print(
+        f"Billed {result.period_start:%Y-%m}: {result.invoices_created} invoices created, "
+        f"{result.already_invoiced} already invoiced, {result.rows_per_second} rows/s; "
+        f"{result.credit_allocated} of open credit allocated to {result.invoices_credited} invoices"
+    )
+    return 0
+
+
+def mark_overdue_invoices(args: argparse.Namespace) -> int:
+    from .services.billing import mark_overdue_invoices as sweep
+
+    with db_session() as db:
+        result = sweep(db, as_of=args.as_of, chunk_size=args.chunk_size)
+    print(
+        f"Marked {result.total} invoices overdue "
+        f"({result.from_pending} pending, {result.from_partial} partial) in {result.seconds:.2f}s"
+    )
+    return 0
+
+
+def import_payments(args: argparse.Namespace) -> int:
+    from .services.payment_import import PaymentImport, StatementParser
+
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    parser = StatementParser(fmt)
+    with db_session() as db, open(args.path, encoding="utf-8-sig", newline="") as statement:
+        importer = PaymentImport(db, args.source or os.path.basename(args.path), method=args.method, batch_size=args.batch_size)
+        importer.process(parser.parse(statement))
+        report = importer.finish()
+    print(
+        f"Imported {report.lines} lines from {report.source}: {report.matched} matched "
+        f"({report.match_rate:.1%}), {report.queued} queued for reconciliation, {report.duplicates} duplicates, "
+        f"{report.lines_per_second} lines/s"
+    )
+    return 0
+
+
+def email_worker(args: argparse.Namespace) -> int:
+    from .core.database import SessionLocal
+    from .services.email import default_transport
+    from .services.email_outbox import run_worker
+
+    run_worker(
+        SessionLocal,
+        default_transport(),
+        batch_size=args.batch_size,
+        poll_seconds=args.poll_seconds,
+        once=args.once,
+    )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-property-metrics",
+        help="Recompute the property_metrics rollup from units, leases and tenants",
+    )
+    rebuild.add_argument("--chunk-size", type=int, default=500)
+    rebuild.set_defaults(handler=rebuild_property_metrics)
+
+    prune = commands.add_parser("prune-refresh-tokens", help="Delete long-expired refresh tokens")
+    prune.add_argument("--older-than-days", type=int, default=7)
+    prune.set_defaults(handler=prune_refresh_tokens)
+
+    snapshot = commands.add_parser(
+        "snapshot-portfolio-metrics",
+        help="Record today's per-property dashboard figures; schedule once a day",
+    )
+    snapshot.add_argument("--date", type=date.fromisoformat, default=None)
+    snapshot.set_defaults(handler=snapshot_portfolio_metrics)
+
+    backfill = commands.add_parser(
+        "backfill-portfolio-metrics",
+        help="Reconstruct daily portfolio metrics for a date range from lease start/end dates",
+    )
+    backfill.add_argument("--start", type=date.fromisoformat, required=True)
+    backfill.add_argument("--end", type=date.fromisoformat, default=None, help="Defaults to today")
+    backfill.add_argument("--batch-size", type=int, default=5000)
+    backfill.set_defaults(handler=backfill_portfolio_metrics)
+
+    billing = commands.add_parser("run-billing", help="Create rent invoices for every active lease in a month")
+    billing.add_argument(
+        "--period",
+        type=date.fromisoformat,
+        required=True,
+        help="First day of the month to bill, e.g. 2025-02-01",
+    )
+    billing.add_argument("--batch-size", type=int, default=5000)
+    billing.set_defaults(handler=run_billing)
+
+    overdue = commands.add_parser(
+        "mark-overdue-invoices",
+        help="Flip pending/partial invoices past their due date to overdue; safe to run from several workers",
+    )
+    overdue.add_argument("--as-of", type=date.fromisoformat, default=None, help="Defaults to today")
+    overdue.add_argument("--chunk-size", type=int, default=5000)
+    overdue.set_defaults(handler=mark_overdue_invoices)
+
+    payments = commands.add_parser(
+        "import-payments",
+        help="Match a mobile-money or bank statement (CSV or NDJSON) to invoices and record the payments",
+    )
+    payments.add_argument("path")
+    payments.add_argument("--format", choices=["csv", "ndjson"], default=None, help="Defaults to the file extension")
+    payments.add_argument("--source", default=None, help="Defaults to the file name")
+    payments.add_argument(
+        "--method", choices=["cash", "mobile_money", "bank_transfer", "cheque", "other"], default="mobile_money"
+    )
+    payments.add_argument("--batch-size", type=int, default=1000)
+    payments.set_defaults(handler=import_payments)
+
+    worker = commands.add_parser("email-worker", help="Send queued emails from the email_outbox table")
+    worker.add_argument("--batch-size", type=int, default=None)
+    worker.add_argument("--poll-seconds", type=float, default=None)
+    worker.add_argument("--once", action="store_true", help="Exit once the outbox is drained")
+    worker.set_defaults(handler=email_worker)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
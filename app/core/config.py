@@ -1,4 +1,4 @@
-from typing import Any, List, Sequence
+from typing import Any, List, Literal, Sequence
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,6 +11,9 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "change-this"
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    JWT_EMBED_CLAIMS: bool = False
+    TOKEN_VERSION_BACKEND: str = "app.core.token_versions.CachedTokenVersionStore"
     CORS_ORIGINS: List[str] | str = ["http://localhost:5173"]
     PROJECT_NAME: str = "Easy Estates"
     FRONTEND_BASE_URL: str = "http://localhost:5173"
@@ -24,11 +27,58 @@ class Settings(BaseSettings):
     EMIT_DEBUG_TOKENS: bool = False
     ALLOW_OPEN_TENANT_CREATION: bool = False
     ALLOW_OPEN_PROPERTY_MANAGEMENT: bool = False
+    COUNT_MODE: Literal["exact", "estimate", "cached"] = "exact"
+    COUNT_CACHE_TTL_SECONDS: float = 15.0
+    COUNT_CACHE_MAX_ENTRIES: int = 2048
+    COUNT_ESTIMATE_MIN_ROWS: int = 10000
+    DEFAULT_PHONE_COUNTRY_CODE: str = "254"
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    ADMIN_API_TOKEN: str | None = None
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 10.0
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 2
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_SECONDS: float = 30.0
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: Literal["always", "never", "idle"] = "idle"
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = 30.0
+    DB_PREPARE_THRESHOLD: int | None = 5
+    DATABASE_REPLICA_URLS: List[str] | str = []
+    REPLICA_EJECT_SECONDS: float = 30.0
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 3
+    SLOW_QUERY_MS: float = 250.0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_BUFFER_SIZE: int = 200
+    DB_CREATE_ALL_ON_STARTUP: bool = True
+    DB_POOL_WARM_CONNECTIONS: int = 2
+    DASHBOARD_CACHE_FRESH_SECONDS: float = 30.0
+    DASHBOARD_CACHE_STALE_SECONDS: float = 300.0
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 1024
+    DASHBOARD_CHANGE_PERIOD_DAYS: int = 30
+    ACCESS_SCOPE_CACHE_TTL_SECONDS: float = 60.0
+    ACCESS_SCOPE_CACHE_MAX_ENTRIES: int = 10000
 
-    @field_validator("CORS_ORIGINS", mode="before")
+    @field_validator("DB_PREPARE_THRESHOLD", mode="before")
+    @classmethod
+    def parse_prepare_threshold(cls, raw: Any) -> Any:
+        """Allow ``DB_PREPARE_THRESHOLD=none`` (or empty) to disable server-side prepares."""
+        if isinstance(raw, str) and raw.strip().lower() in {"", "none"}:
+            return None
+        return raw
+
+    @field_validator("CORS_ORIGINS", "DATABASE_REPLICA_URLS", mode="before")
     @classmethod
     def parse_cors(cls, raw: Any) -> Sequence[str] | Any:
-        """Normalise origins from JSON arrays, comma lists, or single strings."""
+        """Normalise origins (or replica URLs) from JSON arrays, comma lists, or single strings."""
         if isinstance(raw, list):
             return raw
 
@@ -65,6 +115,18 @@ class Settings(BaseSettings):
     def access_token_exp_minutes(self) -> int:
         return self.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
 
+    @property
+    def refresh_token_expire_days(self) -> int:
+        return self.REFRESH_TOKEN_EXPIRE_DAYS
+
+    @property
+    def jwt_embed_claims(self) -> bool:
+        return self.JWT_EMBED_CLAIMS
+
+    @property
+    def token_version_backend(self) -> str:
+        return self.TOKEN_VERSION_BACKEND
+
     @property
     def cors_origins(self) -> List[str]:
         value = self.CORS_ORIGINS
@@ -118,5 +180,161 @@ class Settings(BaseSettings):
     def allow_open_property_management(self) -> bool:
         return self.ALLOW_OPEN_PROPERTY_MANAGEMENT
 
+    @property
+    def count_mode(self) -> str:
+        return self.COUNT_MODE
+
+    @property
+    def count_cache_ttl_seconds(self) -> float:
+        return self.COUNT_CACHE_TTL_SECONDS
+
+    @property
+    def count_cache_max_entries(self) -> int:
+        return self.COUNT_CACHE_MAX_ENTRIES
+
+    @property
+    def count_estimate_min_rows(self) -> int:
+        return self.COUNT_ESTIMATE_MIN_ROWS
+
+    @property
+    def default_phone_country_code(self) -> str:
+        return self.DEFAULT_PHONE_COUNTRY_CODE
+
+    @property
+    def principal_cache_ttl_seconds(self) -> float:
+        return self.PRINCIPAL_CACHE_TTL_SECONDS
+
+    @property
+    def principal_cache_max_entries(self) -> int:
+        return self.PRINCIPAL_CACHE_MAX_ENTRIES
+
+    @property
+    def admin_api_token(self) -> str | None:
+        return self.ADMIN_API_TOKEN
+
+    @property
+    def password_hash_workers(self) -> int:
+        return self.PASSWORD_HASH_WORKERS
+
+    @property
+    def password_hash_max_pending(self) -> int:
+        return self.PASSWORD_HASH_MAX_PENDING
+
+    @property
+    def password_hash_timeout_seconds(self) -> float:
+        return self.PASSWORD_HASH_TIMEOUT_SECONDS
+
+    @property
+    def password_hash_retry_after_seconds(self) -> int:
+        return self.PASSWORD_HASH_RETRY_AFTER_SECONDS
+
+    @property
+    def email_outbox_batch_size(self) -> int:
+        return self.EMAIL_OUTBOX_BATCH_SIZE
+
+    @property
+    def email_outbox_max_attempts(self) -> int:
+        return self.EMAIL_OUTBOX_MAX_ATTEMPTS
+
+    @property
+    def email_outbox_backoff_seconds(self) -> float:
+        return self.EMAIL_OUTBOX_BACKOFF_SECONDS
+
+    @property
+    def email_outbox_poll_seconds(self) -> float:
+        return self.EMAIL_OUTBOX_POLL_SECONDS
+
+    @property
+    def db_pool_size(self) -> int:
+        return self.DB_POOL_SIZE
+
+    @property
+    def db_max_overflow(self) -> int:
+        return self.DB_MAX_OVERFLOW
+
+    @property
+    def db_pool_timeout_seconds(self) -> float:
+        return self.DB_POOL_TIMEOUT_SECONDS
+
+    @property
+    def db_pool_recycle_seconds(self) -> int:
+        return self.DB_POOL_RECYCLE_SECONDS
+
+    @property
+    def db_pool_pre_ping(self) -> str:
+        return self.DB_POOL_PRE_PING
+
+    @property
+    def db_pool_pre_ping_idle_seconds(self) -> float:
+        return self.DB_POOL_PRE_PING_IDLE_SECONDS
+
+    @property
+    def db_prepare_threshold(self) -> int | None:
+        return self.DB_PREPARE_THRESHOLD
+
+    @property
+    def database_replica_urls(self) -> list[str]:
+        return list(self.DATABASE_REPLICA_URLS)
+
+    @property
+    def replica_eject_seconds(self) -> float:
+        return self.REPLICA_EJECT_SECONDS
+
+    @property
+    def read_your_writes_seconds(self) -> float:
+        return self.READ_YOUR_WRITES_SECONDS
+
+    @property
+    def query_stats_enabled(self) -> bool:
+        return self.QUERY_STATS_ENABLED
+
+    @property
+    def query_n_plus_one_threshold(self) -> int:
+        return self.QUERY_N_PLUS_ONE_THRESHOLD
+
+    @property
+    def slow_query_ms(self) -> float:
+        return self.SLOW_QUERY_MS
+
+    @property
+    def slow_query_explain_sample_rate(self) -> float:
+        return self.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+
+    @property
+    def slow_query_buffer_size(self) -> int:
+        return self.SLOW_QUERY_BUFFER_SIZE
+
+    @property
+    def db_create_all_on_startup(self) -> bool:
+        return self.DB_CREATE_ALL_ON_STARTUP
+
+    @property
+    def db_pool_warm_connections(self) -> int:
+        return self.DB_POOL_WARM_CONNECTIONS
+
+    @property
+    def dashboard_cache_fresh_seconds(self) -> float:
+        return self.DASHBOARD_CACHE_FRESH_SECONDS
+
+    @property
+    def dashboard_cache_stale_seconds(self) -> float:
+        return self.DASHBOARD_CACHE_STALE_SECONDS
+
+    @property
+    def dashboard_cache_max_entries(self) -> int:
+        return self.DASHBOARD_CACHE_MAX_ENTRIES
+
+    @property
+    def dashboard_change_period_days(self) -> int:
+        return self.DASHBOARD_CHANGE_PERIOD_DAYS
+
+    @property
+    def access_scope_cache_ttl_seconds(self) -> float:
+        return self.ACCESS_SCOPE_CACHE_TTL_SECONDS
+
+    @property
+    def access_scope_cache_max_entries(self) -> int:
+        return self.ACCESS_SCOPE_CACHE_MAX_ENTRIES
+
 
 settings = Settings()
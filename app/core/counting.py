@@ -0,0 +1,102 @@
+import logging
+from dataclasses import dataclass
+from typing import Hashable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+from .cache import TTLCache
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+COUNT_MODES = ("exact", "estimate", "cached")
+
+_count_cache = TTLCache(maxsize=settings.count_cache_max_entries, ttl=settings.count_cache_ttl_seconds)
+
+
+@dataclass(frozen=True)
+class CountResult:
+    total: int
+    is_estimate: bool = False
+
+
+def _exact(stmt: Query) -> CountResult:
+    return CountResult(total=stmt.count())
+
+
+def _table_estimate(db: Session, stmt: Query) -> int | None:
+    entity = stmt.column_descriptions[0]["entity"]
+    table_name = entity.__table__.name
+    reltuples = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": table_name},
+    ).scalar()
+    # reltuples is -1 (or 0) until the table has been vacuumed/analyzed at least once.
+    return int(reltuples) if reltuples and reltuples > 0 else None
+
+
+def _compile(db: Session, stmt: Query):
+    return stmt.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True})
+
+
+def _plan_estimate(db: Session, stmt: Query) -> int | None:
+    compiled = _compile(db, stmt)
+    plan = (
+        db.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params)
+        .scalar()
+    )
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (TypeError, LookupError, ValueError):
+        return None
+
+
+def _estimate(db: Session, stmt: Query) -> CountResult:
+    if db.get_bind().dialect.name != "postgresql":
+        return _exact(stmt)
+
+    try:
+        # A failed EXPLAIN aborts the transaction; the savepoint keeps the exact-count fallback usable.
+        with db.begin_nested():
+            estimate = _table_estimate(db, stmt) if stmt.whereclause is None else _plan_estimate(db, stmt)
+    except Exception:  # pragma: no cover - planner/catalog access failure
+        logger.warning("Row estimate failed; falling back to exact count", exc_info=True)
+        estimate = None
+
+    # Small results are cheap to count exactly, and estimates are least reliable there.
+    if estimate is None or estimate < settings.count_estimate_min_rows:
+        return _exact(stmt)
+    return CountResult(total=estimate, is_estimate=True)
+
+
+def _cached(db: Session, stmt: Query, scope: Hashable) -> CountResult:
+    compiled = _compile(db, stmt)
+    key = (compiled.string, tuple(sorted((k, repr(v)) for k, v in compiled.params.items())), scope)
+    total = _count_cache.get(key)
+    if total is None:
+        total = stmt.count()
+        _count_cache.set(key, total)
+    return CountResult(total=total)
+
+
+def count_rows(db: Session, stmt: Query, mode: str | None = None, scope: Hashable = None) -> CountResult:
+    """Count rows matched by ``stmt`` using the requested strategy.
+
+    ``exact`` runs ``SELECT count(*)``. ``estimate`` reads ``pg_class.reltuples``
+    for unfiltered queries or the planner's row estimate for filtered ones, and
+    falls back to an exact count off Postgres or below ``COUNT_ESTIMATE_MIN_ROWS``.
+    ``cached`` memoizes exact counts for a short TTL, keyed by the compiled
+    filter and the caller's ``scope``.
+    """
+    mode = mode or settings.count_mode
+    if mode == "estimate":
+        return _estimate(db, stmt)
+    if mode == "cached":
+        return _cached(db, stmt, scope)
+    return _exact(stmt)
+
+
+def count_cache_stats() -> dict:
+    return _count_cache.stats()
@@ -1,11 +1,85 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 from .config import settings
+from .pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, install_idle_pre_ping
 
-engine = create_engine(settings.database_url, echo=False, pool_pre_ping=True)
+
+def _engine_options(url: URL, poolclass) -> dict:
+    options = {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping == "always",
+    }
+    if url.get_driver_name() == "psycopg":
+        options["connect_args"] = {"prepare_threshold": settings.db_prepare_threshold}
+    return options
+
+
+def _configure_pre_ping(sync_engine) -> None:
+    if settings.db_pool_pre_ping == "idle":
+        install_idle_pre_ping(sync_engine, settings.db_pool_pre_ping_idle_seconds)
+
+
+_ASYNC_DRIVERS = {"postgresql": "postgresql+psycopg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str):
+    """Map the configured (sync) URL onto its async driver; psycopg 3 serves both modes."""
+    parsed = make_url(url)
+    return parsed.set(drivername=_ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername))
+
+
+def create_engines(url: str):
+    """Build the sync engine and its async twin for one database, sharing pool settings."""
+    sync_url = make_url(url)
+    sync_engine = create_engine(sync_url, echo=False, **_engine_options(sync_url, InstrumentedQueuePool))
+    _configure_pre_ping(sync_engine)
+
+    async_url = async_database_url(url)
+    if async_url.get_backend_name() == "sqlite":
+        # aiosqlite connections are bound to the event loop that opened them, so don't pool them.
+        async_engine = create_async_engine(async_url, echo=False, poolclass=NullPool)
+    else:
+        async_engine = create_async_engine(
+            async_url, echo=False, **_engine_options(async_url, InstrumentedAsyncAdaptedQueuePool)
+        )
+        _configure_pre_ping(async_engine.sync_engine)
+    return sync_engine, async_engine
+
+
+engine, async_engine = create_engines(settings.database_url)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+
+def pool_stats() -> dict:
+    """Live gauges and checkout-wait histograms for every instrumented pool."""
+    pools = {"primary": engine.pool, "async": async_engine.sync_engine.pool}
+    return {name: pool.stats() for name, pool in pools.items() if hasattr(pool, "stats")}
+
+
+def warm_sync_pool(connections: int) -> None:
+    """Open ``connections`` pooled connections up front so the first requests skip the handshake."""
+    held = [engine.connect() for _ in range(min(connections, settings.db_pool_size))]
+    for connection in held:
+        connection.close()
+
+
+async def warm_async_pool(connections: int) -> None:
+    if async_engine.sync_engine.pool.__class__ is NullPool:
+        return
+    held = [await async_engine.connect() for _ in range(min(connections, settings.db_pool_size))]
+    for connection in held:
+        await connection.close()
+
+
 from contextlib import contextmanager
 
 
@@ -24,3 +98,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Async session for read endpoints. Reuse sync query code with ``await db.run_sync(fn, ...)``."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence, TypeVar
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+T = TypeVar("T")
+
+
+def encode_cursor(created_at: datetime | None, row_id: int) -> str:
+    payload = {"c": created_at.isoformat() if created_at else None, "i": row_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(payload["c"]) if payload["c"] else None
+        return created_at, int(payload["i"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def order_keyset(stmt: Query, model: Any, descending: bool) -> Query:
+    """Order by the (created_at, id) keyset, matching the composite list indexes."""
+    if descending:
+        return stmt.order_by(model.created_at.desc(), model.id.desc())
+    return stmt.order_by(model.created_at.asc(), model.id.asc())
+
+
+def seek_keyset(stmt: Query, model: Any, cursor: str, descending: bool) -> Query:
+    """Restrict ``stmt`` to rows after ``cursor``. Raises ValueError for malformed cursors."""
+    created_at, row_id = decode_cursor(cursor)
+    key = tuple_(model.created_at, model.id)
+    bound = tuple_(created_at, row_id)
+    return stmt.filter(key < bound if descending else key > bound)
+
+
+def keyset_page(
+    rows: Sequence[T],
+    limit: int,
+    key: Callable[[T], Any] = lambda row: row,
+) -> tuple[list[T], str | None]:
+    """Trim a ``limit + 1`` fetch to ``limit`` rows and build the cursor for the next page."""
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = key(page[-1])
+    return page, encode_cursor(last.created_at, last.id)
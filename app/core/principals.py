@@ -0,0 +1,142 @@
+from dataclasses import dataclass
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session, object_session
+
+from ..models import User
+from .cache import TTLCache
+from .config import settings
+from .token_versions import get_token_version_store
+
+_PENDING_KEY = "principal_invalidations"
+_VERSION_KEY = "token_version_bumps"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authorization-relevant slice of a user, safe to share across requests."""
+
+    id: int
+    email: str
+    role: str
+    active: bool
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            active=bool(user.active),
+            token_version=user.token_version or 0,
+        )
+
+
+_cache = TTLCache(maxsize=settings.principal_cache_max_entries, ttl=settings.principal_cache_ttl_seconds)
+
+
+def load_principal(db: Session, user_id: int) -> Principal | None:
+    principal = _cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        return None
+
+    principal = Principal.from_user(user)
+    _cache.set(user_id, principal)
+    return principal
+
+
+def access_token_claims(principal: Principal) -> dict:
+    """Claims embedded in access tokens when ``JWT_EMBED_CLAIMS`` is on."""
+    if not settings.jwt_embed_claims:
+        return {}
+    get_token_version_store().remember(principal.id, principal.token_version)
+    return {
+        "email": principal.email,
+        "role": principal.role,
+        "active": principal.active,
+        "ver": principal.token_version,
+    }
+
+
+def principal_from_claims(db: Session, user_id: int, payload: dict) -> Principal | None:
+    """Build a principal from token claims, checking only the (cached) token version.
+
+    Returns ``None`` when claims mode is off or the token carries no claims, so
+    the caller falls back to ``load_principal``. Raises ``ValueError`` when the
+    token's version has been superseded by a role or status change or a
+    logout-all.
+    """
+    if not settings.jwt_embed_claims or "ver" not in payload:
+        return None
+    if payload["ver"] != get_token_version_store().current(db, user_id):
+        raise ValueError("Token revoked")
+    return Principal(
+        id=user_id,
+        email=payload["email"],
+        role=payload["role"],
+        active=bool(payload["active"]),
+        token_version=payload["ver"],
+    )
+
+
+def bump_token_version(db: Session, user_id: int) -> None:
+    """Revoke the user's claims tokens as part of the current transaction."""
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.info.setdefault(_PENDING_KEY, set()).add(user_id)
+    db.info.setdefault(_VERSION_KEY, set()).add(user_id)
+
+
+def invalidate_principal(user_id: int | None) -> None:
+    if user_id is not None:
+        _cache.pop(user_id)
+
+
+def clear_principals() -> None:
+    _cache.clear()
+
+
+def principal_cache_stats() -> dict:
+    return _cache.stats()
+
+
+@event.listens_for(User.active, "set")
+@event.listens_for(User.role, "set")
+def _on_principal_change(target: User, value, oldvalue, initiator) -> None:
+    if target.id is None:
+        return
+    invalidate_principal(target.id)
+    # Drop again once the change is durable, in case a concurrent request re-cached the old row.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+        if value != oldvalue:
+            # Flushed with the change itself, so the revocation commits (or rolls back) with it.
+            target.token_version = User.token_version + 1
+            session.info.setdefault(_VERSION_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_principal_invalidations(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_principal(user_id)
+    bumps = session.info.pop(_VERSION_KEY, ())
+    if bumps:
+        store = get_token_version_store()
+        for user_id in bumps:
+            store.forget(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_VERSION_KEY, None)
@@ -0,0 +1,126 @@
+"""Per-request SQL statement counts, DB time and N+1 detection.
+
+``QueryStatsMiddleware`` opens a ``RequestQueryStats`` in a context variable;
+engine-wide cursor events (every engine, including replicas and the async
+engines' sync cores) record into it. The totals go out as a ``Server-Timing``
+header, and statement shapes repeated ``QUERY_N_PLUS_ONE_THRESHOLD`` times
+or more are logged as probable N+1 queries.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Collapse literals, IN lists and whitespace so repeats of one query compare equal."""
+    shape = _IN_LIST.sub("IN (...)", statement)
+    shape = _LITERAL.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def repeated_shapes(statements, threshold: int | None = None) -> dict[str, int]:
+    threshold = threshold or settings.query_n_plus_one_threshold
+    counts = Counter(statement_shape(statement) for statement in statements)
+    return {shape: count for shape, count in counts.items() if count >= threshold}
+
+
+class RequestQueryStats:
+    def __init__(self, scope: dict | None = None) -> None:
+        self._scope = scope or {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.db_ms = 0.0
+        self.statements: list[str] = []
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.db_ms += elapsed_ms
+            self.statements.append(statement)
+
+    @property
+    def route(self) -> str:
+        """``METHOD /path/{template}`` once routing has matched, else the raw path."""
+        route = self._scope.get("route")
+        path = getattr(route, "path", None) or self._scope.get("path", "")
+        return f"{self._scope.get('method', '')} {path}".strip()
+
+    def server_timing(self, suspects: int) -> str:
+        desc = f"{self.count} queries" + (f", {suspects} repeated" if suspects else "")
+        return f'db;dur={self.db_ms:.1f};desc="{desc}"'
+
+
+_current: ContextVar[RequestQueryStats | None] = ContextVar("request_query_stats", default=None)
+
+
+def current_request_stats() -> RequestQueryStats | None:
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = conn.info.get("query_stats_started")
+    if stats is None or not started:
+        return
+    stats.record(statement, (time.perf_counter() - started.pop()) * 1000)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time so the next one is not misattributed.
+    conn = context.connection
+    started = conn.info.get("query_stats_started") if conn is not None else None
+    if started:
+        started.pop()
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI so the context variable is visible to the endpoint and its threadpool calls."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.query_stats_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                suspects = repeated_shapes(stats.statements)
+                for shape, count in suspects.items():
+                    logger.warning("Probable N+1 on %s: %dx %s", stats.route, count, shape)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing(len(suspects)).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,183 @@
+"""Read-replica routing for GET endpoints.
+
+Replicas are picked round-robin. A replica whose connection fails is ejected
+for ``REPLICA_EJECT_SECONDS``, and the statement that hit the failure is
+retried on the primary, so the request itself still succeeds; later reads go
+to the primary while no replica is healthy. A user whose session committed a
+write reads from the primary for ``READ_YOUR_WRITES_SECONDS``, so they never
+see a replica that lags behind their own change.
+
+That stickiness is tracked in process memory: it holds for requests served by
+the worker that handled the write, but another worker or instance may still
+send the user's next read to a lagging replica. Deployments running several
+workers behind replicas should keep ``READ_YOUR_WRITES_SECONDS`` short
+relative to replica lag, or route by a shared store.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from .cache import TTLCache
+from .config import settings
+from .database import async_engine as primary_async_engine
+from .database import create_engines
+from .database import engine as primary_engine
+
+logger = logging.getLogger(__name__)
+
+ACTOR_KEY = "actor_id"
+_WROTE_KEY = "replica_wrote"
+
+
+def _is_replica_failure(error: exc.DBAPIError) -> bool:
+    return error.connection_invalidated or isinstance(error, exc.OperationalError)
+
+
+class ReplicaSession(Session):
+    """Reads from a replica; after a replica failure, retries and continues on the primary."""
+
+    def __init__(self, *args: Any, replica: "Replica", primary_bind, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self.primary_bind = primary_bind
+        self.on_primary = False
+
+    def get_bind(self, *args: Any, **kwargs: Any):
+        return self.primary_bind if self.on_primary else super().get_bind(*args, **kwargs)
+
+    def execute(self, statement, *args: Any, **kwargs: Any):
+        try:
+            return super().execute(statement, *args, **kwargs)
+        except exc.DBAPIError as error:
+            if self.on_primary or not _is_replica_failure(error):
+                raise
+            # The handle_error listener has ejected the replica; this session is read-only, so nothing is lost.
+            logger.warning("Read on %s failed; retrying on the primary", self.replica.name)
+            self.rollback()
+            self.on_primary = True
+            self.replica.failovers += 1
+            return super().execute(statement, *args, **kwargs)
+
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = make_url(url).render_as_string(hide_password=True)
+        self.engine, self.async_engine = create_engines(url)
+        self.session_factory = sessionmaker(
+            bind=self.engine,
+            class_=ReplicaSession,
+            replica=self,
+            primary_bind=primary_engine,
+            autocommit=False,
+            autoflush=False,
+        )
+        self.async_session_factory = async_sessionmaker(
+            bind=self.async_engine,
+            sync_session_class=ReplicaSession,
+            replica=self,
+            primary_bind=primary_async_engine.sync_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.failovers = 0
+        for target in (self.engine, self.async_engine.sync_engine):
+            event.listen(target, "handle_error", self._on_error)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    def eject(self) -> None:
+        self.ejected_until = time.monotonic() + settings.replica_eject_seconds
+        self.ejections += 1
+        logger.warning("Ejecting read replica %s for %.0fs", self.name, settings.replica_eject_seconds)
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+            self.eject()
+
+    def stats(self) -> dict[str, Any]:
+        pool = self.engine.pool
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "ejections": self.ejections,
+            "failovers": self.failovers,
+            "pool": pool.stats() if hasattr(pool, "stats") else None,
+        }
+
+
+class ReplicaRouter:
+    def __init__(self, urls: list[str]):
+        self.replicas = [Replica(f"replica-{index}", url) for index, url in enumerate(urls)]
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._recent_writers = TTLCache(maxsize=10000, ttl=settings.read_your_writes_seconds)
+        self.primary_fallbacks = 0
+
+    def choose(self, user_id: int | None = None) -> Replica | None:
+        """Next healthy replica, or ``None`` to read from the primary."""
+        if not self.replicas:
+            return None
+        if user_id is not None and self._recent_writers.get(user_id):
+            return None
+        with self._lock:
+            start = next(self._counter)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.healthy:
+                return replica
+        self.primary_fallbacks += 1
+        return None
+
+    def note_write(self, user_id: int) -> None:
+        if self.replicas:
+            self._recent_writers.set(user_id, True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "replicas": {replica.name: replica.stats() for replica in self.replicas},
+            "primary_fallbacks": self.primary_fallbacks,
+            "sticky_users": self._recent_writers.stats()["size"],
+        }
+
+
+replica_router = ReplicaRouter(settings.database_replica_urls)
+
+
+def _mark_wrote(session: Session) -> None:
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    _mark_wrote(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_write(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_wrote(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _stick_to_primary(session: Session) -> None:
+    actor_id = session.info.get(ACTOR_KEY)
+    if session.info.pop(_WROTE_KEY, False) and actor_id is not None:
+        replica_router.note_write(actor_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop(_WROTE_KEY, None)
@@ -1,5 +1,10 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Callable
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -9,18 +14,128 @@ from .config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def hash_password(password: str) -> str:
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the password hashing pool has no free slot for another job."""
+
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def create_access_token(subject: str | int, expires_minutes: int | None = None) -> str:
+class PasswordHashPool:
+    """Runs bcrypt in a dedicated process pool so it neither holds the GIL nor
+    starves the request threadpool.
+
+    At most ``max_pending`` jobs may be running or queued; further callers get
+    ``PasswordHasherBusy`` immediately instead of tying up a request thread.
+    A caller that waits longer than ``timeout`` also gets ``PasswordHasherBusy``,
+    but its job keeps its slot until the worker actually finishes it.
+    ``workers=0`` hashes inline on the calling thread (still bounded).
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_pending = 0
+        self.busy_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: forking a multi-threaded server process can deadlock.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("Password hashing capacity exhausted")
+
+        with self._lock:
+            self._pending += 1
+            self.peak_pending = max(self.peak_pending, self._pending)
+        started = time.perf_counter()
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._finish(started)
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._finish(started)
+            raise
+        future.add_done_callback(lambda _: self._finish(started))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError as exc:
+            raise PasswordHasherBusy("Password hashing timed out") from exc
+
+    def _finish(self, started: float) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+            self.busy_seconds += time.perf_counter() - started
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_seconds": round(self.busy_seconds / self.completed, 4) if self.completed else 0.0,
+            }
+
+
+password_pool = PasswordHashPool(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    timeout=settings.password_hash_timeout_seconds,
+)
+
+
+def hash_password(password: str) -> str:
+    return password_pool.run(_hash, password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_pool.run(_verify, plain_password, hashed_password)
+
+
+def create_access_token(
+    subject: str | int,
+    expires_minutes: int | None = None,
+    claims: dict[str, Any] | None = None,
+) -> str:
     expire_delta = timedelta(minutes=expires_minutes or settings.access_token_exp_minutes)
     expire_at = datetime.utcnow() + expire_delta
-    payload: dict[str, Any] = {"exp": expire_at, "sub": str(subject)}
+    payload: dict[str, Any] = {**(claims or {}), "exp": expire_at, "sub": str(subject)}
     return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
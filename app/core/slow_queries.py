@@ -0,0 +1,152 @@
+"""Slow-query log with sampled EXPLAIN capture.
+
+Statements slower than ``SLOW_QUERY_MS`` are logged with their shape, bound
+parameter types and calling route, and kept in an in-memory ring buffer
+(``/admin/slow-queries``). On Postgres a sample of slow SELECTs is re-run as
+``EXPLAIN (ANALYZE, BUFFERS)`` on a separate connection in a background
+thread, so the request that hit the slow query is not delayed further.
+Locking reads (``FOR UPDATE``/``FOR SHARE``) only get a plain ``EXPLAIN``:
+re-running them would take real row locks, blocking behind the original
+transaction or making concurrent workers skip rows.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .query_stats import current_request_stats, statement_shape
+
+logger = logging.getLogger(__name__)
+
+_SKIP_OPTION = "skip_slow_query_log"
+_LOCKING_CLAUSE = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?UPDATE\b|\bFOR\s+(?:KEY\s+)?SHARE\b", re.IGNORECASE)
+
+
+def explain_command(statement: str) -> str:
+    """``EXPLAIN (ANALYZE, BUFFERS)``, or plain ``EXPLAIN`` for statements that would take row locks."""
+    return "EXPLAIN" if _LOCKING_CLAUSE.search(statement) else "EXPLAIN (ANALYZE, BUFFERS)"
+
+
+@dataclass
+class SlowQuery:
+    at: str
+    duration_ms: float
+    shape: str
+    param_types: Any
+    route: str | None
+    plan: str | None = None
+    plan_status: str = field(default="not_sampled")
+
+
+class SlowQueryLog:
+    def __init__(self, maxsize: int):
+        self._entries: deque[SlowQuery] = deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+        self._explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        # At most one queued plan behind the running one; extra samples are dropped.
+        self._explain_slots = threading.BoundedSemaphore(2)
+
+    def add(self, entry: SlowQuery) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self, limit: int | None = None) -> list[dict[str, Any]]:
+        with self._lock:
+            recent = list(reversed(self._entries))
+        return [asdict(entry) for entry in recent[:limit]]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def schedule_explain(self, entry: SlowQuery, engine: Engine, statement: str, parameters: Any) -> None:
+        if not self._explain_slots.acquire(blocking=False):
+            entry.plan_status = "dropped"
+            return
+        entry.plan_status = "pending"
+
+        def run() -> None:
+            try:
+                with engine.connect().execution_options(**{_SKIP_OPTION: True}) as conn:
+                    rows = conn.exec_driver_sql(f"{explain_command(statement)} {statement}", parameters).all()
+                    conn.rollback()
+                entry.plan = "\n".join(row[0] for row in rows)
+                entry.plan_status = "captured"
+            except Exception as exc:  # pragma: no cover - depends on the live database
+                entry.plan_status = f"failed: {exc.__class__.__name__}"
+                logger.warning("EXPLAIN for slow query failed: %s", exc)
+            finally:
+                self._explain_slots.release()
+
+        self._explainer.submit(run)
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_buffer_size)
+
+
+def _param_types(parameters: Any) -> Any:
+    if isinstance(parameters, list):  # executemany: the first row is representative
+        parameters = parameters[0] if parameters else ()
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def _explain_engine(conn) -> Engine | None:
+    if conn.dialect.name != "postgresql":
+        return None
+    if conn.dialect.is_async:
+        # Async engines can't be driven from a plain thread; the sync primary speaks the same SQL.
+        from .database import engine
+
+        return engine
+    return conn.engine
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_slow_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    if settings.slow_query_ms > 0 and context is not None:
+        context._slow_query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _log_slow_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_slow_query_started", None)
+    if started is None or context.execution_options.get(_SKIP_OPTION):
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms < settings.slow_query_ms:
+        return
+
+    stats = current_request_stats()
+    entry = SlowQuery(
+        at=datetime.now(timezone.utc).isoformat(),
+        duration_ms=round(duration_ms, 2),
+        shape=statement_shape(statement),
+        param_types=_param_types(parameters),
+        route=stats.route if stats is not None else None,
+    )
+    logger.warning(
+        "Slow query %.1fms on %s: %s params=%s", entry.duration_ms, entry.route or "-", entry.shape, entry.param_types
+    )
+    slow_query_log.add(entry)
+
+    explain_engine = _explain_engine(conn)
+    if (
+        explain_engine is not None
+        and not executemany
+        and statement.lstrip().upper().startswith("SELECT")
+        and random.random() < settings.slow_query_explain_sample_rate
+    ):
+        slow_query_log.schedule_explain(entry, explain_engine, statement, parameters)
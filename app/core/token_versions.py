@@ -0,0 +1,74 @@
+"""Per-user token versions used to revoke claims-bearing access tokens.
+
+Access tokens issued with ``JWT_EMBED_CLAIMS`` carry a ``ver`` claim. A token
+is only honoured while its version equals ``users.token_version``, so bumping
+the column revokes every outstanding token at once. The bump happens in the
+same transaction as the role, status or logout-all change, so it survives
+restarts and is seen by every worker.
+
+Reading the column on every request would defeat claims mode, so the store
+caches versions for ``PRINCIPAL_CACHE_TTL_SECONDS``. The committing worker
+forgets its entry immediately; other workers and instances may honour a
+revoked token until their entry expires, the same bound the principal cache
+already has. ``TOKEN_VERSION_BACKEND`` can point at a store that shares or
+pushes invalidations (e.g. Redis) to close that window.
+"""
+
+import importlib
+import threading
+from typing import Protocol
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import User
+from .cache import TTLCache
+
+
+class TokenVersionStore(Protocol):
+    def current(self, db: Session, user_id: int) -> int | None: ...
+
+    def remember(self, user_id: int, version: int) -> None: ...
+
+    def forget(self, user_id: int) -> None: ...
+
+
+class CachedTokenVersionStore:
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self._versions = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def current(self, db: Session, user_id: int) -> int | None:
+        """The user's version, or ``None`` if the user no longer exists."""
+        version = self._versions.get(user_id)
+        if version is None:
+            version = db.execute(select(User.token_version).where(User.id == user_id)).scalar()
+            if version is not None:
+                self._versions.set(user_id, version)
+        return version
+
+    def remember(self, user_id: int, version: int) -> None:
+        self._versions.set(user_id, version)
+
+    def forget(self, user_id: int) -> None:
+        self._versions.pop(user_id)
+
+    def clear(self) -> None:
+        self._versions.clear()
+
+
+_store: TokenVersionStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_token_version_store() -> TokenVersionStore:
+    global _store
+    if _store is None:
+        from .config import settings
+
+        with _store_lock:
+            if _store is None:
+                module_name, _, class_name = settings.token_version_backend.rpartition(".")
+                _store = getattr(importlib.import_module(module_name), class_name)(
+                    ttl=settings.principal_cache_ttl_seconds, maxsize=settings.principal_cache_max_entries
+                )
+    return _store
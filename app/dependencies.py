@@ -1,27 +1,41 @@
-from fastapi import Depends, HTTPException, status
+import secrets
+
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .core.database import get_db
+from .core.config import settings
+from .core.database import get_async_db, get_db
+from .core.principals import Principal, load_principal, principal_from_claims
+from .core.replicas import ACTOR_KEY, replica_router
 from .core.security import decode_access_token
-from .models import User
 
 
 auth_scheme = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(auth_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    if credentials is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+def get_token_payload(credentials: HTTPAuthorizationCredentials | None = Depends(auth_scheme)) -> dict | None:
+    """The decoded bearer token, or ``None`` when absent or invalid.
 
-    token = credentials.credentials
+    FastAPI caches dependencies per request, so the user lookup and the read
+    replica choice share one decode.
+    """
+    if credentials is None:
+        return None
     try:
-        payload = decode_access_token(token)
-    except ValueError as exc:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+        return decode_access_token(credentials.credentials)
+    except ValueError:
+        return None
+
+
+def _resolve_current_user(
+    db: Session, credentials: HTTPAuthorizationCredentials | None, payload: dict | None
+) -> Principal:
+    if credentials is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    if payload is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
     subject = payload.get("sub")
     if subject is None:
@@ -32,27 +46,25 @@ def get_current_user(
     except (TypeError, ValueError) as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
 
-    user = db.query(User).filter(User.id == user_id).first()
+    try:
+        user = principal_from_claims(db, user_id, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked") from exc
+    if user is None:
+        user = load_principal(db, user_id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
     if not user.active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account not verified")
 
+    # Lets a commit on this session pin the user's reads to the primary (see core.replicas).
+    db.info[ACTOR_KEY] = user.id
     return user
 
 
-def get_current_user_optional(
-    credentials: HTTPAuthorizationCredentials = Depends(auth_scheme),
-    db: Session = Depends(get_db),
-) -> User | None:
-    if credentials is None:
-        return None
-
-    token = credentials.credentials
-    try:
-        payload = decode_access_token(token)
-    except ValueError:
+def _resolve_optional_user(db: Session, payload: dict | None) -> Principal | None:
+    if payload is None:
         return None
 
     subject = payload.get("sub")
@@ -64,17 +76,96 @@ def get_current_user_optional(
     except (TypeError, ValueError):
         return None
 
-    user = db.query(User).filter(User.id == user_id).first()
+    try:
+        user = principal_from_claims(db, user_id, payload) or load_principal(db, user_id)
+    except ValueError:
+        return None
     if user is None or not user.active:
         return None
 
+    db.info[ACTOR_KEY] = user.id
     return user
 
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(auth_scheme),
+    payload: dict | None = Depends(get_token_payload),
+    db: Session = Depends(get_db),
+) -> Principal:
+    return _resolve_current_user(db, credentials, payload)
+
+
+def get_current_user_optional(
+    payload: dict | None = Depends(get_token_payload),
+    db: Session = Depends(get_db),
+) -> Principal | None:
+    return _resolve_optional_user(db, payload)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(auth_scheme),
+    payload: dict | None = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    return await db.run_sync(_resolve_current_user, credentials, payload)
+
+
+async def get_current_user_optional_async(
+    payload: dict | None = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal | None:
+    return await db.run_sync(_resolve_optional_user, payload)
+
+
+def _token_user_id(payload: dict | None) -> int | None:
+    if payload is None:
+        return None
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def get_read_db(payload: dict | None = Depends(get_token_payload), primary: Session = Depends(get_db)):
+    """Session for read-only routes: a healthy replica unless the caller just wrote.
+
+    Without a replica this is the request's own primary session, so a read
+    route holds one pool connection rather than one per session.
+    """
+    replica = replica_router.choose(_token_user_id(payload))
+    if replica is None:
+        yield primary
+        return
+    db = replica.session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(
+    payload: dict | None = Depends(get_token_payload),
+    primary: AsyncSession = Depends(get_async_db),
+):
+    replica = replica_router.choose(_token_user_id(payload))
+    if replica is None:
+        yield primary
+        return
+    async with replica.async_session_factory() as db:
+        yield db
+
+
 def require_roles(*roles: str):
-    def dependency(user: User = Depends(get_current_user)) -> User:
+    def dependency(user: Principal = Depends(get_current_user)) -> Principal:
         if user.role not in roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient role")
         return user
 
     return dependency
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    if not settings.admin_api_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.admin_api_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
@@ -1,10 +1,37 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+
 from .core.config import settings
-from .core.database import Base, engine
-from .routers import auth, dashboard, health, kyc, leases, maintenance, properties, tenants, units
+from .core.database import Base, async_engine, engine, warm_async_pool, warm_sync_pool
+from .core.query_stats import QueryStatsMiddleware
+from .core.security import password_pool
+from .routers import admin, auth, dashboard, health, kyc, leases, maintenance, properties, tenants, units
+
+logger = logging.getLogger(__name__)
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.db_create_all_on_startup:
+        # Convenience for local development; deployed environments rely on `alembic upgrade head`.
+        await run_in_threadpool(Base.metadata.create_all, bind=engine)
+    if settings.db_pool_warm_connections > 0:
+        try:
+            await run_in_threadpool(warm_sync_pool, settings.db_pool_warm_connections)
+            await warm_async_pool(settings.db_pool_warm_connections)
+        except Exception as exc:
+            logger.warning("Connection pool warm-up failed: %s", exc)
+    yield
+    password_pool.shutdown()
+    engine.dispose()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,10 +39,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor", "Idempotent-Replayed"],
 )
-
-# Create metadata tables on startup (migrations will take over later)
-Base.metadata.create_all(bind=engine)
+app.add_middleware(QueryStatsMiddleware)
 
 app.include_router(health.router)
 app.include_router(auth.router)
@@ -26,6 +52,7 @@ app.include_router(leases.router)
 app.include_router(maintenance.router)
 app.include_router(dashboard.router)
 app.include_router(kyc.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def root():
@@ -1,11 +1,17 @@
 from .user import User  # noqa: F401
 from .estate import (  # noqa: F401
     AuditLog,
+    DailyPortfolioMetrics,
+    EmailOutbox,
     Lease,
     MaintenanceRequest,
     Payment,
+    PaymentAllocation,
+    PaymentReconciliationItem,
     Property,
     PropertyManager,
+    PropertyMetricsRollup,
+    RefreshToken,
     RentInvoice,
     Tenant,
     TenantDocument,
@@ -20,6 +26,8 @@ __all__ = [
     "User",
     "Property",
     "PropertyManager",
+    "PropertyMetricsRollup",
+    "DailyPortfolioMetrics",
     "Unit",
     "Tenant",
     "TenantDocument",
@@ -29,7 +37,11 @@ __all__ = [
     "Lease",
     "RentInvoice",
     "Payment",
+    "PaymentAllocation",
+    "PaymentReconciliationItem",
     "MaintenanceRequest",
     "AuditLog",
     "UserVerificationToken",
+    "RefreshToken",
+    "EmailOutbox",
 ]
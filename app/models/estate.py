@@ -5,6 +5,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -20,6 +21,7 @@ from ..core.database import Base
 
 class Property(Base):
     __tablename__ = "properties"
+    __table_args__ = (Index("ix_properties_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -33,8 +35,8 @@ class Property(Base):
     address_line_2 = Column(String(255))
     city = Column(String(120))
     country = Column(String(120))
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     notes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -54,6 +56,38 @@ class Property(Base):
     maintenance_requests = relationship("MaintenanceRequest", back_populates="property")
 
 
+class PropertyMetricsRollup(Base):
+    __tablename__ = "property_metrics"
+
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+    units_total = Column(Integer, nullable=False, server_default=text("0"))
+    units_occupied = Column(Integer, nullable=False, server_default=text("0"))
+    pending_kyc = Column(Integer, nullable=False, server_default=text("0"))
+    monthly_revenue = Column(Numeric(14, 2), nullable=False, server_default=text("0"))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DailyPortfolioMetrics(Base):
+    """One row per property per day; per-owner figures are sums over ``owner_id``."""
+
+    __tablename__ = "daily_portfolio_metrics"
+    __table_args__ = (
+        UniqueConstraint("snapshot_date", "property_id", name="uq_daily_portfolio_metrics_date_property"),
+        Index("ix_daily_portfolio_metrics_owner_date", "owner_id", "snapshot_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_date = Column(Date, nullable=False)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    tenants = Column(Integer, nullable=False, server_default=text("0"))
+    active_leases = Column(Integer, nullable=False, server_default=text("0"))
+    monthly_revenue = Column(Numeric(14, 2), nullable=False, server_default=text("0"))
+    # KYC status has no history, so backfilled days leave this empty.
+    pending_kyc = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class PropertyManager(Base):
     __tablename__ = "property_managers"
     __table_args__ = (
@@ -62,7 +96,7 @@ class PropertyManager(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     role = Column(
         Enum("owner", "manager", "caretaker", name="property_user_role_enum"),
         nullable=False,
@@ -102,11 +136,14 @@ class Unit(Base):
 
 class Tenant(Base):
     __tablename__ = "tenants"
+    __table_args__ = (Index("ix_tenants_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String(255), nullable=False)
     email = Column(String(255), unique=True, index=True)
     phone = Column(String(50), unique=True, index=True)
+    # E.164 form of ``phone``, kept in sync by app.services.search for indexed lookups.
+    phone_e164 = Column(String(20), index=True)
     id_number = Column(String(50), unique=True)
     date_of_birth = Column(Date)
     gender = Column(
@@ -128,6 +165,8 @@ class Tenant(Base):
     kyc_reviewed_at = Column(DateTime(timezone=True))
     kyc_override = Column(Boolean, nullable=False, server_default=text("false"))
     kyc_notes = Column(Text)
+    # Keeps a tenant visible to the owner or manager who added them until they have a lease.
+    created_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -145,6 +184,7 @@ class Tenant(Base):
     )
     audit_logs = relationship("AuditLog", back_populates="tenant")
     kyc_reviewer = relationship("User", foreign_keys=[kyc_reviewed_by_id])
+    created_by = relationship("User", foreign_keys=[created_by_id])
     invites = relationship(
         "TenantInvite",
         back_populates="tenant",
@@ -202,10 +242,11 @@ class TenantKycSession(Base):
 
 class Lease(Base):
     __tablename__ = "leases"
+    __table_args__ = (Index("ix_leases_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     unit_id = Column(Integer, ForeignKey("units.id", ondelete="CASCADE"), nullable=False)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date)
     rent_amount = Column(Numeric(12, 2), nullable=False)
@@ -231,6 +272,16 @@ class Lease(Base):
 
 class RentInvoice(Base):
     __tablename__ = "rent_invoices"
+    __table_args__ = (
+        Index("ix_rent_invoices_lease_period", "lease_id", "period_start", unique=True),
+        # Only invoices the overdue sweeper still has to look at.
+        Index(
+            "ix_rent_invoices_open_due_date",
+            "due_date",
+            postgresql_where=text("status IN ('pending', 'partial')"),
+            sqlite_where=text("status IN ('pending', 'partial')"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     lease_id = Column(Integer, ForeignKey("leases.id", ondelete="CASCADE"), nullable=False)
@@ -258,9 +309,22 @@ class RentInvoice(Base):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Lump sums with credit still to spend; the allocator only ever looks at these.
+        Index(
+            "ix_payments_open_credit",
+            "lease_id",
+            "tenant_id",
+            postgresql_where=text("unallocated > 0"),
+            sqlite_where=text("unallocated > 0"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    invoice_id = Column(Integer, ForeignKey("rent_invoices.id", ondelete="CASCADE"), nullable=False)
+    # Set for a payment against one invoice; lump sums carry lease_id or tenant_id and are split by allocations.
+    invoice_id = Column(Integer, ForeignKey("rent_invoices.id", ondelete="CASCADE"), nullable=True)
+    lease_id = Column(Integer, ForeignKey("leases.id", ondelete="CASCADE"), nullable=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=True)
     amount = Column(Numeric(12, 2), nullable=False)
     paid_on = Column(Date, nullable=False)
     method = Column(
@@ -269,19 +333,71 @@ class Payment(Base):
         server_default="cash",
     )
     reference = Column(String(120))
+    # Idempotency-Key header, "ref:<receipt>", or "<invoice|lease|tenant>:<id>:ref:<reference>" for other
+    # references; retries with the same key replay the original.
+    idempotency_key = Column(String(255), unique=True, index=True)
+    # Lump-sum credit not yet allocated to an invoice; NULL for single-invoice payments.
+    unallocated = Column(Numeric(12, 2))
     received_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     notes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     invoice = relationship("RentInvoice", back_populates="payments")
     received_by = relationship("User")
+    allocations = relationship("PaymentAllocation", back_populates="payment", cascade="all, delete-orphan")
+
+
+class PaymentAllocation(Base):
+    """The part of a lump-sum payment credited to one invoice."""
+
+    __tablename__ = "payment_allocations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    payment_id = Column(Integer, ForeignKey("payments.id", ondelete="CASCADE"), nullable=False, index=True)
+    invoice_id = Column(Integer, ForeignKey("rent_invoices.id", ondelete="CASCADE"), nullable=False, index=True)
+    amount = Column(Numeric(12, 2), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    payment = relationship("Payment", back_populates="allocations")
+    invoice = relationship("RentInvoice")
+
+
+class PaymentReconciliationItem(Base):
+    """A statement line the payment import could not match to an invoice."""
+
+    __tablename__ = "payment_reconciliation_queue"
+    __table_args__ = (
+        UniqueConstraint("source", "line_no", name="uq_payment_reconciliation_source_line"),
+        Index("ix_payment_reconciliation_status_created", "status", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(80), nullable=False)
+    line_no = Column(Integer, nullable=False)
+    reference = Column(String(120))
+    phone = Column(String(50))
+    account = Column(String(120))
+    amount = Column(Numeric(12, 2))
+    paid_on = Column(Date)
+    reason = Column(String(32), nullable=False)
+    raw = Column(Text, nullable=False)
+    status = Column(
+        Enum("open", "resolved", "ignored", name="payment_reconciliation_status_enum"),
+        nullable=False,
+        server_default="open",
+    )
+    payment_id = Column(Integer, ForeignKey("payments.id", ondelete="SET NULL"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True))
+
+    payment = relationship("Payment")
 
 
 class MaintenanceRequest(Base):
     __tablename__ = "maintenance_requests"
 
     id = Column(Integer, primary_key=True, index=True)
-    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False, index=True)
     unit_id = Column(Integer, ForeignKey("units.id", ondelete="SET NULL"))
     tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="SET NULL"))
     title = Column(String(255), nullable=False)
@@ -382,3 +498,41 @@ class UserVerificationToken(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="verification_tokens")
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # SHA-256 of the opaque token; the raw value is only ever held by the client.
+    token_hash = Column(String(64), nullable=False, unique=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True))
+    replaced_by_id = Column(Integer, ForeignKey("refresh_tokens.id", ondelete="SET NULL"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User")
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_body = Column(Text, nullable=False)
+    text_body = Column(Text, nullable=False)
+    status = Column(
+        Enum("pending", "sent", "failed", name="email_outbox_status"),
+        nullable=False,
+        default="pending",
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Boolean, Enum, Index, func, text
 from sqlalchemy.orm import relationship
 
 from ..core.database import Base
@@ -16,6 +16,8 @@ class User(Base):
         default="owner",
     )
     active = Column(Boolean, default=True)
+    # Bumped with every role or status change and on logout-all; claims tokens carry it as "ver".
+    token_version = Column(Integer, nullable=False, default=0, server_default=text("0"))
 
     managed_properties = relationship("PropertyManager", back_populates="user")
     audit_logs = relationship("AuditLog", back_populates="actor")
@@ -24,3 +26,5 @@ class User(Base):
         back_populates="user",
         cascade="all, delete-orphan",
     )
+
+    __table_args__ = (Index("ix_users_email_lower", func.lower(email), unique=True),)
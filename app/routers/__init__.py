@@ -1,6 +1,7 @@
-from . import auth, dashboard, health, kyc, leases, maintenance, properties, tenants, units
+from . import admin, auth, dashboard, health, kyc, leases, maintenance, properties, tenants, units
 
 __all__ = [
+    "admin",
     "auth",
     "dashboard",
     "health",
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Query
+
+from ..core.config import settings
+from ..core.counting import count_cache_stats
+from ..core.database import pool_stats
+from ..core.principals import principal_cache_stats
+from ..core.replicas import replica_router
+from ..core.security import password_pool
+from ..core.slow_queries import slow_query_log
+from ..dependencies import require_admin
+from ..services.access import access_scope_cache_stats
+from ..services.dashboard import dashboard_cache
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/metrics")
+def metrics():
+    return {
+        "principal_cache": principal_cache_stats(),
+        "count_cache": count_cache_stats(),
+        "password_hashing": password_pool.stats(),
+        "dashboard_cache": dashboard_cache.stats(),
+        "access_scope_cache": access_scope_cache_stats(),
+    }
+
+
+@router.get("/db/pool")
+def db_pool():
+    return {**pool_stats(), "replication": replica_router.stats()}
+
+
+@router.get("/slow-queries")
+def slow_queries(limit: int = Query(default=50, ge=1, le=500)):
+    return {"threshold_ms": settings.slow_query_ms, "items": slow_query_log.entries(limit)}
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
@@ -2,16 +2,27 @@ from datetime import datetime, timedelta, timezone
 import secrets
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from ..core.config import settings
 from ..core.database import get_db
-from ..core.security import create_access_token, hash_password, verify_password
+from ..core.principals import Principal, access_token_claims, bump_token_version, load_principal
+from ..core.security import PasswordHasherBusy, create_access_token, hash_password, verify_password
+from ..dependencies import get_current_user
 from ..models import User, UserVerificationToken
-from ..services.email import send_verification_email
+from ..services.email import enqueue_verification_email
+from ..services.refresh_tokens import (
+    RefreshTokenError,
+    issue_refresh_token,
+    revoke_refresh_token,
+    revoke_user_refresh_tokens,
+    rotate_refresh_token,
+)
+from ..services.users import get_user_by_email, normalize_email
 from ..schemas import (
     LoginRequest,
+    RefreshTokenRequest,
     ResendVerificationRequest,
     ResendVerificationResponse,
     SignupRequest,
@@ -27,12 +38,16 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 VERIFICATION_EXPIRY_HOURS = 24
 
 
-def _normalize_email(email: str) -> str:
-    return email.strip().lower()
+def _build_user_info(user: User | Principal) -> UserInfo:
+    return UserInfo(id=user.id, email=user.email, role=user.role, active=user.active)
 
 
-def _build_user_info(user: User) -> UserInfo:
-    return UserInfo(id=user.id, email=user.email, role=user.role, active=user.active)
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is temporarily busy, please retry",
+        headers={"Retry-After": str(settings.password_hash_retry_after_seconds)},
+    )
 
 
 def _issue_verification_token(user: User, db: Session) -> UserVerificationToken:
@@ -50,27 +65,37 @@ def _issue_verification_token(user: User, db: Session) -> UserVerificationToken:
 
 @router.post("/signup", response_model=SignupResponse, status_code=status.HTTP_201_CREATED)
 def signup(payload: SignupRequest, db: Session = Depends(get_db)):
-    email = _normalize_email(payload.email)
+    email = normalize_email(payload.email)
 
-    existing = db.query(User).filter(func.lower(User.email) == email).first()
+    existing = get_user_by_email(db, email)
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
 
+    try:
+        password_hash = hash_password(payload.password)
+    except PasswordHasherBusy as exc:
+        raise _hasher_busy() from exc
+
     user = User(
         email=email,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
         role=payload.role,
         active=False,
     )
     db.add(user)
-    db.flush()
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        # Lost a race with a concurrent signup; ix_users_email_lower caught it.
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered") from exc
 
     verification = _issue_verification_token(user, db)
+    enqueue_verification_email(db, user.email, verification.token, verification.expires_at)
 
     db.commit()
     db.refresh(user)
 
-    sent = send_verification_email(user.email, verification.token, verification.expires_at)
     debug_token = verification.token if settings.emit_debug_tokens else None
 
     return SignupResponse(
@@ -78,7 +103,7 @@ def signup(payload: SignupRequest, db: Session = Depends(get_db)):
         email=user.email,
         role=user.role,
         active=user.active,
-        verification_sent=sent,
+        verification_sent=True,
         verification_expires_at=verification.expires_at,
         debug_token=debug_token,
     )
@@ -86,18 +111,58 @@ def signup(payload: SignupRequest, db: Session = Depends(get_db)):
 
 @router.post("/login", response_model=TokenResponse)
 def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    email = _normalize_email(payload.email)
-
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+    user = get_user_by_email(db, payload.email)
+    try:
+        valid = user is not None and verify_password(payload.password, user.password_hash)
+    except PasswordHasherBusy as exc:
+        raise _hasher_busy() from exc
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     if not user.active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Email verification required")
 
-    token = create_access_token(subject=user.id)
+    token = create_access_token(subject=user.id, claims=access_token_claims(Principal.from_user(user)))
+    refresh_token, _ = issue_refresh_token(db, user.id)
+    db.commit()
+
+    return TokenResponse(access_token=token, refresh_token=refresh_token, user=_build_user_info(user))
+
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
+    try:
+        refresh_token, replacement = rotate_refresh_token(db, payload.refresh_token)
+    except RefreshTokenError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
+
+    user = load_principal(db, replacement.user_id)
+    if user is None or not user.active:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Account unavailable")
 
-    return TokenResponse(access_token=token, user=_build_user_info(user))
+    db.commit()
+    token = create_access_token(subject=user.id, claims=access_token_claims(user))
+
+    return TokenResponse(access_token=token, refresh_token=refresh_token, user=_build_user_info(user))
+
+
+@router.post("/logout")
+def logout(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
+    revoke_refresh_token(db, payload.refresh_token)
+    db.commit()
+
+    return {"message": "Logged out"}
+
+
+@router.post("/logout-all")
+def logout_all(db: Session = Depends(get_db), user=Depends(get_current_user)):
+    revoked = revoke_user_refresh_tokens(db, user.id)
+    # Also retire claims-bearing access tokens that would otherwise live until expiry.
+    bump_token_version(db, user.id)
+    db.commit()
+
+    return {"message": "All sessions revoked", "revoked": revoked}
 
 
 @router.post("/verify-email", response_model=VerifyEmailResponse)
@@ -146,9 +211,7 @@ def verify_email(payload: VerifyEmailRequest, db: Session = Depends(get_db)):
 
 @router.post("/resend-verification", response_model=ResendVerificationResponse)
 def resend_verification(payload: ResendVerificationRequest, db: Session = Depends(get_db)):
-    email = _normalize_email(payload.email)
-
-    user = db.query(User).filter(func.lower(User.email) == email).first()
+    user = get_user_by_email(db, payload.email)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -171,14 +234,14 @@ def resend_verification(payload: ResendVerificationRequest, db: Session = Depend
     )
 
     verification = _issue_verification_token(user, db)
+    enqueue_verification_email(db, user.email, verification.token, verification.expires_at)
     db.commit()
 
-    sent = send_verification_email(user.email, verification.token, verification.expires_at)
     debug_token = verification.token if settings.emit_debug_tokens else None
 
     return ResendVerificationResponse(
         message="Verification email reissued",
-        verification_sent=sent,
+        verification_sent=True,
         expires_at=verification.expires_at,
         debug_token=debug_token,
     )
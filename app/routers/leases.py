@@ -1,21 +1,35 @@
 from datetime import date
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..core.database import get_db
-from ..dependencies import get_current_user, require_roles
-from ..models import Lease, Payment, RentInvoice, Tenant, Unit
+from ..core.pagination import keyset_page, order_keyset, seek_keyset
+from ..dependencies import get_async_read_db, get_current_user, get_current_user_async, get_read_db, require_roles
+from ..models import Lease, RentInvoice, Tenant, Unit
 from ..schemas import (
+    BillingRunCreate,
+    BillingRunOut,
     LeaseCreate,
     LeaseOut,
+    LeaseQuery,
     LeaseUpdate,
+    PaymentAllocationOut,
     PaymentCreate,
+    PaymentImportReport,
     PaymentOut,
     RentInvoiceCreate,
     RentInvoiceOut,
 )
+from ..services.access import accessible_property_ids, accessible_unit_ids
+from ..services.allocation import PayerNotFound, apply_lump_sum
+from ..services.billing import run_billing
+from ..services.payment_import import ImportReport, PaymentImport, StatementParser, stream_lines
+from ..services.payments import IdempotencyConflict, InvoiceNotFound, apply_payment
 
 router = APIRouter(prefix="/leases", tags=["Leases"])
 
@@ -38,9 +52,45 @@ def _lease_to_schema(lease: Lease, tenant: Tenant | None, unit: Unit | None) ->
     )
 
 
+def _with_parties(db: Session):
+    """Leases joined to their tenant and unit, in one round trip."""
+    return (
+        db.query(Lease, Tenant, Unit)
+        .outerjoin(Tenant, Tenant.id == Lease.tenant_id)
+        .outerjoin(Unit, Unit.id == Lease.unit_id)
+    )
+
+
 @router.get("/", response_model=list[LeaseOut])
-def list_leases(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    leases = db.query(Lease).order_by(Lease.created_at.desc()).limit(100).all()
+async def list_leases(
+    response: Response,
+    query: LeaseQuery = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    user=Depends(get_current_user_async),
+):
+    return await db.run_sync(_list_leases, user, response, query)
+
+
+def _list_leases(db: Session, user, response: Response, query: LeaseQuery) -> list[LeaseOut]:
+    descending = query.order != "asc"
+    stmt = db.query(Lease)
+    property_ids = accessible_property_ids(db, user)
+    if property_ids is not None:
+        stmt = stmt.filter(Lease.unit_id.in_(accessible_unit_ids(property_ids)))
+    stmt = order_keyset(stmt, Lease, descending)
+    if query.cursor:
+        try:
+            stmt = seek_keyset(stmt, Lease, query.cursor, descending)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+    else:
+        stmt = stmt.offset(query.offset)
+
+    leases, next_cursor = keyset_page(stmt.limit(query.limit + 1).all(), query.limit)
+    if next_cursor:
+        # The list body is kept as a bare array for existing clients, so the cursor travels in a header.
+        response.headers["X-Next-Cursor"] = next_cursor
+
     tenant_map = {t.id: t for t in db.query(Tenant).filter(Tenant.id.in_([l.tenant_id for l in leases])).all()}
     unit_map = {u.id: u for u in db.query(Unit).filter(Unit.id.in_([l.unit_id for l in leases])).all()}
     return [_lease_to_schema(l, tenant_map.get(l.tenant_id), unit_map.get(l.unit_id)) for l in leases]
@@ -67,14 +117,12 @@ def create_lease(
 
 
 @router.get("/{lease_id}", response_model=LeaseOut)
-def get_lease(lease_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    lease = db.query(Lease).filter(Lease.id == lease_id).first()
-    if not lease:
+def get_lease(lease_id: int, db: Session = Depends(get_read_db), user=Depends(get_current_user)):
+    row = _with_parties(db).filter(Lease.id == lease_id).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lease not found")
 
-    tenant = db.query(Tenant).filter(Tenant.id == lease.tenant_id).first()
-    unit = db.query(Unit).filter(Unit.id == lease.unit_id).first()
-    return _lease_to_schema(lease, tenant, unit)
+    return _lease_to_schema(*row)
 
 
 @router.patch("/{lease_id}", response_model=LeaseOut)
@@ -92,11 +140,8 @@ def update_lease(
         setattr(lease, key, value)
 
     db.commit()
-    db.refresh(lease)
 
-    tenant = db.query(Tenant).filter(Tenant.id == lease.tenant_id).first()
-    unit = db.query(Unit).filter(Unit.id == lease.unit_id).first()
-    return _lease_to_schema(lease, tenant, unit)
+    return _lease_to_schema(*_with_parties(db).filter(Lease.id == lease_id).one())
 
 
 @router.post("/{lease_id}/invoices", response_model=RentInvoiceOut, status_code=status.HTTP_201_CREATED)
@@ -129,37 +174,112 @@ def create_invoice(
     )
 
 
+@router.post("/billing-runs", response_model=BillingRunOut)
+def create_billing_run(
+    payload: BillingRunCreate,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles("owner", "manager")),
+):
+    result = run_billing(
+        db,
+        payload.period_start,
+        property_ids=accessible_property_ids(db, user),
+        batch_size=payload.batch_size,
+    )
+    return BillingRunOut(
+        period_start=result.period_start,
+        period_end=result.period_end,
+        leases_billable=result.leases_billable,
+        invoices_created=result.invoices_created,
+        already_invoiced=result.already_invoiced,
+        credit_allocated=float(result.credit_allocated),
+        invoices_credited=result.invoices_credited,
+        seconds=round(result.seconds, 3),
+        rows_per_second=result.rows_per_second,
+    )
+
+
 @router.post("/payments", response_model=PaymentOut, status_code=status.HTTP_201_CREATED)
 def create_payment(
     payload: PaymentCreate,
+    response: Response,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db),
     user=Depends(require_roles("owner", "manager", "caretaker")),
 ):
-    invoice = db.query(RentInvoice).filter(RentInvoice.id == payload.invoice_id).first()
-    if not invoice:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
-
-    payment = Payment(**payload.dict())
-    db.add(payment)
-
-    invoice.amount_paid = (invoice.amount_paid or 0) + payload.amount
-    if invoice.amount_paid >= invoice.amount_due:
-        invoice.status = "paid"
-    elif invoice.amount_paid > 0:
-        invoice.status = "partial"
-    else:
-        invoice.status = "pending"
-
-    db.commit()
-    db.refresh(payment)
+    data = payload.dict()
+    try:
+        if payload.invoice_id is not None:
+            payment, created = apply_payment(db, data, idempotency_key)
+        else:
+            payment, created = apply_lump_sum(db, data, idempotency_key)
+    except InvoiceNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found") from exc
+    except PayerNotFound as exc:
+        detail = "Lease not found" if payload.lease_id is not None else "Tenant not found"
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail) from exc
+    except IdempotencyConflict as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    if not created:
+        response.headers["Idempotent-Replayed"] = "true"
 
     return PaymentOut(
         id=payment.id,
         invoice_id=payment.invoice_id,
+        lease_id=payment.lease_id,
+        tenant_id=payment.tenant_id,
         amount=float(payment.amount),
         paid_on=payment.paid_on,
         method=payment.method,
         reference=payment.reference,
         notes=payment.notes,
         created_at=payment.created_at,
+        unallocated=float(payment.unallocated) if payment.unallocated is not None else None,
+        allocations=[
+            PaymentAllocationOut(invoice_id=allocation.invoice_id, amount=float(allocation.amount))
+            for allocation in (payment.allocations if payment.invoice_id is None else [])
+        ],
+    )
+
+
+def _import_report_out(report: ImportReport) -> PaymentImportReport:
+    return PaymentImportReport(
+        source=report.source,
+        lines=report.lines,
+        matched=report.matched,
+        queued=report.queued,
+        duplicates=report.duplicates,
+        invalid=report.invalid,
+        amount_applied=float(report.amount_applied),
+        match_rate=report.match_rate,
+        matched_by=dict(report.matched_by),
+        seconds=round(report.seconds, 3),
+        lines_per_second=report.lines_per_second,
+    )
+
+
+@router.post("/payments/import", response_model=PaymentImportReport)
+async def import_payments(
+    request: Request,
+    source: str = Query(..., min_length=1, max_length=80, description="Statement name; re-imports of one source are deduplicated"),
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    method: Literal["cash", "mobile_money", "bank_transfer", "cheque", "other"] = Query("mobile_money"),
+    db: Session = Depends(get_db),
+    user=Depends(require_roles("owner", "manager")),
+):
+    # The body is consumed as it arrives; only one batch of lines is held at a time.
+    importer = await run_in_threadpool(
+        lambda: PaymentImport(db, source, method=method, property_ids=accessible_property_ids(db, user))
     )
+    parser = StatementParser(format)
+    block: list[str] = []
+    async for line in stream_lines(request.stream()):
+        block.append(line)
+        if len(block) >= importer.batch_size:
+            await run_in_threadpool(importer.process, parser.parse(block))
+            block = []
+    await run_in_threadpool(importer.process, parser.parse(block))
+    report = await run_in_threadpool(importer.finish)
+    return _import_report_out(report)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..core.database import get_db
-from ..dependencies import get_current_user, require_roles
+from ..dependencies import get_async_read_db, get_current_user_async, require_roles
 from ..models import MaintenanceRequest, Property, Tenant, Unit
 from ..schemas import (
     MaintenanceCreate,
@@ -10,6 +11,7 @@ from ..schemas import (
     MaintenanceOut,
     MaintenanceUpdate,
 )
+from ..services.access import accessible_property_ids, filter_accessible
 
 router = APIRouter(prefix="/maintenance", tags=["Maintenance"])
 
@@ -34,30 +36,25 @@ def _to_schema(record: MaintenanceRequest, property_name: str | None, unit_name:
     )
 
 
-@router.get("/", response_model=MaintenanceListResponse)
-def list_requests(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    records = (
-        db.query(MaintenanceRequest)
-        .order_by(MaintenanceRequest.created_at.desc())
-        .limit(100)
-        .all()
+def _with_names(db: Session):
+    """Requests joined to the display names ``_to_schema`` needs, in one round trip."""
+    return (
+        db.query(MaintenanceRequest, Property.name, Unit.name, Tenant.full_name)
+        .outerjoin(Property, Property.id == MaintenanceRequest.property_id)
+        .outerjoin(Unit, Unit.id == MaintenanceRequest.unit_id)
+        .outerjoin(Tenant, Tenant.id == MaintenanceRequest.tenant_id)
     )
 
-    property_map = {p.id: p for p in db.query(Property).filter(Property.id.in_([r.property_id for r in records])).all()}
-    unit_ids = [r.unit_id for r in records if r.unit_id]
-    unit_map = {u.id: u for u in db.query(Unit).filter(Unit.id.in_(unit_ids)).all()} if unit_ids else {}
-    tenant_ids = [r.tenant_id for r in records if r.tenant_id]
-    tenant_map = {t.id: t for t in db.query(Tenant).filter(Tenant.id.in_(tenant_ids)).all()} if tenant_ids else {}
-
-    items = [
-        _to_schema(
-            record,
-            property_map.get(record.property_id).name if property_map.get(record.property_id) else None,
-            unit_map.get(record.unit_id).name if unit_map.get(record.unit_id) else None,
-            tenant_map.get(record.tenant_id).full_name if tenant_map.get(record.tenant_id) else None,
-        )
-        for record in records
-    ]
+
+@router.get("/", response_model=MaintenanceListResponse)
+async def list_requests(db: AsyncSession = Depends(get_async_read_db), user=Depends(get_current_user_async)):
+    return await db.run_sync(_list_requests, user)
+
+
+def _list_requests(db: Session, user) -> MaintenanceListResponse:
+    stmt = filter_accessible(_with_names(db), MaintenanceRequest.property_id, accessible_property_ids(db, user))
+    rows = stmt.order_by(MaintenanceRequest.created_at.desc()).limit(100).all()
+    items = [_to_schema(*row) for row in rows]
 
     return MaintenanceListResponse(items=items, total=len(items))
 
@@ -75,12 +72,8 @@ def create_request(
     record = MaintenanceRequest(**payload.dict())
     db.add(record)
     db.commit()
-    db.refresh(record)
-
-    unit = db.query(Unit).filter(Unit.id == record.unit_id).first() if record.unit_id else None
-    tenant = db.query(Tenant).filter(Tenant.id == record.tenant_id).first() if record.tenant_id else None
 
-    return _to_schema(record, property_obj.name, unit.name if unit else None, tenant.full_name if tenant else None)
+    return _to_schema(*_with_names(db).filter(MaintenanceRequest.id == record.id).one())
 
 
 @router.patch("/{request_id}", response_model=MaintenanceOut)
@@ -98,15 +91,5 @@ def update_request(
         setattr(record, key, value)
 
     db.commit()
-    db.refresh(record)
 
-    property_obj = db.query(Property).filter(Property.id == record.property_id).first()
-    unit = db.query(Unit).filter(Unit.id == record.unit_id).first() if record.unit_id else None
-    tenant = db.query(Tenant).filter(Tenant.id == record.tenant_id).first() if record.tenant_id else None
-
-    return _to_schema(
-        record,
-        property_obj.name if property_obj else None,
-        unit.name if unit else None,
-        tenant.full_name if tenant else None,
-    )
+    return _to_schema(*_with_names(db).filter(MaintenanceRequest.id == request_id).one())
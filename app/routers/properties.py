@@ -1,14 +1,23 @@
 from collections import defaultdict
-from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..core.config import settings
-from ..dependencies import get_current_user, get_current_user_optional, require_roles
+from ..dependencies import (
+    get_async_read_db,
+    get_current_user,
+    get_current_user_optional,
+    get_current_user_optional_async,
+    get_read_db,
+    require_roles,
+)
+from ..core.counting import count_rows
 from ..core.database import get_db
-from ..models import Lease, Property, Tenant, Unit
+from ..core.pagination import keyset_page, order_keyset, seek_keyset
+from ..models import Lease, Property, PropertyMetricsRollup, Unit
 from ..schemas import (
     PropertyCreate,
     PropertyDetail,
@@ -19,66 +28,60 @@ from ..schemas import (
     UnitListResponse,
     UnitOut,
 )
+from ..services.access import accessible_property_ids, filter_accessible
+from ..services.property_metrics import PropertyMetrics, metrics_for, read_property_metrics
+from ..services.search import property_search
 
 router = APIRouter(prefix="/properties", tags=["Properties"])
 
 
-def _aggregate_property_metrics(db: Session, property_ids: List[int]) -> tuple[dict[int, int], dict[int, int], dict[int, int], dict[int, float]]:
-    if not property_ids:
-        return {}, {}, {}, {}
-
-    total_units = dict(
-        db.query(Unit.property_id, func.count(Unit.id))
-        .filter(Unit.property_id.in_(property_ids))
-        .group_by(Unit.property_id)
-        .all()
-    )
-
-    occupied_units = dict(
-        db.query(Unit.property_id, func.count(func.distinct(Unit.id)))
-        .join(Lease, Lease.unit_id == Unit.id)
-        .filter(Unit.property_id.in_(property_ids), Lease.status == "active")
-        .group_by(Unit.property_id)
-        .all()
+def _property_summary(prop: Property, metrics: PropertyMetrics) -> PropertySummary:
+    return PropertySummary(
+        id=prop.id,
+        name=prop.name,
+        code=prop.code,
+        property_type=prop.property_type,
+        city=prop.city,
+        country=prop.country,
+        occupancy_rate=metrics.occupancy_rate,
+        units_total=metrics.units_total,
+        units_vacant=metrics.units_vacant,
+        pending_kyc=metrics.pending_kyc,
+        monthly_revenue=metrics.monthly_revenue,
     )
 
-    pending_kyc = dict(
-        db.query(Unit.property_id, func.count(func.distinct(Tenant.id)))
-        .join(Lease, Lease.unit_id == Unit.id)
-        .join(Tenant, Tenant.id == Lease.tenant_id)
-        .filter(
-            Unit.property_id.in_(property_ids),
-            Tenant.kyc_status.in_(["pending", "submitted", "conditional"]),
-        )
-        .group_by(Unit.property_id)
-        .all()
-    )
 
-    monthly_revenue = dict(
-        db.query(Unit.property_id, func.coalesce(func.sum(Lease.rent_amount), 0.0))
-        .join(Lease, Lease.unit_id == Unit.id)
-        .filter(Unit.property_id.in_(property_ids), Lease.status == "active")
-        .group_by(Unit.property_id)
-        .all()
+def _property_detail(prop: Property, metrics: PropertyMetrics) -> PropertyDetail:
+    return PropertyDetail(
+        **_property_summary(prop, metrics).model_dump(),
+        address_line_1=prop.address_line_1,
+        address_line_2=prop.address_line_2,
+        notes=prop.notes,
+        owner_id=prop.owner_id,
+        manager_id=prop.manager_id,
+        created_at=prop.created_at,
     )
 
-    return total_units, occupied_units, pending_kyc, monthly_revenue
-
 
 @router.get("/", response_model=PropertyListResponse)
-def list_properties(
+async def list_properties(
     query: PropertyQuery = Depends(),
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_async_read_db),
+    user=Depends(get_current_user_optional_async),
 ):
+    return await db.run_sync(_list_properties, user, query)
+
+
+def _list_properties(db: Session, user, query: PropertyQuery) -> PropertyListResponse:
     if not settings.allow_open_property_management and user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
     stmt = db.query(Property)
 
+    rank = None
     if query.search:
-        like = f"%{query.search.lower()}%"
-        stmt = stmt.filter(func.lower(Property.name).like(like) | func.lower(Property.code).like(like))
+        predicate, rank = property_search(query.search, db.get_bind().dialect.name)
+        stmt = stmt.filter(predicate)
 
     if query.city:
         stmt = stmt.filter(func.lower(Property.city) == query.city.lower())
@@ -86,47 +89,42 @@ def list_properties(
     if query.owner_id:
         stmt = stmt.filter(Property.owner_id == query.owner_id)
 
-    if user is not None:
-        if user.role == "owner":
-            stmt = stmt.filter(Property.owner_id == user.id)
-        elif user.role == "manager":
-            stmt = stmt.filter((Property.manager_id == user.id) | (Property.owner_id == user.id))
-
-    total = stmt.count()
-
-    if query.order == "desc":
-        stmt = stmt.order_by(Property.created_at.desc())
-    else:
-        stmt = stmt.order_by(Property.created_at.asc())
-
-    records = stmt.offset(query.offset).limit(query.limit).all()
-    ids = [prop.id for prop in records]
-
-    totals, occupied, pending, revenue = _aggregate_property_metrics(db, ids)
-
-    items: list[PropertySummary] = []
-    for prop in records:
-        total_units = totals.get(prop.id, 0)
-        occupied_units = occupied.get(prop.id, 0)
-        units_vacant = max(total_units - occupied_units, 0)
-        occupancy_rate = (occupied_units / total_units) if total_units else 0.0
-        items.append(
-            PropertySummary(
-                id=prop.id,
-                name=prop.name,
-                code=prop.code,
-                property_type=prop.property_type,
-                city=prop.city,
-                country=prop.country,
-                occupancy_rate=round(occupancy_rate, 2),
-                units_total=total_units,
-                units_vacant=units_vacant,
-                pending_kyc=pending.get(prop.id, 0),
-                monthly_revenue=float(revenue.get(prop.id, 0.0)),
-            )
-        )
-
-    return PropertyListResponse(items=items, total=total)
+    stmt = filter_accessible(stmt, Property.id, accessible_property_ids(db, user))
+
+    counted = None
+    if query.wants_total:
+        scope = (user.id, user.role) if user is not None else None
+        counted = count_rows(db, stmt, query.count, scope=scope)
+
+    descending = query.order == "desc"
+    # Relevance ranking only applies to offset pages; cursors follow the (created_at, id) keyset.
+    ranked = rank is not None and not query.cursor
+    if ranked:
+        stmt = stmt.order_by(rank.desc())
+    stmt = order_keyset(stmt, Property, descending)
+    if query.cursor:
+        try:
+            stmt = seek_keyset(stmt, Property, query.cursor, descending)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+    stmt = stmt.outerjoin(PropertyMetricsRollup, PropertyMetricsRollup.property_id == Property.id).add_entity(
+        PropertyMetricsRollup
+    )
+    if not query.cursor:
+        stmt = stmt.offset(query.offset)
+
+    records, next_cursor = keyset_page(stmt.limit(query.limit + 1).all(), query.limit, key=lambda row: row[0])
+    if ranked:
+        next_cursor = None
+    items = [_property_summary(prop, PropertyMetrics.from_rollup(prop.id, rollup)) for prop, rollup in records]
+
+    return PropertyListResponse(
+        items=items,
+        total=counted.total if counted else None,
+        total_is_estimate=counted.is_estimate if counted else False,
+        next_cursor=next_cursor,
+    )
 
 
 @router.post("/", response_model=PropertyDetail, status_code=status.HTTP_201_CREATED)
@@ -153,33 +151,14 @@ def create_property(
     db.commit()
     db.refresh(prop)
 
-    totals, occupied, pending, revenue = _aggregate_property_metrics(db, [prop.id])
-
-    return PropertyDetail(
-        id=prop.id,
-        name=prop.name,
-        code=prop.code,
-        property_type=prop.property_type,
-        city=prop.city,
-        country=prop.country,
-        occupancy_rate=0.0,
-        units_total=totals.get(prop.id, 0),
-        units_vacant=totals.get(prop.id, 0),
-        pending_kyc=pending.get(prop.id, 0),
-        monthly_revenue=float(revenue.get(prop.id, 0.0)),
-        address_line_1=prop.address_line_1,
-        address_line_2=prop.address_line_2,
-        notes=prop.notes,
-        owner_id=prop.owner_id,
-        manager_id=prop.manager_id,
-        created_at=prop.created_at,
-    )
+    metrics = read_property_metrics(db, [prop.id])
+    return _property_detail(prop, metrics_for(metrics, prop.id))
 
 
 @router.get("/{property_id}", response_model=PropertyDetail)
 def get_property(
     property_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(get_current_user_optional),
 ):
     if not settings.allow_open_property_management and user is None:
@@ -195,30 +174,8 @@ def get_property(
         if user.role == "manager" and prop.manager_id not in {None, user.id} and prop.owner_id != user.id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
 
-    totals, occupied, pending, revenue = _aggregate_property_metrics(db, [property_id])
-    total_units = totals.get(property_id, 0)
-    occ_units = occupied.get(property_id, 0)
-    occupancy_rate = (occ_units / total_units) if total_units else 0.0
-
-    return PropertyDetail(
-        id=prop.id,
-        name=prop.name,
-        code=prop.code,
-        property_type=prop.property_type,
-        city=prop.city,
-        country=prop.country,
-        occupancy_rate=round(occupancy_rate, 2),
-        units_total=total_units,
-        units_vacant=max(total_units - occ_units, 0),
-        pending_kyc=pending.get(property_id, 0),
-        monthly_revenue=float(revenue.get(property_id, 0.0)),
-        address_line_1=prop.address_line_1,
-        address_line_2=prop.address_line_2,
-        notes=prop.notes,
-        owner_id=prop.owner_id,
-        manager_id=prop.manager_id,
-        created_at=prop.created_at,
-    )
+    metrics = read_property_metrics(db, [property_id])
+    return _property_detail(prop, metrics_for(metrics, property_id))
 
 
 @router.patch("/{property_id}", response_model=PropertyDetail)
@@ -243,36 +200,14 @@ def update_property(
     db.commit()
     db.refresh(prop)
 
-    totals, occupied, pending, revenue = _aggregate_property_metrics(db, [property_id])
-    total_units = totals.get(property_id, 0)
-    occ_units = occupied.get(property_id, 0)
-    occupancy_rate = (occ_units / total_units) if total_units else 0.0
-
-    return PropertyDetail(
-        id=prop.id,
-        name=prop.name,
-        code=prop.code,
-        property_type=prop.property_type,
-        city=prop.city,
-        country=prop.country,
-        occupancy_rate=round(occupancy_rate, 2),
-        units_total=total_units,
-        units_vacant=max(total_units - occ_units, 0),
-        pending_kyc=pending.get(property_id, 0),
-        monthly_revenue=float(revenue.get(property_id, 0.0)),
-        address_line_1=prop.address_line_1,
-        address_line_2=prop.address_line_2,
-        notes=prop.notes,
-        owner_id=prop.owner_id,
-        manager_id=prop.manager_id,
-        created_at=prop.created_at,
-    )
+    metrics = read_property_metrics(db, [property_id])
+    return _property_detail(prop, metrics_for(metrics, property_id))
 
 
 @router.get("/{property_id}/units", response_model=UnitListResponse)
 def list_property_units(
     property_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(get_current_user),
 ):
     prop = db.query(Property).filter(Property.id == property_id).first()
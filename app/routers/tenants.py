@@ -1,13 +1,23 @@
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..core.config import settings
+from ..core.counting import count_rows
 from ..core.database import get_db
-from ..dependencies import get_current_user, get_current_user_optional, require_roles
-from ..models import Tenant, TenantDocument
+from ..core.pagination import keyset_page, order_keyset, seek_keyset
+from ..dependencies import (
+    get_async_read_db,
+    get_current_user,
+    get_current_user_optional,
+    get_current_user_optional_async,
+    get_read_db,
+    require_roles,
+)
+from ..models import Lease, Tenant, TenantDocument
 from ..schemas import (
     TenantCreate,
     TenantListResponse,
@@ -15,6 +25,8 @@ from ..schemas import (
     TenantQuery,
     TenantUpdate,
 )
+from ..services.access import accessible_property_ids, accessible_unit_ids
+from ..services.search import tenant_search
 
 router = APIRouter(prefix="/tenants", tags=["Tenants"])
 
@@ -38,34 +50,56 @@ def _tenant_to_schema(tenant: Tenant, pending_documents: int = 0) -> TenantOut:
 
 
 @router.get("/", response_model=TenantListResponse)
-def list_tenants(
+async def list_tenants(
     query: TenantQuery = Depends(),
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_async_read_db),
+    user=Depends(get_current_user_optional_async),
 ):
+    return await db.run_sync(_list_tenants, user, query)
+
+
+def _list_tenants(db: Session, user, query: TenantQuery) -> TenantListResponse:
     if not settings.allow_open_tenant_creation and user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
     stmt = db.query(Tenant)
+    property_ids = accessible_property_ids(db, user)
+    if property_ids is not None:
+        # Tenants are scoped through their leases, plus the ones this user added who may not have a lease yet;
+        # the compiled filter also keys the count cache.
+        leased = select(Lease.tenant_id).where(Lease.unit_id.in_(accessible_unit_ids(property_ids)))
+        stmt = stmt.filter(or_(Tenant.id.in_(leased), Tenant.created_by_id == user.id))
 
     if query.status:
         stmt = stmt.filter(Tenant.kyc_status == query.status)
 
+    rank = None
     if query.search:
-        like = f"%{query.search.lower()}%"
-        stmt = stmt.filter(
-            func.lower(Tenant.full_name).like(like)
-            | func.lower(Tenant.phone).like(like)
-            | func.lower(func.coalesce(Tenant.email, "")).like(like)
-        )
-
-    total = stmt.count()
-    tenants = (
-        stmt.order_by(Tenant.created_at.desc())
-        .offset(query.offset)
-        .limit(query.limit)
-        .all()
-    )
+        predicate, rank = tenant_search(query.search, db.get_bind().dialect.name)
+        stmt = stmt.filter(predicate)
+
+    counted = None
+    if query.wants_total:
+        scope = (user.id, user.role) if user is not None else None
+        counted = count_rows(db, stmt, query.count, scope=scope)
+
+    descending = query.order != "asc"
+    # Relevance ranking only applies to offset pages; cursors follow the (created_at, id) keyset.
+    ranked = rank is not None and not query.cursor
+    if ranked:
+        stmt = stmt.order_by(rank.desc())
+    stmt = order_keyset(stmt, Tenant, descending)
+    if query.cursor:
+        try:
+            stmt = seek_keyset(stmt, Tenant, query.cursor, descending)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+    else:
+        stmt = stmt.offset(query.offset)
+
+    tenants, next_cursor = keyset_page(stmt.limit(query.limit + 1).all(), query.limit)
+    if ranked:
+        next_cursor = None
 
     pending_docs_map = {}
     if tenants:
@@ -85,7 +119,12 @@ def list_tenants(
         for tenant in tenants
     ]
 
-    return TenantListResponse(items=items, total=total)
+    return TenantListResponse(
+        items=items,
+        total=counted.total if counted else None,
+        total_is_estimate=counted.is_estimate if counted else False,
+        next_cursor=next_cursor,
+    )
 
 
 @router.post("/", response_model=TenantOut, status_code=status.HTTP_201_CREATED)
@@ -99,7 +138,7 @@ def create_tenant(
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
         require_roles("owner", "manager")(user)
 
-    tenant = Tenant(**payload.dict())
+    tenant = Tenant(**payload.dict(), created_by_id=user.id if user is not None else None)
     # Default new tenants to pending status
     if not tenant.kyc_status:
         tenant.kyc_status = "pending"
@@ -110,7 +149,7 @@ def create_tenant(
 
 
 @router.get("/{tenant_id}", response_model=TenantOut)
-def get_tenant(tenant_id: int, db: Session = Depends(get_db), user=Depends(get_current_user_optional)):
+def get_tenant(tenant_id: int, db: Session = Depends(get_read_db), user=Depends(get_current_user_optional)):
     if not settings.allow_open_tenant_creation and user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
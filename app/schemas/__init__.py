@@ -1,5 +1,6 @@
 from .auth import (
     LoginRequest,
+    RefreshTokenRequest,
     ResendVerificationRequest,
     ResendVerificationResponse,
     SignupRequest,
@@ -19,10 +20,15 @@ from .kyc import (
     TenantKycSessionResponse,
 )
 from .lease import (
+    BillingRunCreate,
+    BillingRunOut,
     LeaseCreate,
     LeaseOut,
+    LeaseQuery,
     LeaseUpdate,
+    PaymentAllocationOut,
     PaymentCreate,
+    PaymentImportReport,
     PaymentOut,
     RentInvoiceCreate,
     RentInvoiceOut,
@@ -50,6 +56,7 @@ __all__ = [
     "SignupResponse",
     "LoginRequest",
     "TokenResponse",
+    "RefreshTokenRequest",
     "UserInfo",
     "VerifyEmailRequest",
     "VerifyEmailResponse",
@@ -79,10 +86,15 @@ __all__ = [
     "LeaseCreate",
     "LeaseUpdate",
     "LeaseOut",
+    "LeaseQuery",
     "RentInvoiceCreate",
     "RentInvoiceOut",
+    "BillingRunCreate",
+    "BillingRunOut",
+    "PaymentAllocationOut",
     "PaymentCreate",
     "PaymentOut",
+    "PaymentImportReport",
     "MaintenanceCreate",
     "MaintenanceUpdate",
     "MaintenanceOut",
@@ -52,9 +52,14 @@ class UserInfo(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
     user: UserInfo
 
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+
 class VerifyEmailRequest(BaseModel):
     token: str
 
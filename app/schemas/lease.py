@@ -1,7 +1,9 @@
 from datetime import date, datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from .shared import PaginationQuery
 
 
 class LeaseCreate(BaseModel):
@@ -62,21 +64,82 @@ class RentInvoiceOut(BaseModel):
     notes: Optional[str]
 
 
+class BillingRunCreate(BaseModel):
+    period_start: date
+    batch_size: int = Field(default=5000, ge=1, le=20000)
+
+    @field_validator("period_start")
+    @classmethod
+    def first_of_month(cls, value: date) -> date:
+        if value.day != 1:
+            raise ValueError("period_start must be the first day of a month")
+        return value
+
+
+class BillingRunOut(BaseModel):
+    period_start: date
+    period_end: date
+    leases_billable: int
+    invoices_created: int
+    already_invoiced: int
+    credit_allocated: float
+    invoices_credited: int
+    seconds: float
+    rows_per_second: float
+
+
 class PaymentCreate(BaseModel):
-    invoice_id: int
+    """A payment against one invoice, or a lump sum for a lease or tenant split across their open invoices."""
+
+    invoice_id: Optional[int] = None
+    lease_id: Optional[int] = None
+    tenant_id: Optional[int] = None
     amount: float
     paid_on: date
     method: Optional[str] = None
     reference: Optional[str] = None
     notes: Optional[str] = None
 
+    @model_validator(mode="after")
+    def one_target(self) -> "PaymentCreate":
+        if sum(target is not None for target in (self.invoice_id, self.lease_id, self.tenant_id)) != 1:
+            raise ValueError("Give exactly one of invoice_id, lease_id or tenant_id")
+        return self
+
+
+class PaymentAllocationOut(BaseModel):
+    invoice_id: int
+    amount: float
+
 
 class PaymentOut(BaseModel):
     id: int
-    invoice_id: int
+    invoice_id: Optional[int]
+    lease_id: Optional[int] = None
+    tenant_id: Optional[int] = None
     amount: float
     paid_on: date
     method: str
     reference: Optional[str]
     notes: Optional[str]
     created_at: datetime
+    unallocated: Optional[float] = None
+    allocations: list[PaymentAllocationOut] = []
+
+
+class PaymentImportReport(BaseModel):
+    source: str
+    lines: int
+    matched: int
+    queued: int
+    duplicates: int
+    invalid: int
+    amount_applied: float
+    match_rate: float
+    matched_by: dict[str, int]
+    seconds: float
+    lines_per_second: float
+
+
+class LeaseQuery(PaginationQuery):
+    limit: int = Field(default=100, ge=1, le=200)
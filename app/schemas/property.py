@@ -61,7 +61,9 @@ class PropertyDetail(PropertySummary):
 
 class PropertyListResponse(BaseModel):
     items: list[PropertySummary]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
 
 
 class PropertyQuery(PaginationQuery):
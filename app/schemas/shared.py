@@ -7,3 +7,13 @@ class PaginationQuery(BaseModel):
     limit: int = Field(default=20, ge=1, le=200)
     offset: int = Field(default=0, ge=0)
     order: Optional[str] = Field(default=None, pattern=r"^(asc|desc)$")
+    # Opaque keyset cursor from a previous page's next_cursor; takes precedence over offset.
+    cursor: Optional[str] = None
+    # Counting is skipped on cursor pages; offset clients can opt out too.
+    include_total: bool = True
+    # Count strategy override; defaults to the COUNT_MODE setting.
+    count: Optional[str] = Field(default=None, pattern=r"^(exact|estimate|cached)$")
+
+    @property
+    def wants_total(self) -> bool:
+        return self.include_total and self.cursor is None
@@ -59,7 +59,9 @@ class TenantOut(BaseModel):
 
 class TenantListResponse(BaseModel):
     items: list[TenantOut]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
 
 
 class TenantQuery(PaginationQuery):
@@ -0,0 +1,96 @@
+"""Which properties a user may see.
+
+Owners, managers and caretakers are limited to the properties they own
+(``owner_id``), manage (``manager_id``) or are assigned to through
+``property_managers``. Viewers have read access across the portfolio and are
+unrestricted. Each user's set is computed with one indexed UNION, cached, and
+dropped whenever a commit touches properties or assignments.
+"""
+
+import threading
+
+from sqlalchemy import event, or_, select, union
+from sqlalchemy.orm import Query, Session
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models import Property, PropertyManager, Unit
+
+UNRESTRICTED_ROLES = {"viewer"}
+_DIRTY_KEY = "access_scope_dirty"
+
+_cache = TTLCache(maxsize=settings.access_scope_cache_max_entries, ttl=settings.access_scope_cache_ttl_seconds)
+_lock = threading.Lock()
+_generation = 0
+
+
+def accessible_property_ids(db: Session, user) -> frozenset[int] | None:
+    """Property ids ``user`` may see, or ``None`` when they are not restricted."""
+    if user is None or user.role in UNRESTRICTED_ROLES:
+        return None
+    cached = _cache.get(user.id)
+    if cached is not None:
+        return cached
+
+    generation = _generation
+    owned = select(Property.id).where(or_(Property.owner_id == user.id, Property.manager_id == user.id))
+    assigned = select(PropertyManager.property_id).where(PropertyManager.user_id == user.id)
+    property_ids = frozenset(db.execute(union(owned, assigned)).scalars())
+    with _lock:
+        # A commit that changed assignments while we were reading makes this set stale.
+        if generation == _generation:
+            _cache.set(user.id, property_ids)
+    return property_ids
+
+
+def filter_accessible(query: Query, column, property_ids: frozenset[int] | None) -> Query:
+    """Restrict ``query`` to rows whose ``column`` holds an accessible property id."""
+    if property_ids is None:
+        return query
+    return query.filter(column.in_(property_ids))
+
+
+def accessible_unit_ids(property_ids: frozenset[int]):
+    """Subquery of unit ids in the accessible properties, for filtering leases."""
+    return select(Unit.id).where(Unit.property_id.in_(property_ids))
+
+
+def clear_access_scopes() -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        _cache.clear()
+
+
+def access_scope_cache_stats() -> dict:
+    return _cache.stats()
+
+
+def _touches_scope(objects) -> bool:
+    return any(isinstance(obj, (Property, PropertyManager)) for obj in objects)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_scope_dirty(session: Session, flush_context) -> None:
+    if _touches_scope(session.new) or _touches_scope(session.deleted) or _touches_scope(session.dirty):
+        session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_scope_dirty_bulk(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, (Property, PropertyManager)):
+        orm_execute_state.session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_access_scopes(session: Session) -> None:
+    if session.info.pop(_DIRTY_KEY, False):
+        clear_access_scopes()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_scope_dirty(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,220 @@
+"""FIFO allocation of lump-sum payments across open invoices.
+
+A lump sum is a ``Payment`` recorded against a lease or a tenant instead of a
+single invoice. Its ``unallocated`` balance is spent on that lease's (or all of
+the tenant's leases') open invoices, oldest period first, and every split is
+kept as a ``PaymentAllocation``.
+
+Allocation is set-based. Per lease or tenant, the open credits (oldest payment
+first) and the invoice balances (oldest period first) are laid end to end with
+windowed running sums. Each credit/invoice pair whose ranges overlap becomes
+one allocation, in a single ``INSERT ... SELECT ... RETURNING``. Invoices and
+payments are then updated with one executemany each, so a pass costs the same
+handful of statements whether a tenant has one invoice or ten years of them.
+On Postgres the payments and invoices a pass reads are locked first, so two
+allocations for one tenant cannot spend the same balance twice.
+"""
+
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from sqlalchemy import bindparam, case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import Lease, Payment, PaymentAllocation, RentInvoice, Tenant, Unit
+from .payments import credit_invoice, idempotency_key_for, replay
+
+OPEN_STATUSES = ("pending", "partial", "overdue")
+
+
+class PayerNotFound(LookupError):
+    pass
+
+
+@dataclass
+class AllocationResult:
+    allocations: int = 0
+    amount: Decimal = Decimal("0")
+    invoices: set[int] = field(default_factory=set)
+    seconds: float = 0.0
+
+    @property
+    def invoices_credited(self) -> int:
+        return len(self.invoices)
+
+
+def _scope(level: str):
+    """Owner columns on the credit and invoice side, and the invoice selectable carrying the owner."""
+    if level == "lease":
+        return Payment.lease_id, RentInvoice.lease_id, RentInvoice.__table__
+    if level == "tenant":
+        return Payment.tenant_id, Lease.tenant_id, RentInvoice.__table__.join(Lease.__table__, Lease.id == RentInvoice.lease_id)
+    raise ValueError(f"Unknown allocation level: {level}")
+
+
+def _allocation_pass(db: Session, level: str, owners, result: AllocationResult, leases=None) -> None:
+    """Spend the open credit of ``level`` owners in ``owners`` (ids or a subquery; ``None`` for all).
+
+    ``leases`` (ids or a subquery) limits which invoices the credit may pay.
+    """
+    credit_owner, invoice_owner, invoices_from = _scope(level)
+    has_credit = [credit_owner.is_not(None), Payment.unallocated > 0]
+    if owners is not None:
+        has_credit.append(credit_owner.in_(owners))
+
+    if not db.execute(select(Payment.id).where(*has_credit).with_for_update()).scalars().all():
+        return
+    balance = RentInvoice.amount_due - RentInvoice.amount_paid
+    owes = [
+        RentInvoice.status.in_(OPEN_STATUSES),
+        balance > 0,
+        invoice_owner.in_(select(credit_owner).where(*has_credit)),
+    ]
+    if leases is not None:
+        owes.append(RentInvoice.lease_id.in_(leases))
+    # A fixed lock order keeps concurrent passes over overlapping tenants from deadlocking.
+    db.execute(
+        select(RentInvoice.id)
+        .select_from(invoices_from)
+        .where(*owes)
+        .order_by(RentInvoice.id)
+        .with_for_update(of=RentInvoice)
+    ).all()
+
+    credits = (
+        select(
+            Payment.id.label("payment_id"),
+            credit_owner.label("owner"),
+            Payment.unallocated.label("credit"),
+            func.sum(Payment.unallocated)
+            .over(partition_by=credit_owner, order_by=(Payment.paid_on, Payment.id))
+            .label("credit_end"),
+        )
+        .where(*has_credit)
+        .subquery("credits")
+    )
+    debts = (
+        select(
+            RentInvoice.id.label("invoice_id"),
+            invoice_owner.label("owner"),
+            balance.label("balance"),
+            func.sum(balance)
+            .over(partition_by=invoice_owner, order_by=(RentInvoice.period_start, RentInvoice.id))
+            .label("debt_end"),
+        )
+        .select_from(invoices_from)
+        .where(*owes)
+        .subquery("debts")
+    )
+    credit_start = credits.c.credit_end - credits.c.credit
+    debt_start = debts.c.debt_end - debts.c.balance
+    overlap_start = case((credit_start > debt_start, credit_start), else_=debt_start)
+    overlap_end = case((credits.c.credit_end < debts.c.debt_end, credits.c.credit_end), else_=debts.c.debt_end)
+    amount = func.round(overlap_end - overlap_start, 2)
+    pairs = (
+        select(credits.c.payment_id, debts.c.invoice_id, amount)
+        .join_from(credits, debts, credits.c.owner == debts.c.owner)
+        .where(credit_start < debts.c.debt_end, debt_start < credits.c.credit_end, amount > 0)
+    )
+
+    allocations = PaymentAllocation.__table__
+    rows = db.execute(
+        insert(allocations)
+        .from_select(["payment_id", "invoice_id", "amount"], pairs)
+        .returning(allocations.c.payment_id, allocations.c.invoice_id, allocations.c.amount)
+    ).all()
+    if not rows:
+        return
+
+    credited: dict[int, Decimal] = defaultdict(Decimal)
+    spent: dict[int, Decimal] = defaultdict(Decimal)
+    for payment_id, invoice_id, allocated in rows:
+        credited[invoice_id] += allocated
+        spent[payment_id] += allocated
+
+    invoice_table = RentInvoice.__table__
+    db.execute(
+        update(invoice_table)
+        .where(invoice_table.c.id == bindparam("target_id"))
+        .values(credit_invoice(bindparam("credit", type_=invoice_table.c.amount_paid.type))),
+        [{"target_id": invoice_id, "credit": amount} for invoice_id, amount in credited.items()],
+    )
+    payment_table = Payment.__table__
+    db.execute(
+        update(payment_table)
+        .where(payment_table.c.id == bindparam("target_id"))
+        .values(unallocated=payment_table.c.unallocated - bindparam("spent", type_=payment_table.c.unallocated.type)),
+        [{"target_id": payment_id, "spent": amount} for payment_id, amount in spent.items()],
+    )
+    result.allocations += len(rows)
+    result.amount += sum(spent.values(), Decimal("0"))
+    result.invoices.update(credited)
+
+
+def allocate_open_credit(db: Session, property_ids: frozenset[int] | None = None) -> AllocationResult:
+    """Spend every lump sum with credit left on the open invoices it covers, in one transaction.
+
+    Lease credit goes first, then tenant-wide credit on what is still owed.
+    ``property_ids`` limits the run to invoices on those properties: lease
+    credit for leases there, and tenant-wide credit of tenants with a lease
+    there, spent only on those leases' invoices. ``None`` covers everything.
+    """
+    started = time.perf_counter()
+    leases = None
+    tenants = None
+    if property_ids is not None:
+        leases = select(Lease.id).where(Lease.unit_id.in_(select(Unit.id).where(Unit.property_id.in_(property_ids))))
+        tenants = select(Lease.tenant_id).where(Lease.id.in_(leases))
+
+    result = AllocationResult()
+    _allocation_pass(db, "lease", leases, result)
+    _allocation_pass(db, "tenant", tenants, result, leases=leases)
+    db.commit()
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def apply_lump_sum(db: Session, data: dict, idempotency_key: str | None = None) -> tuple[Payment, bool]:
+    """Record a payment for a lease or tenant and allocate it to their oldest open invoices.
+
+    ``data`` carries ``lease_id`` or ``tenant_id`` instead of ``invoice_id``.
+    Credit left over once everything is paid stays on the payment and is
+    spent by the next ``allocate_open_credit`` (e.g. after a billing run).
+    Returns ``(payment, created)`` like ``apply_payment``; raises
+    ``PayerNotFound``, ``IdempotencyConflict`` or ``ValueError``.
+    """
+    target = {name: data.get(name) for name in ("lease_id", "tenant_id")}
+    level = "lease" if target["lease_id"] is not None else "tenant"
+    owner_id = target[f"{level}_id"]
+    if owner_id is None or data.get("invoice_id") is not None:
+        raise ValueError("A lump sum needs exactly one of lease_id or tenant_id")
+    amount = Decimal(str(data["amount"]))
+    if amount <= 0:
+        raise ValueError("amount must be positive")
+    key = idempotency_key_for(idempotency_key, data.get("reference"), data.get("method"), f"{level}:{owner_id}")
+
+    if key is not None:
+        existing = replay(db, key, amount, invoice_id=None, **target)
+        if existing is not None:
+            return existing, False
+    if db.get(Lease if level == "lease" else Tenant, owner_id) is None:
+        raise PayerNotFound(owner_id)
+
+    payment = Payment(**{**data, "amount": amount}, unallocated=amount, idempotency_key=key)
+    db.add(payment)
+    try:
+        db.flush()
+        _allocation_pass(db, level, [owner_id], AllocationResult())
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        existing = replay(db, key, amount, invoice_id=None, **target) if key is not None else None
+        if existing is None:
+            raise
+        return existing, False
+
+    db.refresh(payment)
+    return payment, True
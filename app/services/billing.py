@@ -0,0 +1,195 @@
+"""Month-end billing runs and the overdue sweep.
+
+A billing run creates one ``RentInvoice`` per active lease per period. Each
+batch is a single ``INSERT ... SELECT`` over a keyset window of lease ids,
+with ``ON CONFLICT (lease_id, period_start) DO NOTHING`` against
+``ix_rent_invoices_lease_period``, so a rerun or an overlapping run only
+fills the gaps. Due dates come from ``payment_day`` clamped to the length of
+the month; leases without one fall due on the first. Once the invoices exist,
+lump-sum credit waiting on those leases and tenants is allocated to them
+(see ``allocation``).
+
+``mark_overdue_invoices`` flips pending and partial invoices past their due
+date to ``overdue`` one chunk at a time. Each chunk is a single UPDATE whose
+id subquery walks ``ix_rent_invoices_open_due_date`` and, on Postgres, skips
+rows another sweeper has locked, so several workers can run at once.
+"""
+
+import calendar
+import time
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import case, func, literal, literal_column, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import Lease, RentInvoice, Unit
+from .allocation import allocate_open_credit
+
+BILLING_BATCH_SIZE = 5000
+OVERDUE_CHUNK_SIZE = 5000
+# Literals rather than bound parameters, so the planner can match the partial index predicate.
+_OPEN_INVOICE = RentInvoice.status.in_([literal_column("'pending'"), literal_column("'partial'")])
+
+
+@dataclass(frozen=True)
+class BillingRunResult:
+    period_start: date
+    period_end: date
+    leases_billable: int
+    invoices_created: int
+    seconds: float
+    credit_allocated: Decimal = Decimal("0")
+    invoices_credited: int = 0
+
+    @property
+    def already_invoiced(self) -> int:
+        return self.leases_billable - self.invoices_created
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.invoices_created / self.seconds, 1) if self.seconds > 0 else 0.0
+
+
+def billing_period(period_start: date) -> tuple[date, date]:
+    if period_start.day != 1:
+        raise ValueError("period_start must be the first day of a month")
+    last_day = calendar.monthrange(period_start.year, period_start.month)[1]
+    return period_start, period_start.replace(day=last_day)
+
+
+def _due_date(period_start: date, period_end: date):
+    """``payment_day`` mapped to a date in the period, as a CASE over literal dates."""
+    return case(
+        {day: literal(period_start.replace(day=min(day, period_end.day))) for day in range(1, 32)},
+        value=Lease.payment_day,
+        else_=literal(period_start),
+    )
+
+
+def _insert_ignoring_existing(db: Session, select_stmt, columns: list[str]):
+    table = RentInvoice.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect not in {"postgresql", "sqlite"}:
+        raise ValueError(f"Billing runs need INSERT ... ON CONFLICT support, not available on {dialect}")
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(table).from_select(columns, select_stmt)
+    return db.execute(stmt.on_conflict_do_nothing(index_elements=[table.c.lease_id, table.c.period_start]))
+
+
+def run_billing(
+    db: Session,
+    period_start: date,
+    property_ids: frozenset[int] | None = None,
+    batch_size: int = BILLING_BATCH_SIZE,
+) -> BillingRunResult:
+    """Invoice every lease active during the month starting ``period_start``.
+
+    ``property_ids`` limits the run to leases on those properties (``None``
+    bills everything). Each batch commits on its own; allocating open
+    credit to the new invoices is one more transaction at the end.
+    """
+    period_start, period_end = billing_period(period_start)
+    billable = [
+        Lease.status == "active",
+        Lease.start_date <= period_end,
+        or_(Lease.end_date.is_(None), Lease.end_date >= period_start),
+    ]
+    if property_ids is not None:
+        billable.append(Lease.unit_id.in_(select(Unit.id).where(Unit.property_id.in_(property_ids))))
+
+    columns = ["lease_id", "period_start", "period_end", "due_date", "amount_due"]
+    due_date = _due_date(period_start, period_end)
+
+    started = time.perf_counter()
+    leases_billable = 0
+    created = 0
+    last_id = 0
+    while True:
+        ids = db.execute(
+            select(Lease.id).where(*billable, Lease.id > last_id).order_by(Lease.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        rows = select(
+            Lease.id,
+            literal(period_start),
+            literal(period_end),
+            due_date,
+            Lease.rent_amount,
+        ).where(*billable, Lease.id > last_id, Lease.id <= ids[-1])
+        result = _insert_ignoring_existing(db, rows, columns)
+        db.commit()
+        leases_billable += len(ids)
+        created += max(result.rowcount, 0)
+        last_id = ids[-1]
+
+    allocated = allocate_open_credit(db, property_ids)
+    return BillingRunResult(
+        period_start=period_start,
+        period_end=period_end,
+        leases_billable=leases_billable,
+        invoices_created=created,
+        seconds=time.perf_counter() - started,
+        credit_allocated=allocated.amount,
+        invoices_credited=allocated.invoices_credited,
+    )
+
+
+@dataclass(frozen=True)
+class OverdueSweepResult:
+    from_pending: int
+    from_partial: int
+    seconds: float
+
+    @property
+    def total(self) -> int:
+        return self.from_pending + self.from_partial
+
+
+def overdue_chunk(as_of: date, chunk_size: int):
+    """Ids of the next ``chunk_size`` open invoices due before ``as_of``, locked, oldest due date first."""
+    return (
+        select(RentInvoice.id)
+        .where(_OPEN_INVOICE, RentInvoice.due_date < as_of)
+        .order_by(RentInvoice.due_date)
+        .limit(chunk_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def mark_overdue_invoices(
+    db: Session,
+    as_of: date | None = None,
+    chunk_size: int = OVERDUE_CHUNK_SIZE,
+) -> OverdueSweepResult:
+    """Mark open invoices due before ``as_of`` (default today) overdue. Each chunk commits on its own."""
+    as_of = as_of or date.today()
+    started = time.perf_counter()
+    from_pending = 0
+    from_partial = 0
+    while True:
+        due = overdue_chunk(as_of, chunk_size)
+        # The status check is repeated on the row itself in case another sweeper or a payment got there first.
+        stmt = (
+            update(RentInvoice)
+            .where(RentInvoice.id.in_(due), _OPEN_INVOICE)
+            .values(status="overdue", updated_at=func.now())
+            .returning(RentInvoice.amount_paid)
+            .execution_options(synchronize_session=False)
+        )
+        paid = db.execute(stmt).scalars().all()
+        db.commit()
+        if not paid:
+            break
+        partial = sum(1 for amount in paid if amount and amount > 0)
+        from_partial += partial
+        from_pending += len(paid) - partial
+
+    return OverdueSweepResult(
+        from_pending=from_pending,
+        from_partial=from_partial,
+        seconds=time.perf_counter() - started,
+    )
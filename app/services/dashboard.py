@@ -0,0 +1,169 @@
+"""Dashboard summary computation and its shared snapshot cache."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Hashable
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from ..core.cache import StaleWhileRevalidateCache
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models import DailyPortfolioMetrics, Lease, MaintenanceRequest, Property, PropertyMetricsRollup, Tenant, Unit
+from ..schemas import ActivityFeedItem, DashboardSummary, MetricCard, OccupancyInsight
+from .access import accessible_unit_ids, filter_accessible
+from .portfolio_metrics import portfolio_changes
+from .property_metrics import PENDING_KYC_STATUSES, PropertyMetrics
+
+logger = logging.getLogger(__name__)
+
+# Writes to these tables change some figure on the dashboard.
+DASHBOARD_MODELS = (DailyPortfolioMetrics, Lease, MaintenanceRequest, Property, Tenant, Unit)
+_DIRTY_KEY = "dashboard_dirty"
+
+dashboard_cache = StaleWhileRevalidateCache(
+    maxsize=settings.dashboard_cache_max_entries,
+    fresh_ttl=settings.dashboard_cache_fresh_seconds,
+    stale_ttl=settings.dashboard_cache_stale_seconds,
+)
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dashboard-refresh")
+
+
+def dashboard_scope(property_ids: frozenset[int] | None) -> Hashable:
+    """Cache key: users with the same accessible properties share a snapshot."""
+    return ("all",) if property_ids is None else ("properties", property_ids)
+
+
+def build_dashboard_summary(db: Session, property_ids: frozenset[int] | None) -> DashboardSummary:
+    properties = filter_accessible(db.query(func.count(Property.id)), Property.id, property_ids)
+    property_count = properties.scalar() or 0
+
+    active_lease_query = db.query(func.count(Lease.id)).filter(Lease.status == "active")
+    if property_ids is None:
+        tenant_count = db.query(func.count(Tenant.id)).scalar() or 0
+        pending_kyc = (
+            db.query(func.count(Tenant.id))
+            .filter(Tenant.kyc_status.in_(PENDING_KYC_STATUSES))
+            .scalar()
+            or 0
+        )
+    else:
+        # Tenants belong to a property through their leases.
+        unit_ids = accessible_unit_ids(property_ids)
+        active_lease_query = active_lease_query.filter(Lease.unit_id.in_(unit_ids))
+        leased = (
+            db.query(func.count(func.distinct(Tenant.id)))
+            .join(Lease, Lease.tenant_id == Tenant.id)
+            .filter(Lease.unit_id.in_(unit_ids))
+        )
+        tenant_count = leased.scalar() or 0
+        pending_kyc = leased.filter(Tenant.kyc_status.in_(PENDING_KYC_STATUSES)).scalar() or 0
+    active_leases = active_lease_query.scalar() or 0
+
+    revenue = db.query(func.coalesce(func.sum(PropertyMetricsRollup.monthly_revenue), 0))
+    total_revenue = float(
+        filter_accessible(revenue, PropertyMetricsRollup.property_id, property_ids).scalar() or 0
+    )
+
+    # Occupancy insights per property, read from the incrementally maintained rollup
+    occupancy_rows = (
+        db.query(Property.name, PropertyMetricsRollup)
+        .join(PropertyMetricsRollup, PropertyMetricsRollup.property_id == Property.id)
+        .filter(PropertyMetricsRollup.units_total > 0)
+    )
+    occupancy_rows = filter_accessible(occupancy_rows, Property.id, property_ids).order_by(Property.name).all()
+
+    occupancy_data: list[OccupancyInsight] = []
+    for name, rollup in occupancy_rows:
+        metrics = PropertyMetrics.from_rollup(rollup.property_id, rollup)
+        occupancy_data.append(
+            OccupancyInsight(
+                property_id=metrics.property_id,
+                property_name=name,
+                occupancy_rate=metrics.occupancy_rate,
+                pending_kyc=metrics.pending_kyc,
+                vacant_units=metrics.units_vacant,
+            )
+        )
+
+    recent_maintenance = (
+        filter_accessible(db.query(MaintenanceRequest), MaintenanceRequest.property_id, property_ids)
+        .order_by(MaintenanceRequest.created_at.desc())
+        .limit(5)
+        .all()
+    )
+
+    activities: list[ActivityFeedItem] = []
+    for record in recent_maintenance:
+        activities.append(
+            ActivityFeedItem(
+                title=record.title,
+                subtitle=f"Property ID {record.property_id}",
+                timestamp=record.created_at.strftime("%d %b • %H:%M"),
+                status=record.status,
+            )
+        )
+
+    changes = portfolio_changes(db, property_ids, settings.dashboard_change_period_days)
+    figures = [
+        ("Properties", float(property_count), str(property_count)),
+        ("Active tenants", float(tenant_count), str(tenant_count)),
+        ("Active leases", float(active_leases), str(active_leases)),
+        ("Monthly revenue", float(total_revenue), f"KES {total_revenue:,.0f}"),
+        ("Pending KYC", float(pending_kyc), str(pending_kyc)),
+    ]
+    totals = [
+        MetricCard(label=label, value=value, formatted=formatted, change_pct=changes.get(label))
+        for label, value, formatted in figures
+    ]
+
+    return DashboardSummary(totals=totals, occupancy=occupancy_data, activities=activities)
+
+
+def refresh_in_background(key: Hashable, property_ids: frozenset[int] | None) -> None:
+    """Recompute a stale snapshot off the request path; at most one refresh per key."""
+    if not dashboard_cache.begin_refresh(key):
+        return
+    generation = dashboard_cache.generation
+
+    def run() -> None:
+        try:
+            with SessionLocal() as db:
+                dashboard_cache.store(key, build_dashboard_summary(db, property_ids), generation)
+        except Exception:
+            logger.exception("Dashboard snapshot refresh failed for %s", key)
+        finally:
+            dashboard_cache.end_refresh(key)
+
+    _refresher.submit(run)
+
+
+def _touches_dashboard(objects) -> bool:
+    return any(isinstance(obj, DASHBOARD_MODELS) for obj in objects)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dashboard_dirty(session: Session, flush_context) -> None:
+    if _touches_dashboard(session.new) or _touches_dashboard(session.dirty) or _touches_dashboard(session.deleted):
+        session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dashboard_dirty_bulk(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, DASHBOARD_MODELS):
+        orm_execute_state.session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dashboard(session: Session) -> None:
+    if session.info.pop(_DIRTY_KEY, False):
+        dashboard_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dashboard_dirty(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
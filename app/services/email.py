@@ -1,29 +1,83 @@
 import logging
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Protocol
 
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from sqlalchemy.orm import Session
 
 from ..core.config import settings
+from ..models import EmailOutbox
 
 logger = logging.getLogger(__name__)
 
 
-def build_verification_url(token: str) -> str:
-    base = settings.frontend_base_url.rstrip("/")
-    return f"{base}/verify-email?token={token}"
+class EmailTransport(Protocol):
+    def send(self, message: EmailOutbox) -> None:
+        """Deliver ``message`` or raise; the outbox worker retries on any exception."""
 
 
-def send_verification_email(recipient: str, token: str, expires_at) -> bool:
-    """Send an email with the verification link. Returns True if queued."""
-    if not settings.sendgrid_api_key or not settings.sendgrid_from_email:
+class SendGridTransport:
+    """Holds a single SendGrid client for the lifetime of the worker."""
+
+    def __init__(self, api_key: str, from_email: str):
+        from sendgrid import SendGridAPIClient
+
+        self.client = SendGridAPIClient(api_key)
+        self.from_email = from_email
+
+    def send(self, message: EmailOutbox) -> None:
+        from sendgrid.helpers.mail import Mail
+
+        mail = Mail(
+            from_email=self.from_email,
+            to_emails=message.recipient,
+            subject=message.subject,
+            html_content=message.html_body,
+            plain_text_content=message.text_body,
+        )
+        response = self.client.send(mail)
+        if not 200 <= response.status_code < 400:
+            raise RuntimeError(f"SendGrid responded with {response.status_code}")
+
+
+class LogTransport:
+    """Used when SendGrid is not configured, e.g. local development."""
+
+    def send(self, message: EmailOutbox) -> None:
         logger.info(
-            "SendGrid not configured; skipping verification email. token=%s recipient=%s",
-            token,
-            recipient,
+            "SendGrid not configured; skipping email. recipient=%s subject=%s\n%s",
+            message.recipient,
+            message.subject,
+            message.text_body,
         )
-        return False
 
+
+class FakeTransport:
+    """Records messages in memory. ``fail_times`` makes the next N sends raise."""
+
+    def __init__(self, fail_times: int = 0):
+        self.sent: list[EmailOutbox] = []
+        self.fail_times = fail_times
+
+    def send(self, message: EmailOutbox) -> None:
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("Simulated transport failure")
+        self.sent.append(message)
+
+
+def default_transport() -> EmailTransport:
+    if not settings.sendgrid_api_key or not settings.sendgrid_from_email:
+        return LogTransport()
+    return SendGridTransport(settings.sendgrid_api_key, settings.sendgrid_from_email)
+
+
+def build_verification_url(token: str) -> str:
+    base = settings.frontend_base_url.rstrip("/")
+    return f"{base}/verify-email?token={token}"
+
+
+def enqueue_verification_email(db: Session, recipient: str, token: str, expires_at) -> EmailOutbox:
+    """Queue the verification link in the caller's transaction; the outbox worker sends it."""
     verify_url = build_verification_url(token)
     subject = f"{settings.project_name} – Verify your email"
     support_line = (
@@ -47,23 +101,14 @@ def send_verification_email(recipient: str, token: str, expires_at) -> bool:
         f"{support_line}\n"
     )
 
-    message = Mail(
-        from_email=settings.sendgrid_from_email,
-        to_emails=recipient,
+    message = EmailOutbox(
+        recipient=recipient,
         subject=subject,
-        html_content=html_content,
-        plain_text_content=plain_content,
+        html_body=html_content,
+        text_body=plain_content,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc),
     )
-
-    try:
-        sg = SendGridAPIClient(settings.sendgrid_api_key)
-        response = sg.send(message)
-        logger.info(
-            "Verification email queued for %s; status=%s",
-            recipient,
-            response.status_code,
-        )
-        return 200 <= response.status_code < 400
-    except Exception as exc:  # pragma: no cover - network failure
-        logger.error("Failed to send verification email: %s", exc, exc_info=True)
-        return False
+    db.add(message)
+    return message
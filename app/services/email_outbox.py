@@ -0,0 +1,81 @@
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models import EmailOutbox
+from .email import EmailTransport
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempts: int) -> float:
+    """Exponential backoff with equal jitter (half the delay fixed, half random), capped at one hour."""
+    ceiling = min(settings.email_outbox_backoff_seconds * 2 ** (attempts - 1), 3600.0)
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def claim_batch(db: Session, batch_size: int) -> list[EmailOutbox]:
+    """Lock up to ``batch_size`` due messages. SKIP LOCKED lets several workers share the queue."""
+    now = datetime.now(timezone.utc)
+    return (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def deliver_pending(db: Session, transport: EmailTransport, batch_size: int | None = None) -> dict[str, int]:
+    """Send one batch of due messages and commit their outcomes together."""
+    batch = claim_batch(db, batch_size or settings.email_outbox_batch_size)
+    result = {"sent": 0, "retrying": 0, "failed": 0}
+
+    for message in batch:
+        try:
+            transport.send(message)
+        except Exception as exc:
+            message.attempts += 1
+            message.last_error = str(exc)[:1000]
+            if message.attempts >= settings.email_outbox_max_attempts:
+                message.status = "failed"
+                result["failed"] += 1
+                logger.error("Giving up on email %s to %s: %s", message.id, message.recipient, exc)
+            else:
+                delay = backoff_delay(message.attempts)
+                message.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                result["retrying"] += 1
+                logger.warning("Email %s failed (attempt %s), retrying in %.0fs: %s", message.id, message.attempts, delay, exc)
+        else:
+            message.status = "sent"
+            message.sent_at = datetime.now(timezone.utc)
+            message.attempts += 1
+            result["sent"] += 1
+
+    db.commit()
+    return result
+
+
+def run_worker(
+    session_factory,
+    transport: EmailTransport,
+    batch_size: int | None = None,
+    poll_seconds: float | None = None,
+    once: bool = False,
+) -> None:
+    """Drain the outbox, sleeping ``poll_seconds`` whenever a batch comes back empty."""
+    poll_seconds = settings.email_outbox_poll_seconds if poll_seconds is None else poll_seconds
+    while True:
+        with session_factory() as db:
+            result = deliver_pending(db, transport, batch_size)
+        if any(result.values()):
+            logger.info("Email outbox batch: %s", result)
+        elif once:
+            return
+        else:
+            time.sleep(poll_seconds)
@@ -0,0 +1,380 @@
+"""Streaming import of mobile-money and bank statements as payments.
+
+Statements are read line by line (CSV with a header row, or NDJSON), so
+memory stays flat however long the file is; only the open-invoice indexes are
+held. Those are loaded once, keyed by invoice id and by tenant phone, and each
+line is matched in Python:
+
+1. ``account`` naming an open invoice as ``INV-123``, as long as the line's
+   phone (if any) is that invoice's tenant's. Bare numbers are not trusted:
+   paybill account references are usually house numbers;
+2. ``phone`` of a tenant with one open invoice, or with exactly one whose
+   outstanding balance equals the amount.
+
+Matched lines become ``Payment`` rows, inserted per batch with ``ON CONFLICT
+(idempotency_key) DO NOTHING`` so re-importing a statement is harmless: lines
+key on their receipt reference, or on source, line number and content when
+they have none. The invoices are credited with one executemany UPDATE per
+batch. Everything else lands in ``payment_reconciliation_queue`` for a person
+to resolve.
+"""
+
+import codecs
+import csv
+import hashlib
+import json
+import re
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterable, Iterable, Iterator
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import Lease, Payment, PaymentReconciliationItem, RentInvoice, Tenant
+from .access import accessible_unit_ids
+from .payments import PAYMENT_METHODS, credit_invoice, reference_key
+from .search import normalize_phone
+
+IMPORT_BATCH_SIZE = 1000
+OPEN_INVOICE_STATUSES = ("pending", "partial", "overdue")
+STATEMENT_FORMATS = ("csv", "ndjson")
+
+# Column names seen on M-Pesa and bank exports, mapped to the fields the matcher reads.
+FIELD_ALIASES = {
+    "amount": "amount",
+    "paid_in": "amount",
+    "date": "paid_on",
+    "paid_on": "paid_on",
+    "completion_time": "paid_on",
+    "transaction_date": "paid_on",
+    "reference": "reference",
+    "receipt": "reference",
+    "receipt_no": "reference",
+    "transaction_id": "reference",
+    "phone": "phone",
+    "msisdn": "phone",
+    "account": "account",
+    "bill_ref": "account",
+    "account_reference": "account",
+    "invoice": "account",
+    "method": "method",
+}
+_INVOICE_ACCOUNT = re.compile(r"^INV[-\s]?(\d+)$", re.IGNORECASE)
+
+
+@dataclass
+class StatementLine:
+    line_no: int
+    raw: str
+    fields: dict[str, str]
+    amount: Decimal | None = None
+    paid_on: date | None = None
+    error: str | None = None
+
+
+def _field_name(name: str) -> str:
+    key = name.strip().lower().replace(" ", "_")
+    return FIELD_ALIASES.get(key, key)
+
+
+def _statement_line(line_no: int, raw: str, record: dict) -> StatementLine:
+    fields = {_field_name(str(key)): str(value).strip() for key, value in record.items() if value not in (None, "")}
+    line = StatementLine(line_no=line_no, raw=raw, fields=fields)
+    try:
+        line.amount = Decimal(fields.get("amount", "").replace(",", ""))
+    except InvalidOperation:
+        line.error = "invalid_amount"
+        return line
+    if line.amount <= 0:
+        line.error = "invalid_amount"
+        return line
+    if "method" in fields:
+        fields["method"] = fields["method"].lower()
+        if fields["method"] not in PAYMENT_METHODS:
+            line.error = "invalid_method"
+            return line
+    try:
+        # Exports carry either a date or a timestamp; the date part is what matters.
+        line.paid_on = date.fromisoformat(fields.get("paid_on", "")[:10])
+    except ValueError:
+        line.error = "invalid_date"
+    return line
+
+
+class StatementParser:
+    """Turns raw text lines into ``StatementLine``s, remembering the CSV header between calls."""
+
+    def __init__(self, fmt: str):
+        if fmt not in STATEMENT_FORMATS:
+            raise ValueError(f"Unsupported statement format: {fmt}")
+        self.format = fmt
+        self._header: list[str] | None = None
+        self._line_no = 0
+
+    def parse(self, lines: Iterable[str]) -> Iterator[StatementLine]:
+        for raw in lines:
+            self._line_no += 1
+            raw = raw.rstrip("\r\n")
+            if not raw.strip():
+                continue
+            if self.format == "csv":
+                values = next(csv.reader([raw]))
+                if self._header is None:
+                    self._header = values
+                    continue
+                yield _statement_line(self._line_no, raw, dict(zip(self._header, values)))
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                yield StatementLine(line_no=self._line_no, raw=raw, fields={}, error="invalid_json")
+                continue
+            yield _statement_line(self._line_no, raw, record)
+
+
+async def stream_lines(chunks: AsyncIterable[bytes]) -> AsyncIterable[str]:
+    """Split a byte stream into text lines without buffering more than one partial line."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def statement_line_key(source: str, line: StatementLine) -> str:
+    """Idempotency key for a statement line: its receipt reference, else its place and content in the statement."""
+    reference = line.fields.get("reference")
+    if reference:
+        return reference_key(reference)
+    digest = hashlib.sha256(line.raw.encode()).hexdigest()[:16]
+    return f"line:{source}:{line.line_no}:{digest}"
+
+
+@dataclass
+class _OpenInvoice:
+    id: int
+    outstanding: Decimal
+    phone: str | None = None
+
+
+class InvoiceIndex:
+    def __init__(self) -> None:
+        self.by_id: dict[int, _OpenInvoice] = {}
+        self.by_phone: dict[str, list[_OpenInvoice]] = defaultdict(list)
+
+    @classmethod
+    def load(cls, db: Session, property_ids: frozenset[int] | None = None) -> "InvoiceIndex":
+        index = cls()
+        query = (
+            db.query(RentInvoice.id, RentInvoice.amount_due, RentInvoice.amount_paid, Tenant.phone_e164)
+            .join(Lease, Lease.id == RentInvoice.lease_id)
+            .join(Tenant, Tenant.id == Lease.tenant_id)
+            .filter(RentInvoice.status.in_(OPEN_INVOICE_STATUSES))
+        )
+        if property_ids is not None:
+            query = query.filter(Lease.unit_id.in_(accessible_unit_ids(property_ids)))
+        # Oldest first, so a phone with several candidates settles the earliest debt.
+        for invoice_id, amount_due, amount_paid, phone in query.order_by(RentInvoice.due_date, RentInvoice.id).yield_per(
+            10_000
+        ):
+            invoice = _OpenInvoice(invoice_id, Decimal(amount_due or 0) - Decimal(amount_paid or 0), phone)
+            index.by_id[invoice_id] = invoice
+            if phone:
+                index.by_phone[phone].append(invoice)
+        return index
+
+    def match(self, line: StatementLine) -> tuple[_OpenInvoice | None, str]:
+        """Return ``(invoice, how it matched)``, or ``(None, why not)``."""
+        phone = normalize_phone(line.fields.get("phone"))
+        account = _INVOICE_ACCOUNT.match(line.fields.get("account", ""))
+        if account and int(account.group(1)) in self.by_id:
+            invoice = self.by_id[int(account.group(1))]
+            if line.fields.get("phone") and phone != invoice.phone:
+                return None, "account_phone_mismatch"
+            return invoice, "account"
+
+        candidates = [invoice for invoice in self.by_phone.get(phone, ()) if invoice.outstanding > 0]
+        if not candidates:
+            return None, "no_match"
+        if len(candidates) == 1:
+            return candidates[0], "phone"
+        exact = [invoice for invoice in candidates if invoice.outstanding == line.amount]
+        if len(exact) == 1:
+            return exact[0], "phone_amount"
+        return None, "ambiguous"
+
+
+@dataclass
+class ImportReport:
+    source: str
+    lines: int = 0
+    matched: int = 0
+    queued: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    amount_applied: Decimal = Decimal(0)
+    matched_by: Counter = field(default_factory=Counter)
+    seconds: float = 0.0
+
+    @property
+    def match_rate(self) -> float:
+        """Share of new (non-duplicate) lines that matched an invoice."""
+        considered = self.lines - self.duplicates
+        return round(self.matched / considered, 4) if considered else 0.0
+
+    @property
+    def lines_per_second(self) -> float:
+        return round(self.lines / self.seconds, 1) if self.seconds > 0 else 0.0
+
+
+def _insert_ignoring_conflicts(db: Session, table, index_elements: list):
+    dialect = db.get_bind().dialect.name
+    if dialect not in {"postgresql", "sqlite"}:
+        raise ValueError(f"Payment import needs INSERT ... ON CONFLICT support, not available on {dialect}")
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return insert(table).on_conflict_do_nothing(index_elements=index_elements)
+
+
+class PaymentImport:
+    """Feed parsed lines with ``process``; ``finish`` flushes the last batch and returns the report."""
+
+    def __init__(
+        self,
+        db: Session,
+        source: str,
+        method: str = "mobile_money",
+        batch_size: int = IMPORT_BATCH_SIZE,
+        property_ids: frozenset[int] | None = None,
+    ):
+        if method not in PAYMENT_METHODS:
+            raise ValueError(f"Unknown payment method: {method}")
+        self.db = db
+        self.method = method
+        self.batch_size = batch_size
+        self.report = ImportReport(source=source)
+        self._started = time.perf_counter()
+        self.index = InvoiceIndex.load(db, property_ids)
+        self._lines: list[StatementLine] = []
+        self._seen_keys: set[str] = set()
+
+    def process(self, lines: Iterable[StatementLine]) -> None:
+        for line in lines:
+            self._lines.append(line)
+            if len(self._lines) >= self.batch_size:
+                self.flush()
+
+    def finish(self) -> ImportReport:
+        self.flush()
+        self.report.seconds = time.perf_counter() - self._started
+        return self.report
+
+    def flush(self) -> None:
+        if not self._lines:
+            return
+        lines, self._lines = self._lines, []
+        self.report.lines += len(lines)
+
+        # Lines already on record (a re-import, or keyed in by hand) are skipped before matching,
+        # otherwise they would be matched again against whatever the payer still owes.
+        keys = {line.line_no: statement_line_key(self.report.source, line) for line in lines}
+        recorded = {
+            key
+            for (key,) in self.db.query(Payment.idempotency_key).filter(Payment.idempotency_key.in_(keys.values())).all()
+        }
+
+        payments: list[tuple[dict, _OpenInvoice, str]] = []
+        queue: list[dict] = []
+        for line in lines:
+            key = keys[line.line_no]
+            if key in recorded or key in self._seen_keys:
+                self.report.duplicates += 1
+                continue
+            self._seen_keys.add(key)
+            if line.error:
+                queue.append(self._queue_row(line, line.error))
+                continue
+            invoice, how = self.index.match(line)
+            if invoice is None:
+                queue.append(self._queue_row(line, how))
+                continue
+            invoice.outstanding -= line.amount
+            payment = {
+                "invoice_id": invoice.id,
+                "amount": line.amount,
+                "paid_on": line.paid_on,
+                "method": line.fields.get("method") or self.method,
+                "reference": line.fields.get("reference"),
+                "notes": f"Imported from {self.report.source} line {line.line_no}",
+                "idempotency_key": key,
+            }
+            payments.append((payment, invoice, how))
+
+        if payments:
+            self._insert_payments(payments)
+        if queue:
+            self._queue(queue)
+        self.db.commit()
+
+    def _queue(self, queue: list[dict]) -> None:
+        table = PaymentReconciliationItem.__table__
+        stmt = _insert_ignoring_conflicts(self.db, table, [table.c.source, table.c.line_no]).returning(table.c.line_no)
+        inserted = set(self.db.execute(stmt, queue).scalars().all())
+        for row in queue:
+            if row["line_no"] not in inserted:
+                # Queued by an earlier import of this statement.
+                self.report.duplicates += 1
+                continue
+            self.report.queued += 1
+            if row["reason"].startswith("invalid_"):
+                self.report.invalid += 1
+
+    def _queue_row(self, line: StatementLine, reason: str) -> dict:
+        return {
+            "source": self.report.source,
+            "line_no": line.line_no,
+            "reference": line.fields.get("reference"),
+            "phone": line.fields.get("phone"),
+            "account": line.fields.get("account"),
+            "amount": line.amount if line.error != "invalid_amount" else None,
+            "paid_on": line.paid_on,
+            "reason": reason,
+            "raw": line.raw,
+        }
+
+    def _insert_payments(self, payments: list[tuple[dict, _OpenInvoice, str]]) -> None:
+        table = Payment.__table__
+        stmt = _insert_ignoring_conflicts(self.db, table, [table.c.idempotency_key]).returning(table.c.idempotency_key)
+        inserted = set(self.db.execute(stmt, [payment for payment, _, _ in payments]).scalars().all())
+
+        credits: dict[int, Decimal] = defaultdict(Decimal)
+        for payment, invoice, how in payments:
+            if payment["idempotency_key"] not in inserted:
+                # Recorded concurrently since the lookup above; the other writer credited the invoice.
+                invoice.outstanding += payment["amount"]
+                self.report.duplicates += 1
+                continue
+            credits[invoice.id] += payment["amount"]
+            self.report.matched += 1
+            self.report.matched_by[how] += 1
+            self.report.amount_applied += payment["amount"]
+
+        if credits:
+            invoices = RentInvoice.__table__
+            self.db.execute(
+                update(invoices)
+                .where(invoices.c.id == bindparam("target_id"))
+                .values(credit_invoice(bindparam("credit", type_=invoices.c.amount_paid.type))),
+                [{"target_id": invoice_id, "credit": amount} for invoice_id, amount in credits.items()],
+            )
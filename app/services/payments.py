@@ -0,0 +1,114 @@
+"""Applying payments to rent invoices.
+
+The invoice balance moves in one ``UPDATE ... SET amount_paid = amount_paid + :x
+RETURNING``, with the new status derived in the same statement, so concurrent
+payments on one invoice serialize on its row instead of overwriting each other.
+A payment carries an idempotency key: the ``Idempotency-Key`` header, or failing
+that its transaction reference. Mobile-money and bank receipts are unique, so
+their key is global and shared with the statement import; any other reference
+(a cash slip, a cheque number, "rent") only dedupes payments to the same
+invoice, lease or tenant. A retry with a key already on record returns the
+original payment and leaves the invoice untouched.
+"""
+
+from decimal import Decimal
+
+from sqlalchemy import case, literal, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import Payment, RentInvoice
+
+PAYMENT_METHODS = frozenset(Payment.__table__.c.method.type.enums)
+# Methods whose references are receipts issued by the provider, unique across every payer.
+RECEIPT_METHODS = frozenset({"mobile_money", "bank_transfer"})
+
+
+class InvoiceNotFound(LookupError):
+    pass
+
+
+class IdempotencyConflict(ValueError):
+    """The key is already on record for a payment with different details."""
+
+
+def reference_key(reference: str) -> str:
+    """Key for a provider receipt (M-Pesa code, bank ref), the same whoever records it."""
+    return f"ref:{reference}"
+
+
+def idempotency_key_for(header_key: str | None, reference: str | None, method: str | None, scope: str) -> str | None:
+    """The ``Idempotency-Key`` header, else a key from the reference, scoped (e.g. ``invoice:12``) unless it is a receipt."""
+    if header_key:
+        return header_key
+    if not reference:
+        return None
+    if method in RECEIPT_METHODS:
+        return reference_key(reference)
+    return f"{scope}:ref:{reference}"
+
+
+def credit_invoice(amount) -> dict:
+    """SET clause adding ``amount`` to an invoice, with the status derived from the new balance."""
+    paid = RentInvoice.amount_paid + amount
+    return {
+        "amount_paid": paid,
+        "status": case(
+            (paid >= RentInvoice.amount_due, "paid"),
+            (RentInvoice.status == "overdue", "overdue"),
+            (paid > 0, "partial"),
+            else_="pending",
+        ),
+    }
+
+
+def replay(db: Session, key: str, amount: Decimal, **target: int | None) -> Payment | None:
+    """The payment already recorded under ``key``, if its amount and target (e.g. ``invoice_id``) match."""
+    existing = db.query(Payment).filter(Payment.idempotency_key == key).first()
+    if existing is None:
+        return None
+    if Decimal(existing.amount) != amount or any(getattr(existing, name) != value for name, value in target.items()):
+        raise IdempotencyConflict("Idempotency key already used for a different payment")
+    return existing
+
+
+def apply_payment(db: Session, data: dict, idempotency_key: str | None = None) -> tuple[Payment, bool]:
+    """Record a payment and add it to its invoice atomically.
+
+    Returns ``(payment, created)``; ``created`` is False when the key replays
+    an earlier payment. Raises ``InvoiceNotFound`` or ``IdempotencyConflict``.
+    """
+    invoice_id = data["invoice_id"]
+    amount = Decimal(str(data["amount"]))
+    key = idempotency_key_for(idempotency_key, data.get("reference"), data.get("method"), f"invoice:{invoice_id}")
+
+    if key is not None:
+        existing = replay(db, key, amount, invoice_id=invoice_id)
+        if existing is not None:
+            return existing, False
+
+    applied = db.execute(
+        update(RentInvoice)
+        .where(RentInvoice.id == invoice_id)
+        .values(credit_invoice(literal(amount, RentInvoice.amount_paid.type)))
+        .returning(RentInvoice.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if applied is None:
+        db.rollback()
+        raise InvoiceNotFound(invoice_id)
+
+    payment = Payment(**{**data, "amount": amount}, idempotency_key=key)
+    db.add(payment)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key committed first; our invoice update rolls back with us.
+        db.rollback()
+        existing = replay(db, key, amount, invoice_id=invoice_id) if key is not None else None
+        if existing is None:
+            raise
+        return existing, False
+
+    db.refresh(payment)
+    return payment, True
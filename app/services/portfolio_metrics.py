@@ -0,0 +1,187 @@
+"""Daily per-property portfolio snapshots behind ``MetricCard.change_pct``.
+
+``record_portfolio_metrics`` writes one ``daily_portfolio_metrics`` row per
+property per day in a date range. It makes a single pass over the leases:
+each lease adds +1 (and its rent) on the first day it was active and -1 the
+day after it ended, and a running sum per property then yields every day's
+figures. The scheduled job records today, and the backfill records a past
+range with the same code. KYC status has no history, so ``pending_kyc`` is
+only filled for today.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterator
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from ..models import DailyPortfolioMetrics, Lease, Property, Tenant, Unit
+from .access import filter_accessible
+from .property_metrics import PENDING_KYC_STATUSES
+
+SNAPSHOT_BATCH_SIZE = 5000
+ENDED_STATUSES = ("terminated", "expired")
+# Dashboard cards, in the order of the aggregates selected by ``portfolio_changes``.
+CARD_LABELS = ("Properties", "Active tenants", "Active leases", "Monthly revenue", "Pending KYC")
+
+
+def _lease_last_day(start_date: date, end_date: date | None, status: str, updated_at) -> date | None:
+    """Last day a lease was active, or ``None`` if it still is."""
+    if end_date is not None:
+        return end_date
+    if status in ENDED_STATUSES:
+        # Ended without an end date: the status change is the best record of when.
+        return updated_at.date() if updated_at is not None else start_date
+    return None
+
+
+def _merge_spans(spans: list[tuple[int, int]]) -> Iterator[tuple[int, int]]:
+    """Coalesce overlapping day spans so a tenant with back-to-back leases counts once."""
+    spans = sorted(spans)
+    first, last = spans[0]
+    for next_first, next_last in spans[1:]:
+        if next_first > last + 1:
+            yield first, last
+            first = next_first
+        last = max(last, next_last)
+    yield first, last
+
+
+def _portfolio_rows(db: Session, start: date, end: date, today: date) -> Iterator[dict]:
+    days = (end - start).days + 1
+    lease_deltas: dict[int, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    revenue_deltas: dict[int, dict[int, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
+    tenant_spans: dict[tuple[int, int], list[tuple[int, int]]] = defaultdict(list)
+
+    leases = (
+        db.query(
+            Unit.property_id,
+            Lease.tenant_id,
+            Lease.rent_amount,
+            Lease.start_date,
+            Lease.end_date,
+            Lease.status,
+            Lease.updated_at,
+        )
+        .join(Unit, Unit.id == Lease.unit_id)
+        .filter(Lease.status != "draft", Lease.start_date <= end)
+        .yield_per(SNAPSHOT_BATCH_SIZE)
+    )
+    for property_id, tenant_id, rent, start_date, end_date, status, updated_at in leases:
+        last_day = _lease_last_day(start_date, end_date, status, updated_at)
+        first = max((start_date - start).days, 0)
+        last = days - 1 if last_day is None else min((last_day - start).days, days - 1)
+        if last < first:
+            continue
+        lease_deltas[property_id][first] += 1
+        lease_deltas[property_id][last + 1] -= 1
+        revenue_deltas[property_id][first] += rent or 0
+        revenue_deltas[property_id][last + 1] -= rent or 0
+        tenant_spans[(property_id, tenant_id)].append((first, last))
+
+    today_index = (today - start).days if start <= today <= end else None
+    pending_tenants: set[int] = set()
+    if today_index is not None:
+        pending_tenants = {
+            tenant_id
+            for (tenant_id,) in db.query(Tenant.id).filter(Tenant.kyc_status.in_(PENDING_KYC_STATUSES)).all()
+        }
+
+    tenant_deltas: dict[int, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    pending_kyc: dict[int, int] = defaultdict(int)
+    for (property_id, tenant_id), spans in tenant_spans.items():
+        for first, last in _merge_spans(spans):
+            tenant_deltas[property_id][first] += 1
+            tenant_deltas[property_id][last + 1] -= 1
+            if tenant_id in pending_tenants and first <= today_index <= last:
+                pending_kyc[property_id] += 1
+
+    for property_id, owner_id, created_at in db.query(Property.id, Property.owner_id, Property.created_at).all():
+        opened = max((created_at.date() - start).days, 0) if created_at is not None else 0
+        leases_delta = lease_deltas.get(property_id, {})
+        revenue_delta = revenue_deltas.get(property_id, {})
+        tenants_delta = tenant_deltas.get(property_id, {})
+        active_leases, revenue, tenants = 0, Decimal(0), 0
+        for index in range(days):
+            active_leases += leases_delta.get(index, 0)
+            revenue += revenue_delta.get(index, 0)
+            tenants += tenants_delta.get(index, 0)
+            if index < opened:
+                continue
+            yield {
+                "snapshot_date": start + timedelta(days=index),
+                "property_id": property_id,
+                "owner_id": owner_id,
+                "tenants": tenants,
+                "active_leases": active_leases,
+                "monthly_revenue": revenue,
+                "pending_kyc": pending_kyc.get(property_id, 0) if index == today_index else None,
+            }
+
+
+def record_portfolio_metrics(
+    db: Session,
+    start: date,
+    end: date | None = None,
+    today: date | None = None,
+    batch_size: int = SNAPSHOT_BATCH_SIZE,
+) -> int:
+    """Replace the snapshots for ``start``..``end`` (inclusive) in one transaction. Returns rows written."""
+    end = end or start
+    if end < start:
+        raise ValueError("end must not be before start")
+    today = today or date.today()
+
+    db.execute(
+        delete(DailyPortfolioMetrics)
+        .where(DailyPortfolioMetrics.snapshot_date.between(start, end))
+        .execution_options(synchronize_session=False)
+    )
+    written = 0
+    batch: list[dict] = []
+    for row in _portfolio_rows(db, start, end, today):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.execute(insert(DailyPortfolioMetrics), batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(DailyPortfolioMetrics), batch)
+        written += len(batch)
+    db.commit()
+    return written
+
+
+def _change_pct(current, previous) -> float | None:
+    if current is None or not previous:
+        return None
+    return round((float(current) - float(previous)) / float(previous) * 100, 1)
+
+
+def portfolio_changes(db: Session, property_ids: frozenset[int] | None, period_days: int) -> dict[str, float | None]:
+    """Percent change per dashboard card between the latest snapshot and ``period_days`` before it."""
+    latest = db.query(func.max(DailyPortfolioMetrics.snapshot_date)).scalar()
+    if latest is None:
+        return {}
+    previous = latest - timedelta(days=period_days)
+
+    snapshot = DailyPortfolioMetrics
+    query = db.query(
+        snapshot.snapshot_date,
+        func.count(snapshot.property_id),
+        func.sum(snapshot.tenants),
+        func.sum(snapshot.active_leases),
+        func.sum(snapshot.monthly_revenue),
+        func.sum(snapshot.pending_kyc),
+    ).filter(snapshot.snapshot_date.in_([latest, previous]))
+    rows = {
+        row[0]: row[1:]
+        for row in filter_accessible(query, snapshot.property_id, property_ids).group_by(snapshot.snapshot_date).all()
+    }
+    if latest not in rows or previous not in rows:
+        return {}
+    return {
+        label: _change_pct(current, prior) for label, current, prior in zip(CARD_LABELS, rows[latest], rows[previous])
+    }
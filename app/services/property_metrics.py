@@ -0,0 +1,234 @@
+from dataclasses import dataclass
+from itertools import chain
+from typing import Iterable
+
+from sqlalchemy import case, delete, event, func, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import Lease, Property, PropertyMetricsRollup, Tenant, Unit
+
+PENDING_KYC_STATUSES = ("pending", "submitted", "conditional")
+REBUILD_CHUNK_SIZE = 500
+
+
+@dataclass(frozen=True)
+class PropertyMetrics:
+    property_id: int
+    units_total: int = 0
+    units_occupied: int = 0
+    pending_kyc: int = 0
+    monthly_revenue: float = 0.0
+
+    @property
+    def units_vacant(self) -> int:
+        return max(self.units_total - self.units_occupied, 0)
+
+    @property
+    def occupancy_rate(self) -> float:
+        if not self.units_total:
+            return 0.0
+        return round(self.units_occupied / self.units_total, 2)
+
+    @classmethod
+    def from_rollup(cls, property_id: int, row: PropertyMetricsRollup | None) -> "PropertyMetrics":
+        if row is None:
+            return cls(property_id=property_id)
+        return cls(
+            property_id=property_id,
+            units_total=row.units_total or 0,
+            units_occupied=row.units_occupied or 0,
+            pending_kyc=row.pending_kyc or 0,
+            monthly_revenue=float(row.monthly_revenue or 0),
+        )
+
+
+def compute_property_metrics(db: Session, property_ids: Iterable[int]) -> dict[int, PropertyMetrics]:
+    """Compute unit, occupancy, KYC and revenue metrics for properties in one round trip.
+
+    Units are outer-joined to their leases and tenants once, and each metric is
+    derived with conditional aggregation over that single row set. Properties
+    without units are absent from the result; use ``metrics_for`` to read with
+    a zeroed default.
+    """
+    ids = list(property_ids)
+    if not ids:
+        return {}
+
+    is_active = Lease.status == "active"
+    rows = (
+        db.query(
+            Unit.property_id,
+            func.count(func.distinct(Unit.id)),
+            func.count(func.distinct(case((is_active, Unit.id)))),
+            func.count(func.distinct(case((Tenant.kyc_status.in_(PENDING_KYC_STATUSES), Tenant.id)))),
+            func.coalesce(func.sum(case((is_active, Lease.rent_amount), else_=0)), 0),
+        )
+        .outerjoin(Lease, Lease.unit_id == Unit.id)
+        .outerjoin(Tenant, Tenant.id == Lease.tenant_id)
+        .filter(Unit.property_id.in_(ids))
+        .group_by(Unit.property_id)
+        .all()
+    )
+
+    return {
+        property_id: PropertyMetrics(
+            property_id=property_id,
+            units_total=units_total or 0,
+            units_occupied=units_occupied or 0,
+            pending_kyc=pending_kyc or 0,
+            monthly_revenue=float(monthly_revenue or 0),
+        )
+        for property_id, units_total, units_occupied, pending_kyc, monthly_revenue in rows
+    }
+
+
+def metrics_for(metrics: dict[int, PropertyMetrics], property_id: int) -> PropertyMetrics:
+    return metrics.get(property_id) or PropertyMetrics(property_id=property_id)
+
+
+def read_property_metrics(db: Session, property_ids: Iterable[int]) -> dict[int, PropertyMetrics]:
+    """Read metrics from the ``property_metrics`` rollup instead of aggregating leases."""
+    ids = list(property_ids)
+    if not ids:
+        return {}
+
+    rows = db.query(PropertyMetricsRollup).filter(PropertyMetricsRollup.property_id.in_(ids)).all()
+    return {row.property_id: PropertyMetrics.from_rollup(row.property_id, row) for row in rows}
+
+
+def _upsert_rollup(db: Session, values: list[dict]) -> None:
+    if not values:
+        return
+
+    dialect = db.get_bind().dialect.name
+    table = PropertyMetricsRollup.__table__
+    if dialect in {"postgresql", "sqlite"}:
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.property_id],
+            set_={
+                "units_total": stmt.excluded.units_total,
+                "units_occupied": stmt.excluded.units_occupied,
+                "pending_kyc": stmt.excluded.pending_kyc,
+                "monthly_revenue": stmt.excluded.monthly_revenue,
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt, values)
+    else:
+        db.execute(delete(table).where(table.c.property_id.in_([v["property_id"] for v in values])))
+        db.execute(table.insert(), values)
+
+
+def refresh_property_metrics(db: Session, property_ids: Iterable[int]) -> None:
+    """Recompute the rollup rows for ``property_ids`` inside the caller's transaction."""
+    ids = sorted({pid for pid in property_ids if pid is not None})
+    if not ids:
+        return
+
+    existing = {pid for (pid,) in db.query(Property.id).filter(Property.id.in_(ids)).all()}
+    removed = set(ids) - existing
+    if removed:
+        db.execute(delete(PropertyMetricsRollup).where(PropertyMetricsRollup.property_id.in_(removed)))
+
+    metrics = compute_property_metrics(db, existing)
+    _upsert_rollup(
+        db,
+        [
+            {
+                "property_id": pid,
+                "units_total": m.units_total,
+                "units_occupied": m.units_occupied,
+                "pending_kyc": m.pending_kyc,
+                "monthly_revenue": m.monthly_revenue,
+            }
+            for pid, m in ((pid, metrics_for(metrics, pid)) for pid in sorted(existing))
+        ],
+    )
+
+
+def rebuild_property_metrics(db: Session, chunk_size: int = REBUILD_CHUNK_SIZE) -> int:
+    """Recompute every rollup row from source tables to repair drift. Returns rows written."""
+    db.execute(
+        delete(PropertyMetricsRollup).where(
+            ~PropertyMetricsRollup.property_id.in_(db.query(Property.id).scalar_subquery())
+        )
+    )
+
+    written = 0
+    last_id = 0
+    while True:
+        ids = [
+            pid
+            for (pid,) in db.query(Property.id)
+            .filter(Property.id > last_id)
+            .order_by(Property.id.asc())
+            .limit(chunk_size)
+            .all()
+        ]
+        if not ids:
+            break
+        refresh_property_metrics(db, ids)
+        db.commit()
+        written += len(ids)
+        last_id = ids[-1]
+
+    db.commit()
+    return written
+
+
+def _history_values(obj, attr: str) -> set:
+    history = inspect(obj).attrs[attr].history
+    values = set(history.added or ()) | set(history.deleted or ()) | set(history.unchanged or ())
+    return {value for value in values if value is not None}
+
+
+def _attr_changed(obj, *attrs: str) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _collect_affected_properties(session: Session) -> set[int]:
+    property_ids: set[int] = set()
+    unit_ids: set[int] = set()
+    tenant_ids: set[int] = set()
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        is_structural = obj in session.new or obj in session.deleted
+        if isinstance(obj, Property) and is_structural:
+            property_ids.add(obj.id)
+        elif isinstance(obj, Unit) and (is_structural or _attr_changed(obj, "property_id")):
+            property_ids |= _history_values(obj, "property_id")
+        elif isinstance(obj, Lease) and (
+            is_structural or _attr_changed(obj, "status", "rent_amount", "unit_id", "tenant_id")
+        ):
+            unit_ids |= _history_values(obj, "unit_id")
+        elif isinstance(obj, Tenant) and obj not in session.new and (
+            obj in session.deleted or _attr_changed(obj, "kyc_status")
+        ):
+            tenant_ids.add(obj.id)
+
+    if unit_ids:
+        property_ids |= {
+            pid for (pid,) in session.query(Unit.property_id).filter(Unit.id.in_(unit_ids)).all()
+        }
+    if tenant_ids:
+        property_ids |= {
+            pid
+            for (pid,) in session.query(Unit.property_id)
+            .join(Lease, Lease.unit_id == Unit.id)
+            .filter(Lease.tenant_id.in_(tenant_ids))
+            .distinct()
+            .all()
+        }
+
+    return property_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_property_metrics(session: Session, flush_context) -> None:
+    property_ids = _collect_affected_properties(session)
+    if property_ids:
+        refresh_property_metrics(session, property_ids)
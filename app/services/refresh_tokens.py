@@ -0,0 +1,106 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models import RefreshToken
+
+
+class RefreshTokenError(ValueError):
+    """Raised when a refresh token is unknown, expired, revoked or replayed."""
+
+
+def _hash_token(raw: str) -> str:
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is written in UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def issue_refresh_token(db: Session, user_id: int, family_id: str | None = None) -> tuple[str, RefreshToken]:
+    """Create a refresh token for ``user_id``. Returns the raw token and its (unflushed) row."""
+    raw = secrets.token_urlsafe(48)
+    token = RefreshToken(
+        user_id=user_id,
+        token_hash=_hash_token(raw),
+        family_id=family_id or secrets.token_hex(16),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days),
+    )
+    db.add(token)
+    return raw, token
+
+
+def revoke_token_family(db: Session, family_id: str) -> int:
+    return (
+        db.query(RefreshToken)
+        .filter(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .update({RefreshToken.revoked_at: datetime.now(timezone.utc)}, synchronize_session=False)
+    )
+
+
+def revoke_refresh_token(db: Session, raw: str) -> int:
+    """Revoke the family ``raw`` belongs to, i.e. log out the device holding it."""
+    token = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_token(raw)).first()
+    if token is None:
+        return 0
+    return revoke_token_family(db, token.family_id)
+
+
+def revoke_user_refresh_tokens(db: Session, user_id: int) -> int:
+    """Revoke every live refresh token for ``user_id`` in one statement."""
+    return (
+        db.query(RefreshToken)
+        .filter(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .update({RefreshToken.revoked_at: datetime.now(timezone.utc)}, synchronize_session=False)
+    )
+
+
+def rotate_refresh_token(db: Session, raw: str) -> tuple[str, RefreshToken]:
+    """Exchange ``raw`` for a new token in the same family.
+
+    Presenting a token that was already rotated is treated as theft: the whole
+    family is revoked (and committed) before ``RefreshTokenError`` is raised.
+    The successful path leaves committing to the caller.
+    """
+    token = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_token(raw)).first()
+    if token is None:
+        raise RefreshTokenError("Invalid refresh token")
+
+    if token.revoked_at is not None:
+        revoke_token_family(db, token.family_id)
+        db.commit()
+        raise RefreshTokenError("Refresh token reuse detected")
+
+    now = datetime.now(timezone.utc)
+    if _as_utc(token.expires_at) <= now:
+        raise RefreshTokenError("Refresh token expired")
+
+    # Conditional claim so two concurrent refreshes cannot both rotate the same token.
+    claimed = (
+        db.query(RefreshToken)
+        .filter(RefreshToken.id == token.id, RefreshToken.revoked_at.is_(None))
+        .update({RefreshToken.revoked_at: now}, synchronize_session=False)
+    )
+    if not claimed:
+        revoke_token_family(db, token.family_id)
+        db.commit()
+        raise RefreshTokenError("Refresh token reuse detected")
+
+    new_raw, replacement = issue_refresh_token(db, token.user_id, family_id=token.family_id)
+    db.flush()
+    db.query(RefreshToken).filter(RefreshToken.id == token.id).update(
+        {RefreshToken.replaced_by_id: replacement.id}, synchronize_session=False
+    )
+    return new_raw, replacement
+
+
+def prune_refresh_tokens(db: Session, older_than_days: int = 7) -> int:
+    """Delete tokens that expired more than ``older_than_days`` ago."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    deleted = db.query(RefreshToken).filter(RefreshToken.expires_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -0,0 +1,97 @@
+import re
+
+from sqlalchemy import case, event, func, literal_column, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..core.config import settings
+from ..models import Property, Tenant
+
+# Below this length trigram similarity is meaningless, so only substring matching applies.
+MIN_FUZZY_LENGTH = 3
+MIN_PHONE_DIGITS = 4
+
+
+def normalize_phone(raw: str | None, default_country_code: str | None = None) -> str | None:
+    """Normalise a phone number to E.164 (``+<country><subscriber>``), or None if unparseable."""
+    if not raw:
+        return None
+
+    country_code = default_country_code or settings.default_phone_country_code
+    value = raw.strip()
+    digits = re.sub(r"\D", "", value)
+    if not digits:
+        return None
+
+    if value.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith(country_code) and len(digits) > len(country_code) + 6:
+        pass
+    elif digits.startswith("0"):
+        digits = country_code + digits[1:]
+    else:
+        digits = country_code + digits
+
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+
+def _phone_fragment(term: str) -> str | None:
+    digits = re.sub(r"\D", "", term)
+    if len(digits) < MIN_PHONE_DIGITS:
+        return None
+    # A national trunk prefix never appears in the stored E.164 form.
+    return digits.lstrip("0") or None
+
+
+def _fuzzy(column: ColumnElement, term: str, dialect: str) -> tuple[list[ColumnElement], ColumnElement | None]:
+    """Substring predicate plus, on Postgres, pg_trgm similarity match and rank for ``column``."""
+    # Literal '' (not a bound parameter) so the expression matches the trigram index definition.
+    lowered = func.lower(func.coalesce(column, literal_column("''")))
+    predicates = [lowered.like(f"%{term}%")]
+    if dialect != "postgresql" or len(term) < MIN_FUZZY_LENGTH:
+        return predicates, None
+    predicates.append(lowered.op("%")(term))
+    return predicates, func.similarity(lowered, term)
+
+
+def _combine(term: str, dialect: str, columns: list[ColumnElement]) -> tuple[ColumnElement, ColumnElement | None]:
+    predicates: list[ColumnElement] = []
+    ranks: list[ColumnElement] = []
+    for column in columns:
+        column_predicates, rank = _fuzzy(column, term, dialect)
+        predicates.extend(column_predicates)
+        if rank is not None:
+            ranks.append(rank)
+
+    if not ranks:
+        return or_(*predicates), None
+    return or_(*predicates), func.greatest(*ranks) if len(ranks) > 1 else ranks[0]
+
+
+def property_search(term: str, dialect: str) -> tuple[ColumnElement, ColumnElement | None]:
+    """Return ``(predicate, rank)`` for a property search; ``rank`` is None without pg_trgm."""
+    return _combine(term.strip().lower(), dialect, [Property.name, Property.code])
+
+
+def tenant_search(term: str, dialect: str) -> tuple[ColumnElement, ColumnElement | None]:
+    """Return ``(predicate, rank)`` for a tenant search over name, email and phone."""
+    cleaned = term.strip().lower()
+    predicate, rank = _combine(cleaned, dialect, [Tenant.full_name, Tenant.email])
+
+    # Raw substring match keeps numbers that could not be normalised findable.
+    predicate = or_(predicate, func.lower(func.coalesce(Tenant.phone, literal_column("''"))).like(f"%{cleaned}%"))
+    fragment = _phone_fragment(cleaned)
+    if fragment:
+        phone_match = Tenant.phone_e164.like(f"%{fragment}%")
+        predicate = or_(predicate, phone_match)
+        if rank is not None:
+            rank = func.greatest(rank, case((phone_match, 1.0), else_=0.0))
+    return predicate, rank
+
+
+@event.listens_for(Tenant.phone, "set")
+def _sync_phone_e164(target: Tenant, value, oldvalue, initiator) -> None:
+    target.phone_e164 = normalize_phone(value)
@@ -0,0 +1,17 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import User
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def get_user_by_email(db: Session, email: str) -> User | None:
+    """Case-insensitive lookup served by the unique ``lower(email)`` index.
+
+    The predicate must stay ``lower(users.email) = :email`` for the planner to
+    match ``ix_users_email_lower``.
+    """
+    return db.query(User).filter(func.lower(User.email) == normalize_email(email)).first()
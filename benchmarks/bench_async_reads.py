@@ -0,0 +1,104 @@
+"""Throughput of the async read path versus the sync (threadpool) path.
+
+Both variants run the same ``_list_properties`` query code; the sync one is
+mounted here as a benchmark-only threadpool route. It opens and closes its
+session inside the handler: with a ``get_db`` generator dependency, 200
+clients deadlock the default 40-thread pool against the 15-connection
+QueuePool (teardown needs a free thread to return a connection).
+Requests are driven in-process through httpx's ASGI transport by
+``--clients`` concurrent workers.
+
+    python -m benchmarks.bench_async_reads --clients 200 --requests 4000
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_async_reads
+
+Without DATABASE_URL a scratch SQLite file is used. The schema is created
+and seeded, so never point it at a real database.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-async-'), 'bench.db')}",
+)
+
+import httpx  # noqa: E402
+from fastapi import Depends  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+from app.core.database import Base, SessionLocal, db_session, engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.dependencies import _resolve_current_user, auth_scheme  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Property, User  # noqa: E402
+from app.routers.properties import _list_properties  # noqa: E402
+from app.schemas import PropertyListResponse, PropertyQuery  # noqa: E402
+
+
+def list_properties_sync(
+    query: PropertyQuery = Depends(),
+    credentials: HTTPAuthorizationCredentials = Depends(auth_scheme),
+):
+    with db_session() as db:
+        return _list_properties(db, _resolve_current_user(db, credentials), query)
+
+
+app.add_api_route("/bench/properties-sync", list_properties_sync, response_model=PropertyListResponse)
+
+
+def seed(properties: int) -> str:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="bench-owner@example.com", password_hash="x", role="owner", active=True)
+        db.add(user)
+        db.flush()
+        db.add_all(Property(name=f"Bench {n}", code=f"B{n}", owner_id=user.id) for n in range(properties))
+        db.commit()
+        return create_access_token(subject=user.id)
+
+
+async def drive(path: str, token: str, clients: int, total: int) -> tuple[float, list[float]]:
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: list[float] = []
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def worker() -> None:
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers, params={"limit": 20})
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        return time.perf_counter() - started, sorted(latencies)
+
+
+def report(label: str, elapsed: float, latencies: list[float]) -> None:
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<6} {len(latencies) / elapsed:8.1f} req/s  p50={p50:7.1f}ms  p99={p99:7.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--properties", type=int, default=500)
+    args = parser.parse_args()
+
+    token = seed(args.properties)
+    print(f"{args.clients} concurrent clients, {args.requests} requests each run ({engine.dialect.name})")
+    for label, path in (("sync", "/bench/properties-sync"), ("async", "/properties/")):
+        asyncio.run(drive(path, token, args.clients, args.clients))  # warm-up
+        report(label, *asyncio.run(drive(path, token, args.clients, args.requests)))
+
+
+if __name__ == "__main__":
+    main()
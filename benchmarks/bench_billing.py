@@ -0,0 +1,78 @@
+"""Billing-run throughput: invoices created per second for a month-end run.
+
+Seeds ``--leases`` active leases into a scratch database, then runs
+``run_billing`` for one period twice: the first run creates every invoice,
+and the rerun only probes the ``(lease_id, period_start)`` index.
+
+    python -m benchmarks.bench_billing --leases 100000
+    python -m benchmarks.bench_billing --database-url postgresql+psycopg://... --batch-size 5000
+
+Never point ``--database-url`` at a real database: all tables are dropped
+and recreated.
+"""
+
+import argparse
+import os
+import tempfile
+from datetime import date
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+# Settings require a DATABASE_URL at import time; the app engine itself is unused here.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.core.database import Base
+from app.models import Lease, Property, Tenant, Unit
+from app.services.billing import run_billing
+
+PERIOD = date(2025, 2, 1)
+
+
+def seed(engine, count: int, batch_size: int = 20_000) -> None:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Property.__table__), [{"name": "Bench", "code": "BENCH"}])
+        conn.execute(insert(Tenant.__table__), [{"full_name": "Bench tenant"}])
+        for start in range(0, count, batch_size):
+            ids = range(start + 1, min(start + batch_size, count) + 1)
+            conn.execute(insert(Unit.__table__), [{"id": n, "property_id": 1, "name": f"U{n}", "rent_amount": 10000} for n in ids])
+            conn.execute(
+                insert(Lease.__table__),
+                [
+                    {
+                        "unit_id": n,
+                        "tenant_id": 1,
+                        "start_date": date(2024, 1, 1),
+                        "rent_amount": 10000 + n % 500,
+                        "payment_day": n % 31 + 1,
+                        "status": "active",
+                    }
+                    for n in ids
+                ],
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--leases", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_billing.db')}"
+    engine = create_engine(url)
+    seed(engine, args.leases)
+
+    with Session(engine) as db:
+        for label in ("first run", "rerun"):
+            result = run_billing(db, PERIOD, batch_size=args.batch_size)
+            print(
+                f"{label:<10} created={result.invoices_created:>8}  skipped={result.already_invoiced:>8}  "
+                f"{result.seconds:7.2f}s  {result.rows_per_second:>10,.0f} rows/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Login lookup latency with and without the lower(email) index.
+
+Seeds ``--users`` rows into a scratch database, then times
+``get_user_by_email`` for random mixed-case addresses, first without
+``ix_users_email_lower`` (sequential scan) and then with it.
+
+    python -m benchmarks.bench_email_lookup --users 1000000
+    python -m benchmarks.bench_email_lookup --database-url postgresql+psycopg://... --users 1000000
+
+Never point ``--database-url`` at a real database: the users table is dropped
+and recreated.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+
+# Settings require a DATABASE_URL at import time; the app engine itself is unused here.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.models import User
+from app.services.users import get_user_by_email
+
+INDEX_NAME = "ix_users_email_lower"
+
+
+def _email(n: int) -> str:
+    return f"user{n:07d}@example.com"
+
+
+def seed(engine, count: int, batch_size: int = 20_000) -> None:
+    User.__table__.drop(engine, checkfirst=True)
+    User.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+        for start in range(0, count, batch_size):
+            rows = [
+                {"email": _email(n), "password_hash": "x", "role": "owner", "active": True}
+                for n in range(start, min(start + batch_size, count))
+            ]
+            conn.execute(insert(User.__table__), rows)
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE users"))
+
+
+def time_lookups(engine, count: int, samples: int) -> list[float]:
+    timings = []
+    with Session(engine) as db:
+        for _ in range(samples):
+            target = _email(random.randrange(count)).upper()
+            started = time.perf_counter()
+            user = get_user_by_email(db, target)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert user is not None
+            db.expunge_all()
+    return timings
+
+
+def report(label: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<16} p50={statistics.median(timings):8.3f}ms  p95={p95:8.3f}ms  max={timings[-1]:8.3f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_email.db')}"
+    engine = create_engine(url)
+
+    started = time.perf_counter()
+    seed(engine, args.users)
+    print(f"Seeded {args.users} users in {time.perf_counter() - started:.1f}s ({engine.dialect.name})")
+
+    report("seq scan", time_lookups(engine, args.users, max(args.samples // 10, 10)))
+
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE UNIQUE INDEX {INDEX_NAME} ON users (lower(email))"))
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE users"))
+    report("lower(email) idx", time_lookups(engine, args.users, args.samples))
+
+
+if __name__ == "__main__":
+    main()
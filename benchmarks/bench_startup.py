@@ -0,0 +1,77 @@
+"""Cold-start cost: importing ``app.main`` and running its lifespan startup.
+
+Each run is a fresh interpreter, like a Railway scale-from-zero or worker
+restart. Prints the median of ``--runs`` and the slowest modules by
+self import time from the last run.
+
+    python -m benchmarks.bench_startup --runs 5
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_startup
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def startup():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(startup())
+print(json.dumps({"import_s": imported - started, "startup_s": ready - imported}))
+"""
+
+
+def run_once(env: dict[str, str]) -> tuple[dict[str, float], list[tuple[int, str]]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules.append((int(self_us), name.strip()))
+    return timings, sorted(modules, reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}")
+
+    runs = []
+    modules: list[tuple[int, str]] = []
+    for _ in range(args.runs):
+        timings, modules = run_once(env)
+        runs.append(timings)
+
+    for key in ("import_s", "startup_s"):
+        values = [run[key] for run in runs]
+        print(f"{key:<10} median={statistics.median(values) * 1000:8.1f}ms  max={max(values) * 1000:8.1f}ms")
+    print(f"create_all on startup: {env.get('DB_CREATE_ALL_ON_STARTUP', 'default')}")
+    print("slowest modules (self time):")
+    for self_us, name in modules[: args.top]:
+        print(f"  {self_us / 1000:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
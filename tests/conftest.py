@@ -0,0 +1,118 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='easy-estates-'), 'test.db')}",
+)
+# Hash inline in tests; the process pool is exercised explicitly in test_auth.
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+from app.core.database import Base, SessionLocal, async_engine, engine  # noqa: E402
+from app.core.principals import clear_principals  # noqa: E402
+from app.core.query_stats import repeated_shapes  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.core.token_versions import get_token_version_store  # noqa: E402
+from app.models import User  # noqa: E402
+from app.services.access import clear_access_scopes  # noqa: E402
+from app.services.dashboard import dashboard_cache  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def schema():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def db(schema):
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    clear_principals()
+    get_token_version_store().clear()
+    clear_access_scopes()
+    dashboard_cache.invalidate()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_user(db):
+    counter = {"n": 0}
+
+    def factory(role: str = "owner", active: bool = True):
+        counter["n"] += 1
+        user = User(
+            email=f"{role}{counter['n']}@example.com",
+            password_hash="not-a-real-hash",
+            role=role,
+            active=active,
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        headers = {"Authorization": f"Bearer {create_access_token(subject=user.id)}"}
+        return user, headers
+
+    return factory
+
+
+@contextmanager
+def count_queries():
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = (engine, async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def query_counter():
+    return count_queries
+
+
+@pytest.fixture
+def query_budget():
+    """Fail the test if the block runs more than ``limit`` statements or repeats one shape.
+
+        with query_budget(3):
+            client.get("/leases/1", headers=headers)
+    """
+
+    @contextmanager
+    def budget(limit: int, allow_repeats: bool = False):
+        with count_queries() as statements:
+            yield statements
+        if len(statements) > limit:
+            listing = "\n".join(statements)
+            pytest.fail(f"Query budget exceeded: {len(statements)} > {limit}\n{listing}")
+        repeats = repeated_shapes(statements)
+        if repeats and not allow_repeats:
+            pytest.fail(f"Probable N+1: {repeats}")
+
+    return budget
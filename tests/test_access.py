@@ -0,0 +1,92 @@
+from datetime import date
+
+from app.models import Lease, MaintenanceRequest, Property, PropertyManager, Tenant, Unit
+from app.services.access import accessible_property_ids
+
+
+def _property_with_lease(db, code, owner_id=None, manager_id=None):
+    prop = Property(name=f"Block {code}", code=code, owner_id=owner_id, manager_id=manager_id)
+    db.add(prop)
+    db.flush()
+    unit = Unit(property_id=prop.id, name=f"{code}-1", rent_amount=10000)
+    tenant = Tenant(full_name=f"Tenant {code}", phone=f"07{code}", kyc_status="pending")
+    db.add_all([unit, tenant])
+    db.flush()
+    db.add_all(
+        [
+            Lease(unit_id=unit.id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=10000, status="active"),
+            MaintenanceRequest(property_id=prop.id, title=f"Leak {code}", reported_on=date(2025, 2, 1)),
+        ]
+    )
+    db.commit()
+    return prop
+
+
+def test_scope_unions_owner_manager_and_assignments(db, make_user):
+    user, _ = make_user("manager")
+    owned = _property_with_lease(db, "OW", owner_id=user.id)
+    managed = _property_with_lease(db, "MG", manager_id=user.id)
+    assigned = _property_with_lease(db, "AS")
+    _property_with_lease(db, "XX")
+    db.add(PropertyManager(property_id=assigned.id, user_id=user.id))
+    db.commit()
+
+    assert accessible_property_ids(db, user) == {owned.id, managed.id, assigned.id}
+
+
+def test_viewer_is_unrestricted(db, make_user):
+    viewer, _ = make_user("viewer")
+    assert accessible_property_ids(db, viewer) is None
+
+
+def test_assignment_commit_invalidates_cached_scope(db, make_user, query_counter):
+    user, _ = make_user("caretaker")
+    prop = _property_with_lease(db, "AS")
+    assert accessible_property_ids(db, user) == frozenset()
+
+    with query_counter() as statements:
+        accessible_property_ids(db, user)
+    assert statements == []
+
+    db.add(PropertyManager(property_id=prop.id, user_id=user.id, role="caretaker"))
+    db.commit()
+    assert accessible_property_ids(db, user) == {prop.id}
+
+
+def test_listings_and_dashboard_are_scoped(client, db, make_user):
+    owner, headers = make_user("owner")
+    mine = _property_with_lease(db, "MY", owner_id=owner.id)
+    _property_with_lease(db, "OT")
+
+    properties = client.get("/properties/", headers=headers).json()["items"]
+    assert [item["id"] for item in properties] == [mine.id]
+
+    leases = client.get("/leases/", headers=headers).json()
+    assert [lease["unit_name"] for lease in leases] == ["MY-1"]
+
+    requests = client.get("/maintenance/", headers=headers).json()["items"]
+    assert [item["property_id"] for item in requests] == [mine.id]
+
+    tenants = client.get("/tenants/", params={"count": "cached"}, headers=headers).json()
+    assert ([item["full_name"] for item in tenants["items"]], tenants["total"]) == (["Tenant MY"], 1)
+
+    totals = {card["label"]: card["value"] for card in client.get("/dashboard/summary", headers=headers).json()["totals"]}
+    assert totals["Properties"] == 1
+    assert totals["Active tenants"] == 1
+    assert totals["Active leases"] == 1
+    assert totals["Pending KYC"] == 1
+
+    _, viewer_headers = make_user("viewer")
+    viewer_totals = client.get("/dashboard/summary", headers=viewer_headers).json()["totals"]
+    assert viewer_totals[0]["value"] == 2
+
+
+def test_owner_sees_tenant_they_created_before_any_lease(client, db, make_user):
+    _, headers = make_user("owner")
+    _, other_headers = make_user("owner")
+    created = client.post("/tenants/", json={"full_name": "New Arrival", "phone": "0711222333"}, headers=headers)
+    assert created.status_code == 201
+
+    mine = client.get("/tenants/", params={"search": "arrival"}, headers=headers).json()["items"]
+    assert [item["id"] for item in mine] == [created.json()["id"]]
+    assert client.get("/tenants/", headers=other_headers).json()["items"] == []
@@ -0,0 +1,136 @@
+from datetime import date
+
+from app.models import Lease, Payment, PaymentAllocation, Property, RentInvoice, Tenant, Unit
+from app.services.allocation import allocate_open_credit, apply_lump_sum
+from app.services.billing import run_billing
+
+
+def _seed_lease(db, owner_id, tenant=None, months=3, rent=10000, name="A1"):
+    prop = db.query(Property).filter_by(code="RS-1").first()
+    if prop is None:
+        prop = Property(name="Riverside", code="RS-1", owner_id=owner_id)
+        db.add(prop)
+        db.flush()
+    tenant = tenant or Tenant(full_name="Amina", phone="0700000001")
+    unit = Unit(property_id=prop.id, name=name, rent_amount=rent)
+    db.add_all([unit, tenant])
+    db.flush()
+    lease = Lease(unit_id=unit.id, tenant_id=tenant.id, start_date=date(2023, 1, 1), rent_amount=rent, status="active")
+    db.add(lease)
+    db.flush()
+    for month in range(months):
+        start = date(2023 + month // 12, month % 12 + 1, 1)
+        db.add(
+            RentInvoice(
+                lease_id=lease.id,
+                period_start=start,
+                period_end=start.replace(day=28),
+                due_date=start.replace(day=5),
+                amount_due=rent,
+                status="overdue",
+            )
+        )
+    db.commit()
+    return lease
+
+
+def _balances(db, lease_id):
+    invoices = db.query(RentInvoice).filter_by(lease_id=lease_id).order_by(RentInvoice.period_start).all()
+    return [(float(invoice.amount_paid), invoice.status) for invoice in invoices]
+
+
+def test_lump_sum_pays_oldest_invoices_first(client, db, make_user):
+    owner, headers = make_user("owner")
+    lease = _seed_lease(db, owner.id)
+    first = db.query(RentInvoice).filter_by(lease_id=lease.id).order_by(RentInvoice.period_start).first()
+    first.amount_paid = 4000
+    first.status = "partial"
+    db.commit()
+
+    response = client.post(
+        "/leases/payments",
+        json={"lease_id": lease.id, "amount": 13000, "paid_on": "2023-03-10", "reference": "QK9LUMP"},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    body = response.json()
+    assert body["invoice_id"] is None
+    assert [allocation["amount"] for allocation in body["allocations"]] == [6000, 7000]
+    assert body["unallocated"] == 0
+    assert _balances(db, lease.id) == [(10000, "paid"), (7000, "overdue"), (0, "overdue")]
+
+    retry = client.post(
+        "/leases/payments",
+        json={"lease_id": lease.id, "amount": 13000, "paid_on": "2023-03-10", "reference": "QK9LUMP"},
+        headers=headers,
+    )
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert db.query(PaymentAllocation).count() == 2
+
+    assert client.post("/leases/payments", json={"lease_id": lease.id + 1, "amount": 1, "paid_on": "2023-03-10"}, headers=headers).status_code == 404
+    both = {"invoice_id": 1, "lease_id": lease.id, "amount": 1, "paid_on": "2023-03-10"}
+    assert client.post("/leases/payments", json=both, headers=headers).status_code == 422
+
+
+def test_allocation_cost_does_not_grow_with_invoice_history(db, make_user, query_counter):
+    owner, _ = make_user("owner")
+    short = _seed_lease(db, owner.id, months=2, name="A1")
+    long = _seed_lease(db, owner.id, tenant=Tenant(full_name="Baraka", phone="0700000002"), months=60, name="A2")
+
+    counts = []
+    for lease, amount in ((short, 15000), (long, 555000)):
+        with query_counter() as statements:
+            payment, created = apply_lump_sum(db, {"lease_id": lease.id, "amount": amount, "paid_on": date(2028, 1, 3)})
+        counts.append(len(statements))
+        assert created and payment.unallocated == 0
+
+    assert counts[0] == counts[1]
+    balances = _balances(db, long.id)
+    assert balances[:55] == [(10000, "paid")] * 55
+    assert balances[55:] == [(5000, "overdue")] + [(0, "overdue")] * 4
+
+
+def test_billing_run_spends_open_credit(db, make_user):
+    owner, _ = make_user("owner")
+    tenant = Tenant(full_name="Amina", phone="0700000001")
+    flat = _seed_lease(db, owner.id, tenant=tenant, months=0, name="A1")
+    parking = _seed_lease(db, owner.id, tenant=tenant, months=0, rent=2000, name="P1")
+
+    # Paid ahead, nothing owed yet: the credit waits on the payments.
+    lease_credit, _ = apply_lump_sum(db, {"lease_id": flat.id, "amount": 8000, "paid_on": date(2025, 1, 28)})
+    tenant_credit, _ = apply_lump_sum(db, {"tenant_id": tenant.id, "amount": 5000, "paid_on": date(2025, 1, 29)})
+    assert (lease_credit.unallocated, tenant_credit.unallocated) == (8000, 5000)
+
+    result = run_billing(db, date(2025, 2, 1))
+    assert (result.invoices_created, result.credit_allocated, result.invoices_credited) == (2, 12000, 2)
+    assert _balances(db, flat.id) == [(10000, "paid")]
+    assert _balances(db, parking.id) == [(2000, "paid")]
+    db.expire_all()
+    assert db.get(Payment, tenant_credit.id).unallocated == 1000
+
+    assert allocate_open_credit(db).allocations == 0
+
+
+def test_scoped_run_only_pays_invoices_on_those_properties(db, make_user):
+    owner, _ = make_user("owner")
+    tenant = Tenant(full_name="Amina", phone="0700000001")
+    mine = _seed_lease(db, owner.id, tenant=tenant, months=0, name="A1")
+    other_property = Property(name="Hilltop", code="HT-1")
+    db.add(other_property)
+    db.flush()
+    unit = Unit(property_id=other_property.id, name="H1", rent_amount=3000)
+    db.add(unit)
+    db.flush()
+    theirs = Lease(unit_id=unit.id, tenant_id=tenant.id, start_date=date(2023, 1, 1), rent_amount=3000, status="active")
+    db.add(theirs)
+    db.commit()
+    for lease in (mine, theirs):
+        db.add(RentInvoice(lease_id=lease.id, period_start=date(2025, 1, 1), period_end=date(2025, 1, 31), due_date=date(2025, 1, 5), amount_due=lease.rent_amount))
+    db.add(Payment(tenant_id=tenant.id, amount=20000, unallocated=20000, paid_on=date(2025, 1, 2)))
+    db.commit()
+
+    result = allocate_open_credit(db, frozenset({mine.unit.property_id}))
+
+    assert (result.amount, result.invoices_credited) == (10000, 1)
+    assert _balances(db, mine.id) == [(10000, "paid")]
+    assert _balances(db, theirs.id) == [(0, "pending")]
@@ -0,0 +1,31 @@
+import inspect
+
+import pytest
+from sqlalchemy import event
+
+from app.core.database import async_engine
+from app.main import app
+
+READ_ROUTES = ["/dashboard/summary", "/properties/", "/tenants/", "/maintenance/", "/leases/"]
+
+
+def test_read_routes_are_async():
+    handlers = {route.path: route.endpoint for route in app.routes if getattr(route, "methods", None) == {"GET"}}
+    for path in READ_ROUTES:
+        assert inspect.iscoroutinefunction(handlers[path]), path
+
+
+@pytest.mark.parametrize("path", READ_ROUTES)
+def test_read_routes_use_async_engine(client, make_user, path):
+    _, headers = make_user("owner")
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        assert client.get(path, headers=headers).status_code == 200
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    assert statements
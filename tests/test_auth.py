@@ -0,0 +1,196 @@
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.principals import clear_principals, principal_cache_stats
+from app.core.security import PasswordHashPool, PasswordHasherBusy, _hash, _verify, hash_password
+from app.core.token_versions import get_token_version_store
+from app.models import User
+from app.routers import auth
+
+
+def test_principal_cache_invalidated_on_deactivation(client, db, make_user, query_counter):
+    user, headers = make_user("manager")
+    assert client.get("/leases/", headers=headers).status_code == 200
+
+    with query_counter() as statements:
+        assert client.get("/leases/", headers=headers).status_code == 200
+    assert not any("FROM users" in statement for statement in statements)
+    assert principal_cache_stats()["hits"] >= 1
+
+    db.query(User).filter(User.id == user.id).one().active = False
+    db.commit()
+    assert client.get("/leases/", headers=headers).status_code == 403
+
+
+def test_principal_cache_invalidated_on_role_change(client, db, make_user):
+    user, headers = make_user("viewer")
+    assert client.post("/maintenance/", json={}, headers=headers).status_code == 403
+
+    db.query(User).filter(User.id == user.id).one().role = "caretaker"
+    db.commit()
+    # The caretaker passes the role check and now fails payload validation instead.
+    assert client.post("/maintenance/", json={}, headers=headers).status_code == 422
+
+
+def test_admin_metrics_requires_token(client, db, monkeypatch):
+    assert client.get("/admin/metrics").status_code == 404
+    monkeypatch.setattr(settings, "ADMIN_API_TOKEN", "s3cret")
+    assert client.get("/admin/metrics", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    body = client.get("/admin/metrics", headers={"X-Admin-Token": "s3cret"}).json()
+    assert {"hits", "misses", "size"} <= set(body["principal_cache"])
+
+
+def test_password_pool_rejects_when_saturated():
+    pool = PasswordHashPool(workers=0, max_pending=1, timeout=5)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    worker = threading.Thread(target=pool.run, args=(slow,))
+    worker.start()
+    started.wait(5)
+    with pytest.raises(PasswordHasherBusy):
+        pool.run(lambda: "never")
+    release.set()
+    worker.join()
+
+    assert pool.run(lambda: "ok") == "ok"
+    assert pool.stats()["rejected"] == 1
+
+
+def test_password_pool_hashes_in_worker_process():
+    pool = PasswordHashPool(workers=1, max_pending=2, timeout=30)
+    try:
+        hashed = pool.run(_hash, "correct horse")
+        assert pool.run(_verify, "correct horse", hashed)
+        assert not pool.run(_verify, "wrong", hashed)
+    finally:
+        pool.shutdown()
+
+
+def test_password_pool_timeout_is_busy_and_keeps_the_slot():
+    pool = PasswordHashPool(workers=1, max_pending=1, timeout=0.2)
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            pool.run(time.sleep, 2)
+        # The abandoned job is still running in the worker, so it still holds the only slot.
+        with pytest.raises(PasswordHasherBusy):
+            pool.run(time.sleep, 0)
+        deadline = time.monotonic() + 30
+        while pool.stats()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert pool.run(time.sleep, 0) is None
+    finally:
+        pool.shutdown()
+
+
+def test_login_returns_503_when_hashing_saturated(client, db, monkeypatch):
+    db.add(User(email="busy@example.com", password_hash=hash_password("password123"), role="owner", active=True))
+    db.commit()
+
+    def busy(*args):
+        raise PasswordHasherBusy()
+
+    monkeypatch.setattr(auth, "verify_password", busy)
+    response = client.post("/auth/login", json={"email": "busy@example.com", "password": "password123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+
+
+def _login(client, db, email="refresh@example.com", password="password123"):
+    db.add(User(email=email, password_hash=hash_password(password), role="owner", active=True))
+    db.commit()
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_refresh_rotates_without_password_hashing(client, db, monkeypatch):
+    tokens = _login(client, db)
+
+    def no_bcrypt(*args):
+        raise AssertionError("refresh must not hash passwords")
+
+    monkeypatch.setattr(auth, "verify_password", no_bcrypt)
+    monkeypatch.setattr(auth, "hash_password", no_bcrypt)
+
+    rotated = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert rotated.status_code == 200
+    body = rotated.json()
+    assert body["refresh_token"] != tokens["refresh_token"]
+    assert client.get("/leases/", headers={"Authorization": f"Bearer {body['access_token']}"}).status_code == 200
+
+
+def test_refresh_reuse_revokes_family(client, db):
+    tokens = _login(client, db)
+    first = tokens["refresh_token"]
+    second = client.post("/auth/refresh", json={"refresh_token": first}).json()["refresh_token"]
+
+    replay = client.post("/auth/refresh", json={"refresh_token": first})
+    assert replay.status_code == 401
+    # The legitimate successor is burned as well once theft is suspected.
+    assert client.post("/auth/refresh", json={"refresh_token": second}).status_code == 401
+
+
+def test_logout_all_revokes_every_session(client, db):
+    phone = _login(client, db)
+    laptop = client.post("/auth/login", json={"email": "refresh@example.com", "password": "password123"}).json()
+
+    response = client.post("/auth/logout-all", headers={"Authorization": f"Bearer {phone['access_token']}"})
+    assert response.json()["revoked"] == 2
+    for session in (phone, laptop):
+        assert client.post("/auth/refresh", json={"refresh_token": session["refresh_token"]}).status_code == 401
+
+
+def test_claims_tokens_skip_user_lookup_until_role_changes(client, db, query_counter, monkeypatch):
+    monkeypatch.setattr(settings, "JWT_EMBED_CLAIMS", True)
+    tokens = _login(client, db, email="claims@example.com")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    clear_principals()
+
+    with query_counter() as statements:
+        assert client.get("/leases/", headers=headers).status_code == 200
+    assert not any("FROM users" in statement for statement in statements)
+
+    db.query(User).filter(User.email == "claims@example.com").one().role = "viewer"
+    db.commit()
+    assert client.get("/leases/", headers=headers).status_code == 401
+
+    # A refreshed token picks up the new role and version.
+    rotated = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+    assert rotated["user"]["role"] == "viewer"
+    assert client.get("/leases/", headers={"Authorization": f"Bearer {rotated['access_token']}"}).status_code == 200
+
+
+def test_revoked_claims_tokens_stay_revoked_after_restart(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "JWT_EMBED_CLAIMS", True)
+    tokens = _login(client, db, email="restart@example.com")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.post("/auth/logout-all", headers=headers).status_code == 200
+
+    # A fresh process starts with empty caches; the version comes from the users table.
+    clear_principals()
+    get_token_version_store().clear()
+    assert client.get("/leases/", headers=headers).status_code == 401
+    assert db.query(User).filter(User.email == "restart@example.com").one().token_version == 1
+
+
+def test_email_lookup_is_case_insensitive_and_indexed(client, db, query_counter):
+    signup = client.post("/auth/signup", json={"email": " Mixed.Case@Example.com ", "password": "password123"})
+    assert signup.status_code == 201
+    assert signup.json()["email"] == "mixed.case@example.com"
+
+    duplicate = client.post("/auth/signup", json={"email": "MIXED.case@example.COM", "password": "password123"})
+    assert duplicate.status_code == 409
+
+    with query_counter() as statements:
+        response = client.post("/auth/resend-verification", json={"email": "MIXED.CASE@example.com"})
+    assert response.status_code == 200
+    plan = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statements[0]}", ("x", 1, 0)).all()
+    assert any("ix_users_email_lower" in row[-1] for row in plan)
@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from app.core.database import SessionLocal
+from app.models import Lease, Property, RentInvoice, Tenant, Unit
+from app.services.billing import mark_overdue_invoices, overdue_chunk, run_billing
+
+
+def _seed_leases(db, owner_id, code="RS"):
+    prop = Property(name=f"Block {code}", code=code, owner_id=owner_id)
+    db.add(prop)
+    db.flush()
+    units = [Unit(property_id=prop.id, name=f"{code}-{i}", rent_amount=10000) for i in range(4)]
+    tenant = Tenant(full_name=f"Tenant {code}", phone=f"07{code}")
+    db.add_all([*units, tenant])
+    db.flush()
+    leases = [
+        Lease(unit_id=units[0].id, tenant_id=tenant.id, start_date=date(2024, 6, 1), rent_amount=12000, payment_day=5, status="active"),
+        Lease(unit_id=units[1].id, tenant_id=tenant.id, start_date=date(2024, 6, 1), rent_amount=9000, payment_day=31, status="active"),
+        Lease(unit_id=units[2].id, tenant_id=tenant.id, start_date=date(2024, 6, 1), rent_amount=8000, status="active"),
+        # Not billable: ended before February, starts after it, terminated.
+        Lease(unit_id=units[3].id, tenant_id=tenant.id, start_date=date(2024, 1, 1), end_date=date(2025, 1, 31), rent_amount=1, status="active"),
+        Lease(unit_id=units[3].id, tenant_id=tenant.id, start_date=date(2025, 3, 1), rent_amount=1, status="active"),
+        Lease(unit_id=units[3].id, tenant_id=tenant.id, start_date=date(2024, 1, 1), rent_amount=1, status="terminated"),
+    ]
+    db.add_all(leases)
+    db.commit()
+    return leases
+
+
+def test_billing_run_is_set_based_and_idempotent(db, make_user, query_counter):
+    owner, _ = make_user("owner")
+    leases = _seed_leases(db, owner.id)
+    db.add(RentInvoice(lease_id=leases[0].id, period_start=date(2025, 2, 1), period_end=date(2025, 2, 28), due_date=date(2025, 2, 5), amount_due=12000))
+    db.commit()
+
+    with query_counter() as statements:
+        result = run_billing(db, date(2025, 2, 1), batch_size=2)
+
+    # two batches of (select ids, insert ... select), the empty probe that ends the run,
+    # and one open-credit probe per allocation pass
+    assert len(statements) == 7
+    assert (result.leases_billable, result.invoices_created, result.already_invoiced) == (3, 2, 1)
+    invoices = {inv.lease_id: inv for inv in db.query(RentInvoice).all()}
+    assert invoices[leases[1].id].due_date == date(2025, 2, 28)
+    assert invoices[leases[2].id].due_date == date(2025, 2, 1)
+    assert float(invoices[leases[1].id].amount_due) == 9000
+    assert invoices[leases[1].id].status == "pending"
+
+    assert run_billing(db, date(2025, 2, 1)).invoices_created == 0
+    assert db.query(RentInvoice).count() == 3
+
+
+def test_billing_endpoint_bills_only_accessible_leases(client, db, make_user):
+    owner, headers = make_user("owner")
+    _seed_leases(db, owner.id, code="MY")
+    _seed_leases(db, None, code="OT")
+
+    response = client.post("/leases/billing-runs", json={"period_start": "2025-02-01"}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["invoices_created"] == 3
+    assert body["rows_per_second"] >= 0
+    assert db.query(RentInvoice).count() == 3
+
+    bad = client.post("/leases/billing-runs", json={"period_start": "2025-02-03"}, headers=headers)
+    assert bad.status_code == 422
+
+
+def _seed_invoices(db, owner_id):
+    lease = _seed_leases(db, owner_id)[0]
+    rows = [
+        ("pending", date(2025, 1, 5), 0),
+        ("pending", date(2025, 2, 5), 0),
+        ("partial", date(2025, 2, 5), 500),
+        ("paid", date(2025, 1, 5), 12000),
+        ("overdue", date(2024, 12, 5), 0),
+        ("pending", date(2025, 3, 5), 0),  # not yet due
+    ]
+    db.add_all(
+        RentInvoice(
+            lease_id=lease.id,
+            period_start=date(2024, 1 + i, 1),
+            period_end=date(2024, 1 + i, 28),
+            due_date=due_date,
+            amount_due=12000,
+            amount_paid=paid,
+            status=status,
+        )
+        for i, (status, due_date, paid) in enumerate(rows)
+    )
+    db.commit()
+
+
+def test_overdue_sweep_flips_open_invoices_in_chunks(db, make_user):
+    owner, _ = make_user("owner")
+    _seed_invoices(db, owner.id)
+
+    result = mark_overdue_invoices(db, as_of=date(2025, 3, 1), chunk_size=2)
+
+    assert (result.from_pending, result.from_partial) == (2, 1)
+    statuses = sorted(status for (status,) in db.query(RentInvoice.status).all())
+    assert statuses == ["overdue", "overdue", "overdue", "overdue", "paid", "pending"]
+    assert mark_overdue_invoices(db, as_of=date(2025, 3, 1)).total == 0
+
+
+def test_overdue_sweep_uses_partial_index(db):
+    compiled = overdue_chunk(date(2025, 3, 1), 100).compile(dialect=db.bind.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+    plan = " ".join(str(row[-1]) for row in rows)
+    assert "ix_rent_invoices_open_due_date" in plan
+
+
+def test_concurrent_sweepers_do_not_double_count(db, make_user):
+    owner, _ = make_user("owner")
+    _seed_invoices(db, owner.id)
+
+    def sweep():
+        with SessionLocal() as session:
+            return mark_overdue_invoices(session, as_of=date(2025, 3, 1), chunk_size=1).total
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        totals = list(pool.map(lambda _: sweep(), range(3)))
+
+    assert sum(totals) == 3
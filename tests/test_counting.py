@@ -0,0 +1,40 @@
+from app.core.counting import count_rows
+from app.models import Tenant
+
+
+def _seed(db, count=4, created_by_id=None):
+    db.add_all(
+        Tenant(full_name=f"Tenant {i}", phone=f"07220000{i:02d}", created_by_id=created_by_id) for i in range(count)
+    )
+    db.commit()
+
+
+def test_cached_count_is_memoized_per_scope(db, query_counter):
+    _seed(db)
+    stmt = db.query(Tenant).filter(Tenant.kyc_status == "pending")
+
+    assert count_rows(db, stmt, "cached", scope=("u", 1)).total == 4
+    with query_counter() as statements:
+        result = count_rows(db, stmt, "cached", scope=("u", 1))
+    assert result.total == 4 and not result.is_estimate
+    assert statements == []
+
+    with query_counter() as statements:
+        count_rows(db, stmt, "cached", scope=("u", 2))
+    assert len(statements) == 1
+
+
+def test_estimate_falls_back_to_exact_off_postgres(db):
+    _seed(db, 3)
+    result = count_rows(db, db.query(Tenant), "estimate")
+    assert result.total == 3
+    assert result.is_estimate is False
+
+
+def test_list_reports_count_mode(client, db, make_user):
+    owner, headers = make_user("owner")
+    _seed(db, 2, created_by_id=owner.id)
+    body = client.get("/tenants/", params={"count": "estimate"}, headers=headers).json()
+    assert body["total"] == 2
+    assert body["total_is_estimate"] is False
+    assert client.get("/tenants/", params={"count": "bogus"}, headers=headers).status_code == 422
@@ -0,0 +1,52 @@
+import time
+
+from app.core.cache import StaleWhileRevalidateCache
+from app.models import Property
+from app.services.dashboard import dashboard_cache
+
+
+def test_repeat_dashboard_is_served_from_cache(client, make_user, query_counter):
+    _, headers = make_user("owner")
+    first = client.get("/dashboard/summary", headers=headers).json()
+
+    with query_counter() as statements:
+        second = client.get("/dashboard/summary", headers=headers).json()
+
+    assert second == first
+    # Only the principal lookup may touch the database; the summary itself is cached.
+    assert len(statements) <= 1
+
+
+def test_write_invalidates_dashboard(client, make_user, db):
+    owner, headers = make_user("owner")
+    before = client.get("/dashboard/summary", headers=headers).json()
+
+    db.add(Property(name="Riverside", city="Nairobi", owner_id=owner.id))
+    db.commit()
+
+    after = client.get("/dashboard/summary", headers=headers).json()
+    assert after != before
+    assert dashboard_cache.stats()["invalidations"] >= 1
+
+
+def test_stale_entry_is_served_while_refreshing(client, make_user, monkeypatch):
+    _, headers = make_user("owner")
+    cache = StaleWhileRevalidateCache(maxsize=8, fresh_ttl=0.0, stale_ttl=60.0)
+    monkeypatch.setattr("app.routers.dashboard.dashboard_cache", cache)
+    monkeypatch.setattr("app.services.dashboard.dashboard_cache", cache)
+
+    first = client.get("/dashboard/summary", headers=headers).json()
+    time.sleep(0.01)
+    assert client.get("/dashboard/summary", headers=headers).json() == first
+
+    stats = cache.stats()
+    assert stats["stale_hits"] == 1
+    assert stats["refreshes"] == 1
+
+
+def test_refresh_started_before_a_write_is_discarded():
+    cache = StaleWhileRevalidateCache(maxsize=8, fresh_ttl=30.0, stale_ttl=60.0)
+    generation = cache.generation
+    cache.invalidate()
+    assert cache.store("k", "old", generation) is False
+    assert cache.lookup("k") == (None, "miss")
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.models import EmailOutbox
+from app.services.email import FakeTransport
+from app.services.email_outbox import deliver_pending
+
+
+def test_signup_queues_email_without_sending(client, db, monkeypatch):
+    from app.services import email
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("request path must not construct a transport")
+
+    monkeypatch.setattr(email, "SendGridTransport", no_network)
+    response = client.post("/auth/signup", json={"email": "outbox@example.com", "password": "password123"})
+    assert response.status_code == 201
+
+    queued = db.query(EmailOutbox).one()
+    assert queued.recipient == "outbox@example.com"
+    assert queued.status == "pending"
+
+    transport = FakeTransport()
+    assert deliver_pending(db, transport) == {"sent": 1, "retrying": 0, "failed": 0}
+    assert "verify-email?token=" in transport.sent[0].text_body
+    assert db.query(EmailOutbox).one().status == "sent"
+
+
+def test_failed_sends_back_off_then_give_up(db, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    message = EmailOutbox(
+        recipient="retry@example.com",
+        subject="Hi",
+        html_body="<p>Hi</p>",
+        text_body="Hi",
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc),
+    )
+    db.add(message)
+    db.commit()
+
+    transport = FakeTransport(fail_times=5)
+    assert deliver_pending(db, transport)["retrying"] == 1
+    # Not due yet, so the next batch skips it.
+    assert deliver_pending(db, transport) == {"sent": 0, "retrying": 0, "failed": 0}
+
+    message.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+    assert deliver_pending(db, transport)["failed"] == 1
+    assert message.status == "failed"
+    assert message.last_error == "Simulated transport failure"
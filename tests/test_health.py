@@ -6,3 +6,18 @@ def test_health():
     r = c.get('/health')
     assert r.status_code == 200
     assert r.json()['status'] == 'ok'
+
+
+def test_lifespan_warms_pool_without_create_all(monkeypatch):
+    from app.core.config import settings
+    from app.core.database import Base, engine
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("create_all must not run when disabled")
+
+    monkeypatch.setattr(settings, "DB_CREATE_ALL_ON_STARTUP", False)
+    monkeypatch.setattr(settings, "DB_POOL_WARM_CONNECTIONS", 2)
+    monkeypatch.setattr(Base.metadata, "create_all", forbidden)
+    with TestClient(app) as c:
+        assert engine.pool.checkedin() >= 2
+        assert c.get('/health').status_code == 200
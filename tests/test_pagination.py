@@ -0,0 +1,76 @@
+from datetime import date, datetime, timedelta
+
+from app.models import Lease, Property, Tenant, Unit
+
+
+def _seed_tenants(db, count=7, created_by_id=None):
+    base = datetime(2026, 1, 1, 9, 0, 0)
+    # Pairs share a timestamp so the id tiebreaker is exercised.
+    db.add_all(
+        Tenant(
+            full_name=f"Tenant {i}",
+            phone=f"07000000{i:02d}",
+            created_at=base + timedelta(minutes=i // 2),
+            created_by_id=created_by_id,
+        )
+        for i in range(count)
+    )
+    db.commit()
+
+
+def test_tenant_cursor_walk_matches_offset_order(client, db, make_user):
+    owner, headers = make_user("owner")
+    _seed_tenants(db, created_by_id=owner.id)
+
+    full = client.get("/tenants/", params={"limit": 50}, headers=headers).json()
+    assert full["total"] == 7
+    expected = [item["id"] for item in full["items"]]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/tenants/", params=params, headers=headers).json()
+        seen.extend(item["id"] for item in body["items"])
+        if cursor:
+            assert body["total"] is None
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+
+
+def test_invalid_cursor_is_rejected(client, db, make_user):
+    _, headers = make_user("owner")
+    response = client.get("/tenants/", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_lease_cursor_header(client, db, make_user):
+    owner, headers = make_user("owner")
+    prop = Property(name="Kilimani Court", code="KC-1", owner_id=owner.id)
+    db.add(prop)
+    db.flush()
+    unit = Unit(property_id=prop.id, name="A1", rent_amount=15000)
+    tenant = Tenant(full_name="Wanjiru", phone="0711000000")
+    db.add_all([unit, tenant])
+    db.flush()
+    db.add_all(
+        Lease(
+            unit_id=unit.id,
+            tenant_id=tenant.id,
+            start_date=date(2025, 1, 1),
+            rent_amount=15000,
+            created_at=datetime(2025, 1, 1, 8, 0, 0),
+        )
+        for _ in range(3)
+    )
+    db.commit()
+
+    first = client.get("/leases/", params={"limit": 2}, headers=headers)
+    assert len(first.json()) == 2
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/leases/", params={"limit": 2, "cursor": cursor}, headers=headers)
+    assert len(second.json()) == 1
+    assert "X-Next-Cursor" not in second.headers
@@ -0,0 +1,125 @@
+from datetime import date
+
+from app.cli import main
+from app.models import Lease, Payment, PaymentReconciliationItem, Property, RentInvoice, Tenant, Unit
+
+CSV_STATEMENT = """Receipt No,Completion Time,Paid In,MSISDN,Account Reference
+QK1,2025-02-03 09:15:00,"4,000",0711000001,INV-{a}
+QK2,2025-02-03 10:00:00,9000,+254711000002,
+QK3,2025-02-03 11:00:00,2500,0711000003,
+QK4,2025-02-03 12:00:00,abc,0711000001,
+QK5,2025-02-03 13:00:00,700,0799999999,rent
+"""
+
+
+def _seed(db, owner_id):
+    prop = Property(name="Riverside", code="RS-1", owner_id=owner_id)
+    db.add(prop)
+    db.flush()
+    units = [Unit(property_id=prop.id, name=f"A{i}", rent_amount=10000) for i in range(4)]
+    tenants = [Tenant(full_name=f"Tenant {i}", phone=f"071100000{i}") for i in range(1, 4)]
+    db.add_all([*units, *tenants])
+    db.flush()
+    invoices = []
+    # Tenant 3 has two open invoices of different sizes, so only an exact amount disambiguates.
+    for unit, tenant, amount in [(units[0], tenants[0], 10000), (units[1], tenants[1], 9000), (units[2], tenants[2], 2500), (units[3], tenants[2], 5000)]:
+        lease = Lease(unit_id=unit.id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=amount, status="active")
+        db.add(lease)
+        db.flush()
+        invoice = RentInvoice(
+            lease_id=lease.id,
+            period_start=date(2025, 2, 1),
+            period_end=date(2025, 2, 28),
+            due_date=date(2025, 2, 5),
+            amount_due=amount,
+        )
+        db.add(invoice)
+        invoices.append(invoice)
+    db.commit()
+    return [invoice.id for invoice in invoices]
+
+
+def test_csv_import_matches_queues_and_credits(client, db, make_user):
+    owner, headers = make_user("owner")
+    ids = _seed(db, owner.id)
+    body = CSV_STATEMENT.format(a=ids[0]).encode()
+
+    response = client.post("/leases/payments/import", params={"source": "mpesa-0203"}, content=body, headers=headers)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["lines"], report["matched"], report["queued"], report["invalid"]) == (5, 3, 2, 1)
+    assert report["matched_by"] == {"account": 1, "phone": 1, "phone_amount": 1}
+    assert report["match_rate"] == 0.6
+    assert report["amount_applied"] == 15500
+
+    statuses = {invoice.id: (float(invoice.amount_paid), invoice.status) for invoice in db.query(RentInvoice)}
+    assert statuses[ids[0]] == (4000, "partial")
+    assert statuses[ids[1]] == (9000, "paid")
+    assert statuses[ids[2]] == (2500, "paid")
+    assert statuses[ids[3]] == (0, "pending")
+    reasons = sorted(item.reason for item in db.query(PaymentReconciliationItem))
+    assert reasons == ["invalid_amount", "no_match"]
+
+    # Re-importing the same statement records nothing new.
+    again = client.post("/leases/payments/import", params={"source": "mpesa-0203"}, content=body, headers=headers).json()
+    assert (again["matched"], again["queued"], again["duplicates"]) == (0, 0, 5)
+    assert db.query(Payment).count() == 3
+    assert db.query(PaymentReconciliationItem).count() == 2
+    db.expire_all()
+    assert float(db.get(RentInvoice, ids[1]).amount_paid) == 9000
+
+
+def test_ndjson_import_from_cli(db, make_user, tmp_path):
+    owner, _ = make_user("owner")
+    ids = _seed(db, owner.id)
+    statement = tmp_path / "bank.ndjson"
+    statement.write_text(
+        f'{{"reference": "TT1", "date": "2025-02-04", "amount": "1000", "account": "INV-{ids[0]}"}}\n'
+        '{"reference": "TT2", "date": "2025-02-04", "amount": 1000}\n'
+        "not json\n"
+    )
+
+    assert main(["import-payments", str(statement), "--method", "bank_transfer", "--batch-size", "1"]) == 0
+
+    payment = db.query(Payment).one()
+    assert (payment.invoice_id, payment.method, payment.reference) == (ids[0], "bank_transfer", "TT1")
+    reasons = sorted(item.reason for item in db.query(PaymentReconciliationItem))
+    assert reasons == ["invalid_json", "no_match"]
+
+
+def test_reimport_without_references_is_idempotent(db, make_user, tmp_path):
+    owner, _ = make_user("owner")
+    ids = _seed(db, owner.id)
+    statement = tmp_path / "bank.csv"
+    statement.write_text(
+        "Date,Amount,Phone,Account\n"
+        "2025-02-04,9000,0711000002,\n"
+        f"2025-02-04,500,0711000001,{ids[2]}\n"
+        "2025-02-04,800,0711000009,\n"
+    )
+
+    for _ in range(2):
+        assert main(["import-payments", str(statement), "--source", "bank-feb", "--method", "bank_transfer"]) == 0
+
+    payments = db.query(Payment).all()
+    # A bare number is a house number, not an invoice id: the line matches on the payer's phone.
+    assert [(payment.invoice_id, float(payment.amount)) for payment in payments] == [(ids[1], 9000), (ids[0], 500)]
+    assert float(db.get(RentInvoice, ids[1]).amount_paid) == 9000
+    assert [item.line_no for item in db.query(PaymentReconciliationItem)] == [4]
+
+
+def test_account_match_needs_the_tenants_phone_and_a_known_method(db, make_user, tmp_path):
+    owner, _ = make_user("owner")
+    ids = _seed(db, owner.id)
+    statement = tmp_path / "mpesa.ndjson"
+    statement.write_text(
+        f'{{"reference": "QA1", "date": "2025-02-04", "amount": 100, "account": "INV-{ids[0]}", "phone": "0711000002"}}\n'
+        f'{{"reference": "QA2", "date": "2025-02-04", "amount": 100, "account": "INV-{ids[0]}", "method": "Voucher"}}\n'
+    )
+
+    assert main(["import-payments", str(statement)]) == 0
+
+    assert db.query(Payment).count() == 0
+    reasons = sorted(item.reason for item in db.query(PaymentReconciliationItem))
+    assert reasons == ["account_phone_mismatch", "invalid_method"]
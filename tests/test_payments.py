@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from app.core.database import SessionLocal
+from app.models import Lease, Payment, Property, RentInvoice, Tenant, Unit
+from app.services.payments import apply_payment
+
+
+def _seed_invoice(db, owner_id, amount_due=10000, status="pending"):
+    prop = Property(name="Riverside", code="RS-1", owner_id=owner_id)
+    db.add(prop)
+    db.flush()
+    unit = Unit(property_id=prop.id, name="A1", rent_amount=amount_due)
+    tenant = Tenant(full_name="Amina", phone="0700000001")
+    db.add_all([unit, tenant])
+    db.flush()
+    lease = Lease(unit_id=unit.id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=amount_due, status="active")
+    db.add(lease)
+    db.flush()
+    invoice = RentInvoice(
+        lease_id=lease.id,
+        period_start=date(2025, 2, 1),
+        period_end=date(2025, 2, 28),
+        due_date=date(2025, 2, 5),
+        amount_due=amount_due,
+        status=status,
+    )
+    db.add(invoice)
+    db.commit()
+    return invoice.id
+
+
+def _payment(invoice_id, amount, reference=None, paid_on="2025-02-03"):
+    return {"invoice_id": invoice_id, "amount": amount, "paid_on": paid_on, "method": "mobile_money", "reference": reference}
+
+
+def test_payment_updates_balance_and_status(client, db, make_user):
+    owner, headers = make_user("owner")
+    invoice_id = _seed_invoice(db, owner.id)
+
+    assert client.post("/leases/payments", json=_payment(invoice_id, 4000), headers=headers).status_code == 201
+    invoice = db.get(RentInvoice, invoice_id)
+    assert (float(invoice.amount_paid), invoice.status) == (4000, "partial")
+
+    client.post("/leases/payments", json=_payment(invoice_id, 6000), headers=headers)
+    db.refresh(invoice)
+    assert (float(invoice.amount_paid), invoice.status) == (10000, "paid")
+
+    missing = client.post("/leases/payments", json=_payment(invoice_id + 1, 1), headers=headers)
+    assert missing.status_code == 404
+
+
+def test_partial_payment_keeps_overdue_status(db, make_user):
+    owner, _ = make_user("owner")
+    invoice_id = _seed_invoice(db, owner.id, status="overdue")
+
+    apply_payment(db, _payment(invoice_id, 100, paid_on=date(2025, 2, 3)))
+    assert db.get(RentInvoice, invoice_id).status == "overdue"
+
+
+def test_retries_replay_the_original_payment(client, db, make_user):
+    owner, headers = make_user("owner")
+    invoice_id = _seed_invoice(db, owner.id)
+    keyed = {**headers, "Idempotency-Key": "mpesa-callback-1"}
+
+    first = client.post("/leases/payments", json=_payment(invoice_id, 2500), headers=keyed)
+    retry = client.post("/leases/payments", json=_payment(invoice_id, 2500), headers=keyed)
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    # Without the header, the reference is the key.
+    by_ref = client.post("/leases/payments", json=_payment(invoice_id, 1000, "QK71XYZ"), headers=headers)
+    again = client.post("/leases/payments", json=_payment(invoice_id, 1000, "QK71XYZ"), headers=headers)
+    assert again.json()["id"] == by_ref.json()["id"]
+
+    conflict = client.post("/leases/payments", json=_payment(invoice_id, 9999), headers=keyed)
+    assert conflict.status_code == 409
+
+    assert db.query(Payment).count() == 2
+    assert float(db.get(RentInvoice, invoice_id).amount_paid) == 3500
+
+
+def test_concurrent_payments_do_not_lose_updates(db, make_user):
+    owner, _ = make_user("owner")
+    invoice_id = _seed_invoice(db, owner.id, amount_due=1000)
+
+    def pay(n):
+        with SessionLocal() as session:
+            # Every third call is a retry of the previous key.
+            key = f"stress-{n - n % 3}"
+            return apply_payment(session, _payment(invoice_id, 10, paid_on=date(2025, 2, 3)), idempotency_key=key)[1]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        created = list(pool.map(pay, range(60)))
+
+    assert sum(created) == 20
+    invoice = db.get(RentInvoice, invoice_id)
+    assert float(invoice.amount_paid) == 200
+    assert invoice.status == "partial"
+    assert db.query(Payment).count() == 20
+
+
+def test_free_text_references_only_dedupe_per_invoice(db, make_user):
+    owner, _ = make_user("owner")
+    first = _seed_invoice(db, owner.id)
+    lease = db.get(RentInvoice, first).lease
+    second = RentInvoice(
+        lease_id=lease.id, period_start=date(2025, 3, 1), period_end=date(2025, 3, 31), due_date=date(2025, 3, 5), amount_due=10000
+    )
+    db.add(second)
+    db.commit()
+
+    cash = {"amount": 500, "paid_on": date(2025, 3, 3), "method": "cash", "reference": "rent"}
+    assert apply_payment(db, {**cash, "invoice_id": first})[1]
+    assert apply_payment(db, {**cash, "invoice_id": second.id})[1]
+    assert not apply_payment(db, {**cash, "invoice_id": second.id})[1]
+    assert db.query(Payment).count() == 2
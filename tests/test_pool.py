@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.pool import InstrumentedQueuePool
+
+
+def test_pool_records_waits_and_timeouts():
+    tiny = create_engine(
+        engine.url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    held = tiny.connect()
+    with pytest.raises(exc.TimeoutError):
+        tiny.connect()
+    held.close()
+
+    stats = tiny.pool.stats()
+    assert stats["checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["checked_out"] == 0
+    assert sum(stats["wait_histogram"].values()) == 1
+
+    tiny.dispose()
+    assert tiny.pool.stats()["timeouts"] == 1
+    tiny.dispose()
+
+
+def test_admin_pool_endpoint(client, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_TOKEN", "s3cret")
+    _, headers = make_user("owner")
+    client.get("/leases/", headers=headers)
+
+    primary = client.get("/admin/db/pool", headers={"X-Admin-Token": "s3cret"}).json()["primary"]
+    assert primary["size"] == settings.db_pool_size
+    assert primary["checkouts"] >= 1
+    assert "le_1ms" in primary["wait_histogram"]
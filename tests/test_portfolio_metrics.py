@@ -0,0 +1,82 @@
+from datetime import date, datetime
+
+from app.cli import main
+from app.models import DailyPortfolioMetrics, Lease, Property, Tenant, Unit
+from app.services.portfolio_metrics import portfolio_changes, record_portfolio_metrics
+
+
+def _seed(db, owner_id):
+    prop = Property(name="Riverside", code="RS-1", owner_id=owner_id, created_at=datetime(2024, 12, 1))
+    db.add(prop)
+    db.flush()
+    units = [Unit(property_id=prop.id, name=f"RS-{i}", rent_amount=10000) for i in range(3)]
+    amina = Tenant(full_name="Amina", phone="0700000001", kyc_status="approved")
+    brian = Tenant(full_name="Brian", phone="0700000002", kyc_status="pending")
+    db.add_all([*units, amina, brian])
+    db.flush()
+    db.add_all(
+        [
+            Lease(unit_id=units[0].id, tenant_id=amina.id, start_date=date(2025, 1, 1), rent_amount=10000, status="active"),
+            # Brian moves between units mid-month and should count as one tenant.
+            Lease(
+                unit_id=units[1].id,
+                tenant_id=brian.id,
+                start_date=date(2025, 1, 10),
+                end_date=date(2025, 1, 19),
+                rent_amount=8000,
+                status="expired",
+            ),
+            Lease(unit_id=units[2].id, tenant_id=brian.id, start_date=date(2025, 1, 20), rent_amount=9000, status="active"),
+            Lease(unit_id=units[2].id, tenant_id=amina.id, start_date=date(2025, 1, 5), rent_amount=5000, status="draft"),
+        ]
+    )
+    db.commit()
+    return prop
+
+
+def _rows(db):
+    return {row.snapshot_date: row for row in db.query(DailyPortfolioMetrics).order_by(DailyPortfolioMetrics.snapshot_date)}
+
+
+def test_backfill_reconstructs_history_from_lease_dates(db, make_user):
+    owner, _ = make_user("owner")
+    _seed(db, owner.id)
+
+    written = record_portfolio_metrics(db, date(2024, 12, 31), date(2025, 1, 25), today=date(2025, 1, 25))
+    rows = _rows(db)
+
+    assert written == len(rows) == 26
+    assert (rows[date(2024, 12, 31)].active_leases, rows[date(2024, 12, 31)].tenants) == (0, 0)
+    assert (rows[date(2025, 1, 12)].active_leases, rows[date(2025, 1, 12)].tenants) == (2, 2)
+    assert float(rows[date(2025, 1, 12)].monthly_revenue) == 18000
+    assert (rows[date(2025, 1, 20)].active_leases, rows[date(2025, 1, 20)].tenants) == (2, 2)
+    assert float(rows[date(2025, 1, 20)].monthly_revenue) == 19000
+    assert rows[date(2025, 1, 24)].pending_kyc is None
+    assert rows[date(2025, 1, 25)].pending_kyc == 1
+    assert rows[date(2025, 1, 25)].owner_id == owner.id
+
+
+def test_snapshot_rerun_replaces_rows(db, make_user):
+    owner, _ = make_user("owner")
+    _seed(db, owner.id)
+
+    assert main(["snapshot-portfolio-metrics", "--date", "2025-01-25"]) == 0
+    assert main(["snapshot-portfolio-metrics", "--date", "2025-01-25"]) == 0
+    assert db.query(DailyPortfolioMetrics).count() == 1
+
+
+def test_dashboard_change_pct_from_snapshots(client, db, make_user):
+    owner, headers = make_user("owner")
+    _seed(db, owner.id)
+    record_portfolio_metrics(db, date(2024, 12, 26), date(2025, 1, 25), today=date(2025, 1, 25))
+
+    changes = portfolio_changes(db, None, period_days=14)
+    # 2025-01-11 had Amina and Brian's first lease; by the 25th rent rose from 18000 to 19000.
+    assert changes["Active leases"] == 0.0
+    assert changes["Monthly revenue"] == 5.6
+    assert changes["Pending KYC"] is None
+
+    cards = {card["label"]: card for card in client.get("/dashboard/summary", headers=headers).json()["totals"]}
+    # Default 30-day period reaches back to 2024-12-26, before any lease began.
+    assert cards["Properties"]["change_pct"] == 0.0
+    assert cards["Active leases"]["change_pct"] is None
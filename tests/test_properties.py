@@ -0,0 +1,115 @@
+from datetime import date
+
+from sqlalchemy import update
+
+from app.models import Lease, Property, PropertyMetricsRollup, Tenant, Unit
+from app.services.property_metrics import (
+    compute_property_metrics,
+    read_property_metrics,
+    rebuild_property_metrics,
+)
+
+
+def _seed_property(db, owner_id, name="Riverside", code="RS-1"):
+    prop = Property(name=name, code=code, owner_id=owner_id)
+    db.add(prop)
+    db.flush()
+
+    units = [Unit(property_id=prop.id, name=f"{code}-{i}", rent_amount=10000) for i in range(3)]
+    db.add_all(units)
+    tenants = [
+        Tenant(full_name="Amina", phone=f"{code}-a", kyc_status="approved"),
+        Tenant(full_name="Brian", phone=f"{code}-b", kyc_status="pending"),
+        Tenant(full_name="Cheru", phone=f"{code}-c", kyc_status="submitted"),
+    ]
+    db.add_all(tenants)
+    db.flush()
+
+    db.add_all(
+        [
+            Lease(unit_id=units[0].id, tenant_id=tenants[0].id, start_date=date(2025, 1, 1), rent_amount=12000, status="active"),
+            Lease(unit_id=units[1].id, tenant_id=tenants[1].id, start_date=date(2025, 1, 1), rent_amount=8000, status="active"),
+            Lease(unit_id=units[2].id, tenant_id=tenants[2].id, start_date=date(2024, 1, 1), rent_amount=9000, status="terminated"),
+        ]
+    )
+    db.commit()
+    return prop
+
+
+def test_compute_property_metrics_single_query(db, make_user, query_counter):
+    owner, _ = make_user("owner")
+    prop = _seed_property(db, owner.id)
+    empty = Property(name="Empty", code="EM-1", owner_id=owner.id)
+    db.add(empty)
+    db.commit()
+    prop_id, empty_id = prop.id, empty.id
+
+    with query_counter() as statements:
+        metrics = compute_property_metrics(db, [prop_id, empty_id])
+
+    assert len(statements) == 1
+    assert empty_id not in metrics
+    result = metrics[prop_id]
+    assert result.units_total == 3
+    assert result.units_occupied == 2
+    assert result.units_vacant == 1
+    assert result.pending_kyc == 2
+    assert result.monthly_revenue == 20000.0
+    assert result.occupancy_rate == 0.67
+
+
+def test_list_properties_query_count(client, db, make_user, query_counter):
+    owner, headers = make_user("owner")
+    for i in range(5):
+        _seed_property(db, owner.id, name=f"Block {i}", code=f"B-{i}")
+
+    with query_counter() as statements:
+        response = client.get("/properties/", headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 5
+    assert all(item["units_total"] == 3 for item in body["items"])
+    # principal lookup, access scope, count, page joined with the metrics rollup
+    assert len(statements) == 4
+
+    with query_counter() as statements:
+        client.get("/properties/", headers=headers)
+    # the principal and access scope are now served from in-process caches
+    assert len(statements) == 2
+
+
+def test_rollup_tracks_lease_and_kyc_changes(db, make_user):
+    owner, _ = make_user("owner")
+    prop = _seed_property(db, owner.id)
+    prop_id = prop.id
+
+    assert read_property_metrics(db, [prop_id])[prop_id] == compute_property_metrics(db, [prop_id])[prop_id]
+
+    lease = db.query(Lease).filter(Lease.status == "terminated").one()
+    lease.status = "active"
+    db.commit()
+    rollup = read_property_metrics(db, [prop_id])[prop_id]
+    assert rollup.units_occupied == 3
+    assert rollup.monthly_revenue == 29000.0
+
+    tenant = db.query(Tenant).filter(Tenant.kyc_status == "pending").one()
+    tenant.kyc_status = "approved"
+    db.commit()
+    assert read_property_metrics(db, [prop_id])[prop_id].pending_kyc == 1
+
+    db.add(Unit(property_id=prop_id, name="RS-new", rent_amount=5000))
+    db.commit()
+    assert read_property_metrics(db, [prop_id])[prop_id].units_total == 4
+
+
+def test_rebuild_repairs_drift(db, make_user):
+    owner, _ = make_user("owner")
+    prop = _seed_property(db, owner.id)
+    prop_id = prop.id
+
+    db.execute(update(PropertyMetricsRollup).values(units_total=99, monthly_revenue=0))
+    db.commit()
+
+    assert rebuild_property_metrics(db) == 1
+    assert read_property_metrics(db, [prop_id])[prop_id] == compute_property_metrics(db, [prop_id])[prop_id]
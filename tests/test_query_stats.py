@@ -0,0 +1,66 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.query_stats import RequestQueryStats, _current, repeated_shapes, statement_shape
+from app.models import Lease, MaintenanceRequest, Property, Tenant, Unit
+
+
+def _seed(db, owner_id):
+    prop = Property(name="Budget Court", owner_id=owner_id)
+    db.add(prop)
+    db.flush()
+    unit = Unit(property_id=prop.id, name="B1", rent_amount=12000)
+    tenant = Tenant(full_name="Otieno", phone="0712000000")
+    db.add_all([unit, tenant])
+    db.flush()
+    lease = Lease(unit_id=unit.id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=12000, status="active")
+    request = MaintenanceRequest(property_id=prop.id, unit_id=unit.id, tenant_id=tenant.id, title="Leak", reported_on=date(2025, 2, 1))
+    db.add_all([lease, request])
+    db.commit()
+    return lease.id, request.id
+
+
+def test_statement_shape_ignores_literals_and_in_lists():
+    first = statement_shape("SELECT * FROM units WHERE id IN (?, ?, ?) AND rent > 100")
+    second = statement_shape("SELECT *  FROM units\nWHERE id IN (?) AND rent > 250")
+    assert first == second
+    assert repeated_shapes(["SELECT 1 FROM t WHERE id = ?"] * 3, threshold=3)
+    assert not repeated_shapes(["SELECT 1 FROM t WHERE id = ?"] * 2, threshold=3)
+
+
+def test_server_timing_header(client, make_user):
+    _, headers = make_user("manager")
+    response = client.get("/leases/", headers=headers)
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert "queries" in response.headers["Server-Timing"]
+
+
+def test_lease_and_maintenance_lookups_within_budget(client, db, make_user, query_budget):
+    user, headers = make_user("owner")
+    lease_id, request_id = _seed(db, user.id)
+    client.get("/leases/", headers=headers)  # warm the principal cache
+
+    with query_budget(1):
+        body = client.get(f"/leases/{lease_id}", headers=headers).json()
+    assert body["tenant_name"] == "Otieno" and body["unit_name"] == "B1"
+
+    with query_budget(3):
+        body = client.patch(f"/maintenance/{request_id}", json={"status": "closed"}, headers=headers).json()
+    assert (body["property_name"], body["unit_name"], body["tenant_name"]) == ("Budget Court", "B1", "Otieno")
+
+
+def test_failed_statement_does_not_leave_a_timer_behind(db):
+    stats = RequestQueryStats()
+    token = _current.set(stats)
+    try:
+        with pytest.raises(OperationalError):
+            db.execute(text("SELECT * FROM no_such_table"))
+        db.rollback()
+        db.execute(text("SELECT 1"))
+        assert not db.connection().info.get("query_stats_started")
+    finally:
+        _current.reset(token)
+    assert stats.count == 1
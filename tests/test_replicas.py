@@ -0,0 +1,115 @@
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+
+from app import dependencies
+from app.core.database import Base, async_engine, engine
+from app.core.principals import clear_principals
+from app.core.replicas import ReplicaRouter
+from app.main import app
+from app.models import Property
+
+
+def _sqlite_url(name: str) -> str:
+    return f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='easy-estates-replica-'), name)}"
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    url = _sqlite_url("replica.db")
+    setup = create_engine(url)
+    Base.metadata.create_all(bind=setup)
+    setup.dispose()
+
+    router = ReplicaRouter([url])
+    monkeypatch.setattr(dependencies, "replica_router", router)
+    # The commit listener in core.replicas looks the router up at module level.
+    monkeypatch.setattr("app.core.replicas.replica_router", router)
+    yield router.replicas[0]
+    router.replicas[0].engine.dispose()
+
+
+def test_reads_go_to_replica_until_user_writes(client, db, make_user, replica):
+    user, headers = make_user("owner")
+    db.add(Property(name="Primary copy", owner_id=user.id))
+    db.commit()
+    with replica.session_factory() as replica_db:
+        replica_db.add(Property(name="Replica copy", owner_id=user.id))
+        replica_db.commit()
+
+    names = [item["name"] for item in client.get("/properties/", headers=headers).json()["items"]]
+    assert names == ["Replica copy"]
+
+    assert client.post("/properties/", json={"name": "Fresh"}, headers=headers).status_code == 201
+    names = {item["name"] for item in client.get("/properties/", headers=headers).json()["items"]}
+    assert names == {"Primary copy", "Fresh"}
+
+
+def test_failed_replica_read_is_retried_on_primary(db, make_user, monkeypatch):
+    url = _sqlite_url("empty.db")  # no schema, so every query fails with OperationalError
+    router = ReplicaRouter([url])
+    monkeypatch.setattr(dependencies, "replica_router", router)
+    user, headers = make_user("owner")
+    db.add(Property(name="Primary copy", owner_id=user.id))
+    db.commit()
+    client = TestClient(app, raise_server_exceptions=False)
+
+    first = client.get("/properties/", headers=headers)
+    assert first.status_code == 200
+    assert [item["name"] for item in first.json()["items"]] == ["Primary copy"]
+    assert not router.replicas[0].healthy
+    assert router.replicas[0].stats()["failovers"] == 1
+
+    assert client.get("/properties/", headers=headers).status_code == 200
+    assert router.stats()["primary_fallbacks"] == 1
+    router.replicas[0].engine.dispose()
+
+    # Sync read sessions fail over the same way.
+    fresh = ReplicaRouter([url])
+    monkeypatch.setattr(dependencies, "replica_router", fresh)
+    prop_id = first.json()["items"][0]["id"]
+    assert client.get(f"/properties/{prop_id}", headers=headers).status_code == 200
+    assert fresh.replicas[0].stats()["failovers"] == 1
+    fresh.replicas[0].engine.dispose()
+
+
+def test_token_is_decoded_once_per_request(client, db, make_user, replica, monkeypatch):
+    _, headers = make_user("owner")
+    calls = []
+    decode = dependencies.decode_access_token
+    monkeypatch.setattr(dependencies, "decode_access_token", lambda token: calls.append(token) or decode(token))
+
+    assert client.get("/properties/", headers=headers).status_code == 200
+    assert len(calls) == 1
+
+
+def test_read_routes_share_the_primary_connection_without_replicas(client, db, make_user):
+    user, headers = make_user("owner")
+    prop = Property(name="Only copy", owner_id=user.id)
+    db.add(prop)
+    db.commit()
+    prop_id = prop.id
+    db.close()  # the fixture session's own connection must not count
+
+    for target, path in ((engine, f"/properties/{prop_id}"), (async_engine.sync_engine, "/properties/")):
+        clear_principals()  # resolving the user must hit the database too
+        usage = {"open": 0, "peak": 0}
+
+        def checkout(*args):
+            usage["open"] += 1
+            usage["peak"] = max(usage["peak"], usage["open"])
+
+        def checkin(*args):
+            usage["open"] -= 1
+
+        event.listen(target, "checkout", checkout)
+        event.listen(target, "checkin", checkin)
+        try:
+            assert client.get(path, headers=headers).status_code == 200
+        finally:
+            event.remove(target, "checkout", checkout)
+            event.remove(target, "checkin", checkin)
+        assert usage["peak"] == 1, path
@@ -0,0 +1,64 @@
+import pytest
+
+from app.models import Property, Tenant
+from app.services.search import normalize_phone
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("0712 345 678", "+254712345678"),
+        ("+254712345678", "+254712345678"),
+        ("254712345678", "+254712345678"),
+        ("712345678", "+254712345678"),
+        ("00447700900123", "+447700900123"),
+        ("12", None),
+        (None, None),
+    ],
+)
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw) == expected
+
+
+def test_tenant_search_matches_any_phone_format(client, db, make_user):
+    owner, headers = make_user("owner")
+    db.add_all(
+        [
+            Tenant(full_name="Achieng Otieno", phone="0712 345 678", created_by_id=owner.id),
+            Tenant(full_name="Baraka Mwangi", phone="+254733000111", email="baraka@example.com", created_by_id=owner.id),
+        ]
+    )
+    db.commit()
+    assert db.query(Tenant.phone_e164).filter(Tenant.full_name == "Achieng Otieno").scalar() == "+254712345678"
+
+    by_phone = client.get("/tenants/", params={"search": "+254 712 345"}, headers=headers).json()
+    assert [t["full_name"] for t in by_phone["items"]] == ["Achieng Otieno"]
+
+    by_email = client.get("/tenants/", params={"search": "BARAKA@"}, headers=headers).json()
+    assert [t["full_name"] for t in by_email["items"]] == ["Baraka Mwangi"]
+
+
+def test_tenant_search_falls_back_to_raw_phone(client, db, make_user):
+    _, headers = make_user("viewer")
+    db.add(Tenant(full_name="Chebet Kiprop", phone="Ext 42"))
+    db.commit()
+    assert db.query(Tenant.phone_e164).filter(Tenant.full_name == "Chebet Kiprop").scalar() is None
+
+    body = client.get("/tenants/", params={"search": "ext 42"}, headers=headers).json()
+    assert [t["full_name"] for t in body["items"]] == ["Chebet Kiprop"]
+
+
+def test_property_search_by_name_or_code(client, db, make_user):
+    owner, headers = make_user("owner")
+    db.add_all(
+        [
+            Property(name="Lavington Heights", code="LAV-01", owner_id=owner.id),
+            Property(name="Westlands Plaza", code="WST-02", owner_id=owner.id),
+        ]
+    )
+    db.commit()
+
+    body = client.get("/properties/", params={"search": "heights"}, headers=headers).json()
+    assert [p["name"] for p in body["items"]] == ["Lavington Heights"]
+    body = client.get("/properties/", params={"search": "wst"}, headers=headers).json()
+    assert [p["name"] for p in body["items"]] == ["Westlands Plaza"]
@@ -0,0 +1,32 @@
+from app.core.config import settings
+from app.core.slow_queries import explain_command, slow_query_log
+
+
+def test_slow_queries_are_recorded_with_route(client, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_TOKEN", "s3cret")
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.0001)
+    slow_query_log.clear()
+    _, headers = make_user("owner")
+
+    assert client.get("/dashboard/summary", headers=headers).status_code == 200
+
+    admin = {"X-Admin-Token": "s3cret"}
+    items = client.get("/admin/slow-queries", headers=admin).json()["items"]
+    routes = {item["route"] for item in items}
+    assert "GET /dashboard/summary" in routes
+    lease_count = next(item for item in items if "FROM leases" in item["shape"])
+    assert lease_count["param_types"] == ["str"]
+    # Plans are only captured on Postgres.
+    assert {item["plan_status"] for item in items} == {"not_sampled"}
+
+    assert client.delete("/admin/slow-queries", headers=admin).status_code == 200
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 250.0)
+    assert client.get("/admin/slow-queries", headers=admin).json()["items"] == []
+
+
+def test_locking_reads_are_never_explained_with_analyze():
+    assert explain_command("SELECT id FROM leases WHERE id = %(id)s") == "EXPLAIN (ANALYZE, BUFFERS)"
+    assert explain_command("SELECT id FROM email_outbox LIMIT 50 FOR UPDATE SKIP LOCKED") == "EXPLAIN"
+    assert explain_command("SELECT id FROM rent_invoices ORDER BY id FOR UPDATE OF rent_invoices") == "EXPLAIN"
+    assert explain_command("SELECT id FROM payments\nFOR NO KEY UPDATE") == "EXPLAIN"
+    assert explain_command("SELECT id FROM users FOR SHARE") == "EXPLAIN"